@@ -0,0 +1,489 @@
+# analysis_service.py
+
+import argparse
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+import spotipy
+
+import instrumentation
+from enrichment import enrich_playlist
+from logging_config import configure_logging
+from playlist_analyzer import Playlist
+from rate_limiter import get_scheduler
+from song import Song
+from spotify_api import get_playlist_data, get_spotify_client
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Playlists analizadas que se guardan en memoria antes de expulsar la menos usada
+DEFAULT_MAX_ENTRIES = 64
+# Latencias recientes con las que se calculan los percentiles de /metrics
+LATENCY_WINDOW = 1000
+# Canciones por respuesta de /playlists/{id}/songs
+DEFAULT_SONGS_LIMIT = 100
+MAX_SONGS_LIMIT = 1000
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Agrupa llamadas concurrentes con la misma clave: la primera ejecuta la
+    función y las que llegan mientras tanto esperan y reciben el mismo resultado
+    (o la misma excepción), sin repetir el trabajo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, func: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Devuelve (resultado, compartido); `compartido` es True si el resultado
+        lo calculó otra llamada en curso.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AnalysisEntry:
+    """
+    Playlist analizada con su resumen ya convertido a JSON, calculado una sola
+    vez al guardarla.
+    """
+
+    def __init__(self, playlist: Playlist, summary: dict):
+        self.playlist = playlist
+        self.summary = summary
+
+    @property
+    def snapshot_id(self) -> str | None:
+        return self.playlist.snapshot_id
+
+
+class AnalysisCache:
+    """
+    Caché en memoria de playlists analizadas, por id, con expulsión LRU al pasar
+    de `max_entries`. Una entrada solo vale mientras la playlist siga teniendo el
+    mismo `snapshot_id`.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: OrderedDict[str, AnalysisEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, playlist_id: str, snapshot_id: str | None) -> AnalysisEntry | None:
+        """
+        La entrada de la playlist si coincide con `snapshot_id`; una versión
+        anterior se descarta.
+        """
+        with self._lock:
+            entry = self._entries.get(playlist_id)
+            if entry is None:
+                return None
+            if snapshot_id is None or entry.snapshot_id != snapshot_id:
+                del self._entries[playlist_id]
+                return None
+            self._entries.move_to_end(playlist_id)
+            return entry
+
+    def put(self, playlist_id: str, entry: AnalysisEntry):
+        with self._lock:
+            self._entries[playlist_id] = entry
+            self._entries.move_to_end(playlist_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+
+class ServiceMetrics:
+    """
+    Contadores del servicio y latencias de las últimas LATENCY_WINDOW peticiones
+    de análisis:
+    - `hits`: servidas desde la caché en memoria (solo se consulta el
+      `snapshot_id`);
+    - `misses`: playlists descargadas y analizadas;
+    - `coalesced`: peticiones que esperaron a otra en curso para la misma
+      playlist en lugar de descargarla también.
+    """
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.requests = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, latency_s: float):
+        with self._lock:
+            self.requests += 1
+            if outcome == "hit":
+                self.hits += 1
+            elif outcome == "miss":
+                self.misses += 1
+            elif outcome == "coalesced":
+                self.coalesced += 1
+            else:
+                self.errors += 1
+            self._latencies.append(latency_s)
+
+    def get_report(self) -> dict:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            lookups = self.hits + self.misses + self.coalesced
+            report = {
+                "uptime_s": round(time.monotonic() - self.started, 1),
+                "requests": self.requests,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                # Peticiones atendidas sin descargar la playlist
+                "hit_rate": round((self.hits + self.coalesced) / lookups, 4)
+                if lookups
+                else 0.0,
+            }
+        report["latency_ms"] = {
+            "p50": _percentile_ms(latencies, 50),
+            "p95": _percentile_ms(latencies, 95),
+            "p99": _percentile_ms(latencies, 99),
+            "max": round(latencies[-1] * 1000, 2) if latencies else None,
+        }
+        return report
+
+
+def _percentile_ms(sorted_values: list[float], percentile: float) -> float | None:
+    """
+    Percentil por el método del rango más cercano, en milisegundos.
+    """
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return round(sorted_values[rank - 1] * 1000, 2)
+
+
+def summary_to_json(playlist: Playlist) -> dict:
+    """
+    `Playlist.get_summary()` con valores que se pueden serializar a JSON
+    estándar: la canción más corta de una playlist sin duraciones tiene
+    `duration_ms` infinito, que pasa a null, y las tuplas pasan a listas.
+    """
+    summary = playlist.get_summary()
+    result = {"id": playlist.id, "snapshot_id": playlist.snapshot_id}
+    for key, value in summary.items():
+        if isinstance(value, dict):
+            value = {
+                k: None if isinstance(v, float) and math.isinf(v) else v
+                for k, v in value.items()
+            }
+        elif isinstance(value, tuple):
+            value = list(value)
+        result[key] = value
+    return result
+
+
+def song_to_json(song: Song) -> dict:
+    return {
+        "id": song.id,
+        "title": song.title,
+        "artists": [{"id": artist.id, "name": artist.name} for artist in song.artists],
+        "album": song.album,
+        "album_id": song.album_id,
+        "duration_ms": song.duration_ms,
+        "explicit": song.explicit,
+    }
+
+
+class AnalysisService:
+    """
+    Análisis de playlists para otras herramientas, sin interfaz.
+
+    Cada petición consulta primero el `snapshot_id` de la playlist: si coincide
+    con el de la caché en memoria se responde desde ella; si no, se descarga con
+    `get_playlist_data` (que a su vez usa la caché en disco), se enriquece y se
+    calcula su resumen. Las peticiones simultáneas para la misma playlist se
+    agrupan en una sola consulta a Spotify.
+    """
+
+    def __init__(
+        self,
+        sp_client: spotipy.Spotify,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        enrich: bool = True,
+    ):
+        self.sp_client = sp_client
+        self.enrich = enrich
+        self.cache = AnalysisCache(max_entries)
+        self.metrics = ServiceMetrics()
+        self._flight = SingleFlight()
+
+    def analyze(self, playlist_id: str) -> tuple[AnalysisEntry, str]:
+        """
+        Devuelve la playlist analizada y cómo se obtuvo: "hit", "miss" o
+        "coalesced".
+        """
+        (entry, outcome), shared = self._flight.do(
+            playlist_id, lambda: self._load(playlist_id)
+        )
+        return entry, "coalesced" if shared else outcome
+
+    def _load(self, playlist_id: str) -> tuple[AnalysisEntry, str]:
+        with instrumentation.span("service.validate"):
+            info = get_scheduler().call(
+                self.sp_client.playlist, playlist_id, fields="name,snapshot_id"
+            )
+        entry = self.cache.get(playlist_id, info.get("snapshot_id"))
+        if entry is not None:
+            return entry, "hit"
+
+        # La cabecera ya pedida sirve también para la descarga: una sola
+        # consulta a la API por petición agrupada
+        playlist = get_playlist_data(self.sp_client, playlist_id, playlist_info=info)
+        if self.enrich and playlist.num_songs:
+            try:
+                enrich_playlist(self.sp_client, playlist)
+            except Exception as e:
+                logging.warning(
+                    f"No se pudo enriquecer la playlist {playlist_id}: {e}"
+                )
+        with instrumentation.span("service.summary"):
+            entry = AnalysisEntry(playlist, summary_to_json(playlist))
+        self.cache.put(playlist_id, entry)
+        return entry, "miss"
+
+    def get_metrics(self) -> dict:
+        report = self.metrics.get_report()
+        report["cached_playlists"] = len(self.cache)
+        report["evictions"] = self.cache.evictions
+        report["upstream"] = get_scheduler().get_metrics()
+        return report
+
+
+class _ThreadingServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Cola de conexiones pendientes: con la de por defecto (5), una ráfaga de
+    # clientes acaba en reintentos de conexión de un segundo
+    request_queue_size = 128
+
+
+class AnalysisServer:
+    """
+    Servidor HTTP del servicio de análisis, en un hilo propio entre `start()` y
+    `stop()` (o dentro de un bloque `with`), o en el hilo actual con
+    `serve_forever()`.
+
+    - GET /playlists/{id}: resumen de la playlist (`Playlist.get_summary()`).
+    - GET /playlists/{id}/songs?offset=&limit=: sus canciones, paginadas.
+    - GET /metrics: aciertos de la caché, peticiones agrupadas y latencias.
+    - GET /health
+
+    La cabecera `X-PlayLab-Cache` indica si el análisis salió de la caché
+    (`hit`), se calculó (`miss`) o se compartió con otra petición (`coalesced`).
+    """
+
+    def __init__(
+        self, service: AnalysisService, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ):
+        self.service = service
+        self._httpd = _ThreadingServer((host, port), _make_handler(service))
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "AnalysisServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "AnalysisServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+
+def _error(status: int, message: str) -> dict:
+    return {"error": {"status": status, "message": message}}
+
+
+def _int_param(query: dict[str, list[str]], name: str, default: int) -> int:
+    try:
+        return int(query.get(name, [default])[0])
+    except ValueError:
+        return default
+
+
+def _make_handler(service: AnalysisService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = url.path.strip("/").split("/")
+            headers = {}
+            if parts == ["health"]:
+                status, body = 200, {"status": "ok"}
+            elif parts == ["metrics"]:
+                status, body = 200, service.get_metrics()
+            elif len(parts) in (2, 3) and parts[0] == "playlists" and parts[1]:
+                if len(parts) == 3 and parts[2] != "songs":
+                    status, body = 404, _error(404, "Not found")
+                else:
+                    status, body, headers = self._analyze(parts, parse_qs(url.query))
+            else:
+                status, body = 404, _error(404, "Not found")
+
+            payload = json.dumps(body, ensure_ascii=False, allow_nan=False).encode(
+                "utf-8"
+            )
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def _analyze(
+            self, parts: list[str], query: dict[str, list[str]]
+        ) -> tuple[int, dict, dict]:
+            start = time.perf_counter()
+            try:
+                entry, outcome = service.analyze(parts[1])
+            except spotipy.SpotifyException as e:
+                service.metrics.record("error", time.perf_counter() - start)
+                # Los errores del cliente (playlist inexistente o id no válido)
+                # se devuelven tal cual; el resto, como fallo del servicio de origen
+                status = e.http_status if e.http_status in (400, 404) else 502
+                return status, _error(status, str(e.msg)), {}
+            except Exception as e:
+                service.metrics.record("error", time.perf_counter() - start)
+                logging.exception(f"Error al analizar la playlist {parts[1]}")
+                return 500, _error(500, str(e)), {}
+
+            if len(parts) == 2:
+                body = entry.summary
+            else:
+                songs = entry.playlist.songs
+                offset = max(0, _int_param(query, "offset", 0))
+                limit = _int_param(query, "limit", DEFAULT_SONGS_LIMIT)
+                limit = min(MAX_SONGS_LIMIT, max(0, limit))
+                body = {
+                    "id": entry.playlist.id,
+                    "snapshot_id": entry.snapshot_id,
+                    "total": len(songs),
+                    "offset": offset,
+                    "limit": limit,
+                    "items": [
+                        song_to_json(song) for song in songs[offset : offset + limit]
+                    ],
+                }
+            service.metrics.record(outcome, time.perf_counter() - start)
+            return 200, body, {"X-PlayLab-Cache": outcome}
+
+        def log_message(self, format, *args):
+            logging.debug("%s - %s", self.address_string(), format % args)
+
+    return Handler
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Servicio HTTP local de análisis de playlists de PlayLab"
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--max-entries",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="Playlists analizadas que se guardan en memoria",
+    )
+    parser.add_argument(
+        "--no-enrich",
+        action="store_true",
+        help="No pedir géneros, popularidad ni fechas de publicación",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    configure_logging()
+    sp_client = get_spotify_client()
+    if not sp_client:
+        print("Error: No se pudo conectar con Spotify. Revisa las credenciales de la API.")
+        sys.exit(1)
+
+    service = AnalysisService(
+        sp_client, max_entries=args.max_entries, enrich=not args.no_enrich
+    )
+    server = AnalysisServer(service, args.host, args.port)
+    print(f"Servicio de análisis de PlayLab en {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
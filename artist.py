@@ -1,7 +1,27 @@
 class Artist:
+    __slots__ = ("id", "name")
+
     def __init__(self, id: str, name: str):
-        self.id = id
-        self.name = name
+        # Inmutable: los atributos solo se asignan aquí
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "name", name)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Artist es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Artist es inmutable")
+
+    def __reduce__(self):
+        return (Artist, (self.id, self.name))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Artist):
+            return NotImplemented
+        return self.id == other.id and self.name == other.name
+
+    def __hash__(self) -> int:
+        return hash((self.id, self.name))
 
     def __str__(self) -> str:
         return self.name
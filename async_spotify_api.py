@@ -0,0 +1,261 @@
+import asyncio
+import json
+import logging
+
+import aiohttp
+import spotipy
+from spotipy.oauth2 import SpotifyOAuth
+
+import instrumentation
+from model_registry import ModelRegistry
+from playlist_analyzer import Playlist
+from rate_limiter import RequestScheduler, get_scheduler
+from song import Song
+from track_cache import get_track_cache
+from spotify_api import (
+    PAGE_SIZE,
+    PLAYLIST_ITEMS_FIELDS,
+    _songs_from_items,
+    create_auth_manager,
+    get_api_base_url,
+    get_local_api_token,
+)
+
+# Peticiones simultáneas como máximo contra el host de la API
+DEFAULT_MAX_PER_HOST = 8
+
+
+class AsyncSpotifyClient:
+    """
+    Cliente asyncio de la API de Spotify equivalente a `get_playlist_tracks` y
+    `get_playlist_data` de `spotify_api`.
+
+    Todas las peticiones comparten una única sesión aiohttp con conexiones
+    keep-alive, limitada a `max_per_host` peticiones en vuelo por host. El token
+    OAuth se toma de la misma caché (`.cache-playlab`) que usa el cliente síncrono,
+    y por defecto se comparte también su planificador de peticiones (límite por
+    segundo, Retry-After y reintentos de errores 5xx). Sin `base_url`, se usa la
+    misma URL base que `spotify_api` (configurable con `PLAYLAB_API_BASE_URL`).
+
+    Uso:
+        async with AsyncSpotifyClient() as client:
+            playlist = await client.get_playlist_data(playlist_id)
+    """
+
+    def __init__(
+        self,
+        auth_manager: SpotifyOAuth | None = None,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        base_url: str | None = None,
+        scheduler: RequestScheduler | None = None,
+    ):
+        self.auth_manager = auth_manager or create_auth_manager()
+        self.scheduler = scheduler or get_scheduler()
+        self.max_per_host = max_per_host
+        self.base_url = (base_url or get_api_base_url()).rstrip("/")
+        # Contra un servidor distinto de Spotify (p. ej. el local de pruebas) no se usa OAuth
+        self._static_token = (
+            get_local_api_token(self.base_url) if auth_manager is None else None
+        )
+        self._session: aiohttp.ClientSession | None = None
+        self._access_token: str | None = None
+        self._token_lock = asyncio.Lock()
+
+    async def __aenter__(self) -> "AsyncSpotifyClient":
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit_per_host=self.max_per_host, keepalive_timeout=60
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _load_token(self) -> str:
+        """
+        Lee el token de la caché, refrescándolo si ha caducado. Solo si no hay
+        token en caché se recurre al flujo OAuth completo.
+        """
+        token_info = self.auth_manager.validate_token(
+            self.auth_manager.cache_handler.get_cached_token()
+        )
+        if token_info:
+            return token_info["access_token"]
+        return self.auth_manager.get_access_token(as_dict=False)
+
+    def _refresh_token(self) -> str:
+        token_info = self.auth_manager.cache_handler.get_cached_token()
+        if token_info and token_info.get("refresh_token"):
+            token_info = self.auth_manager.refresh_access_token(
+                token_info["refresh_token"]
+            )
+            return token_info["access_token"]
+        return self._load_token()
+
+    async def _get_token(self, refresh: bool = False) -> str:
+        if self._static_token is not None:
+            return self._static_token
+        async with self._token_lock:
+            if self._access_token is None or refresh:
+                # spotipy es bloqueante: la lectura/refresco del token va a un hilo
+                loop = asyncio.get_running_loop()
+                load = self._refresh_token if refresh else self._load_token
+                self._access_token = await loop.run_in_executor(None, load)
+            return self._access_token
+
+    async def _get(self, path: str, params: dict | None = None) -> dict:
+        return await self.scheduler.call_async(self._request, path, params)
+
+    async def _request(self, path: str, params: dict | None = None) -> dict:
+        await self.open()
+        url = f"{self.base_url}/{path}"
+        token = await self._get_token()
+        for attempt in range(2):
+            headers = {"Authorization": f"Bearer {token}"}
+            async with self._session.get(url, params=params, headers=headers) as response:
+                if response.status == 401 and attempt == 0:
+                    # Token caducado durante la sesión: se refresca una sola vez
+                    token = await self._get_token(refresh=True)
+                    continue
+                if response.status >= 400:
+                    text = await response.text()
+                    raise spotipy.SpotifyException(
+                        response.status,
+                        -1,
+                        f"{response.url}:\n {text}",
+                        headers=dict(response.headers),
+                    )
+                body = await response.read()
+                instrumentation.increment("bytes_received", len(body))
+                return json.loads(body)
+
+    async def playlist(self, playlist_id: str, fields: str | None = None) -> dict:
+        params = {"fields": fields} if fields else None
+        return await self._get(f"playlists/{playlist_id}", params)
+
+    async def playlist_items(
+        self, playlist_id: str, offset: int = 0, limit: int = PAGE_SIZE
+    ) -> dict:
+        params = {
+            "offset": offset,
+            "limit": limit,
+            "fields": PLAYLIST_ITEMS_FIELDS,
+            "additional_types": "track",
+        }
+        with instrumentation.span("fetch.page"):
+            page = await self._get(f"playlists/{playlist_id}/tracks", params)
+        instrumentation.increment("pages")
+        return page
+
+    async def get_playlist_tracks(
+        self, playlist_id: str, registry: ModelRegistry | None = None
+    ) -> list[Song]:
+        """
+        Obtiene todas las pistas de la playlist. Tras la primera página, el resto
+        se piden a la vez; el conector limita cuántas están realmente en vuelo.
+        """
+        registry = registry or ModelRegistry()
+        try:
+            first_page = await self.playlist_items(playlist_id, 0)
+            items = first_page["items"]
+            songs = _songs_from_items(items, registry)
+            total = first_page.get("total") or 0
+
+            if items:
+                pages = await asyncio.gather(
+                    *(
+                        self.playlist_items(playlist_id, offset)
+                        for offset in range(len(items), total, PAGE_SIZE)
+                    )
+                )
+                for page in pages:
+                    songs.extend(_songs_from_items(page["items"], registry))
+        except spotipy.SpotifyException as e:
+            logging.error(
+                f"Error de Spotify al obtener pistas de la playlist {playlist_id}: {e}"
+            )
+            raise
+        except Exception as e:
+            logging.error(
+                f"Error inesperado al obtener pistas de la playlist {playlist_id}: {e}"
+            )
+            raise
+
+        logging.info("Se obtuvieron %d pistas de la playlist.", len(songs))
+        return songs
+
+    async def get_playlist_data(
+        self, playlist_id: str, use_cache: bool = True
+    ) -> Playlist:
+        """
+        Obtiene los datos de la playlist y sus canciones, y devuelve un objeto Playlist.
+        Usa la misma caché local por `snapshot_id` que `spotify_api.get_playlist_data`.
+        """
+        try:
+            playlist_info = await self.playlist(playlist_id, fields="name,snapshot_id")
+            playlist_name = playlist_info.get("name", "Nombre desconocido")
+            snapshot_id = playlist_info.get("snapshot_id")
+        except spotipy.SpotifyException as e:
+            logging.error(
+                f"Error de Spotify al obtener información de la playlist {playlist_id}: {e}"
+            )
+            raise
+        except Exception as e:
+            logging.error(
+                f"Error inesperado al obtener información de la playlist {playlist_id}: {e}"
+            )
+            raise
+
+        # La caché es SQLite síncrona: abrirla, leerla y escribirla va a un hilo
+        # para no bloquear el bucle de eventos (y las demás descargas en curso)
+        loop = asyncio.get_running_loop()
+        cache = (
+            await loop.run_in_executor(None, get_track_cache)
+            if use_cache and snapshot_id
+            else None
+        )
+        songs = (
+            await loop.run_in_executor(None, cache.get, playlist_id, snapshot_id)
+            if cache
+            else None
+        )
+        if songs is None:
+            songs = await self.get_playlist_tracks(playlist_id)
+            if cache:
+                await loop.run_in_executor(
+                    None, cache.put, playlist_id, playlist_name, snapshot_id, songs
+                )
+
+        return Playlist(
+            id=playlist_id, name=playlist_name, songs=songs, snapshot_id=snapshot_id
+        )
+
+    async def get_playlists_data(self, playlist_ids: list[str]) -> list[Playlist]:
+        """
+        Analiza varias playlists a la vez desde el mismo bucle de eventos.
+        """
+        return await asyncio.gather(
+            *(self.get_playlist_data(playlist_id) for playlist_id in playlist_ids)
+        )
+
+
+def get_playlist_data(playlist_id: str) -> Playlist:
+    """
+    Atajo síncrono para los front ends: ejecuta el cliente asyncio hasta completar
+    el análisis de una playlist.
+    """
+
+    async def run() -> Playlist:
+        async with AsyncSpotifyClient() as client:
+            return await client.get_playlist_data(playlist_id)
+
+    return asyncio.run(run())
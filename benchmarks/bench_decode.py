@@ -0,0 +1,82 @@
+"""
+Benchmark de decodificación de páginas en el camino que usa `get_playlist_tracks`:
+spotipy decodifica cada respuesta con el módulo json estándar (vía requests) y
+`_songs_from_items` crea un Song por pista.
+
+Las páginas se serializan de antemano como las enviaría la API, con algunas
+pistas locales y nulas que se deben descartar, y se decodifican de una en una,
+como en la descarga real. Se mide solo el JSON, el JSON más `_songs_from_items`
+y el recorrido completo hasta `_calculate_stats`, que es lo que paga
+`get_playlist_data` por las páginas descargadas.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_decode --size 200000
+"""
+
+import argparse
+import json
+
+from benchmarks.bench_stats import best_of
+from benchmarks.synthetic import make_playlist_items
+from model_registry import ModelRegistry
+from playlist_analyzer import Playlist
+from spotify_api import PAGE_SIZE, _songs_from_items
+
+
+def make_raw_pages(size: int) -> list[bytes]:
+    items = make_playlist_items(size)
+    # Una pista local (sin id) y una nula cada 500, como en playlists reales
+    for i in range(0, size, 500):
+        items[i]["track"]["id"] = None
+        if i + 1 < size:
+            items[i + 1]["track"] = None
+    return [
+        json.dumps({"items": items[offset : offset + PAGE_SIZE], "total": size}).encode()
+        for offset in range(0, size, PAGE_SIZE)
+    ]
+
+
+def decode_json(pages: list[bytes]):
+    for raw in pages:
+        json.loads(raw)
+
+
+def decode_songs(pages: list[bytes]) -> list:
+    registry = ModelRegistry()
+    songs = []
+    for raw in pages:
+        songs.extend(_songs_from_items(json.loads(raw)["items"], registry))
+    return songs
+
+
+def decode_and_stats(pages: list[bytes]):
+    Playlist("bench", "Benchmark", decode_songs(pages))._calculate_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pages = make_raw_pages(args.size)
+    num_records = len(decode_songs(pages))
+
+    json_only = best_of(lambda: decode_json(pages), args.repeat)
+    songs = best_of(lambda: decode_songs(pages), args.repeat)
+    full = best_of(lambda: decode_and_stats(pages), args.repeat)
+    print(f"{num_records} registros en {len(pages)} páginas")
+    for label, elapsed in (
+        ("JSON (json estándar)", json_only),
+        ("JSON + _songs_from_items", songs),
+        ("JSON + Song + estadísticas", full),
+    ):
+        print(
+            f"{label:<28} {elapsed * 1000:9.1f} ms | "
+            f"{num_records / elapsed:12,.0f} registros/s | "
+            f"{elapsed / len(pages) * 1e6:8.1f} µs por página"
+        )
+
+
+if __name__ == "__main__":
+    main()
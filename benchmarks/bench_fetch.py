@@ -0,0 +1,109 @@
+"""
+Benchmark de descarga de playlists contra el servidor local de `fake_server`.
+
+Mide el tiempo de `get_playlist_tracks` con distintos números de hilos, del
+cliente asyncio, y de `get_playlist_data` con la caché local fría y caliente.
+Permite inyectar latencia, 429 y fallos 5xx, y limitar el presupuesto del
+planificador de peticiones para ver su efecto.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_fetch --size 20000 --latency 0.05 --workers 1 4 8 16
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import tempfile
+import time
+
+from benchmarks.fake_server import DEFAULT_PLAYLIST_ID, FakeSpotifyServer, synthetic_playlists
+from rate_limiter import configure_scheduler
+
+
+def timed(label: str, func, num_songs: int, server: FakeSpotifyServer, scheduler):
+    requests_before = server.stats["requests"]
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    metrics = scheduler.get_metrics()
+    print(
+        f"{label:<28} {elapsed * 1000:9.1f} ms | {num_songs / elapsed:10.0f} pistas/s | "
+        f"{server.stats['requests'] - requests_before:5d} peticiones | "
+        f"reintentos {metrics['retries']}, en espera {metrics['throttled_seconds']:.2f} s"
+    )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.02, help="Segundos")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Proporción de 429")
+    parser.add_argument("--retry-after", type=float, default=0.5, help="Segundos")
+    parser.add_argument("--failures", type=float, default=0.0, help="Proporción de 5xx")
+    parser.add_argument(
+        "--rps", type=float, default=None, help="Presupuesto de peticiones por segundo"
+    )
+    parser.add_argument("--burst", type=int, default=None)
+    args = parser.parse_args()
+    # Los 429 y 5xx inyectados se registran como errores; no interesan aquí
+    logging.disable(logging.ERROR)
+
+    server = FakeSpotifyServer(
+        synthetic_playlists([args.size]),
+        latency_s=args.latency,
+        throttle_ratio=args.throttle,
+        retry_after_s=args.retry_after,
+        failure_ratio=args.failures,
+    )
+    # Sin --rps el presupuesto es ilimitado: se mide solo el camino de descarga
+    rps = args.rps or 1e9
+    burst = args.burst or (max(1, int(rps)) if args.rps else 1_000_000)
+
+    with server, tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["PLAYLAB_API_BASE_URL"] = server.base_url
+        # La caché local se crea en el directorio de trabajo: se usa uno temporal
+        os.chdir(cache_dir)
+
+        from async_spotify_api import AsyncSpotifyClient
+        from spotify_api import create_spotify_client, get_playlist_data, get_playlist_tracks
+
+        client = create_spotify_client()
+        print(f"Servidor {server.base_url}, {args.size} pistas, latencia {args.latency} s")
+
+        for workers in args.workers:
+            scheduler = configure_scheduler(rps, burst)
+            timed(
+                f"síncrono, {workers} hilos",
+                lambda: get_playlist_tracks(
+                    client, DEFAULT_PLAYLIST_ID, max_workers=workers
+                ),
+                args.size,
+                server,
+                scheduler,
+            )
+
+        async def fetch_async():
+            async with AsyncSpotifyClient() as async_client:
+                return await async_client.get_playlist_tracks(DEFAULT_PLAYLIST_ID)
+
+        scheduler = configure_scheduler(rps, burst)
+        timed("asyncio", lambda: asyncio.run(fetch_async()), args.size, server, scheduler)
+
+        for label in ("get_playlist_data, caché fría", "get_playlist_data, caché caliente"):
+            scheduler = configure_scheduler(rps, burst)
+            timed(
+                label,
+                lambda: get_playlist_data(client, DEFAULT_PLAYLIST_ID),
+                args.size,
+                server,
+                scheduler,
+            )
+
+    print(f"Servidor: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark del coste del log por página descargada.
+
+Descarga una playlist del servidor local de `fake_server` con el cliente spotipy
+real (que registra cada petición y su respuesta a nivel DEBUG) y compara:
+- sin log configurado (referencia),
+- la configuración original: `basicConfig` a nivel DEBUG con escritura síncrona,
+- el log en cola de `logging_config` a nivel DEBUG e INFO.
+
+Cada modo se repite `--repeat` veces, alternando los modos en cada ronda para
+que la deriva del equipo no favorezca a ninguno, y se toma la mediana. El coste
+por página es la diferencia de medianas con la referencia dividida entre
+páginas. También se mide el tiempo de CPU del hilo que descarga y lo que tarda
+en cerrarse el log después de la descarga: con el log en cola los mensajes DEBUG
+se agrupan y el formateo y la escritura pasan al hilo del listener, así que
+parte de ese trabajo se hace después de la descarga, no desaparece.
+
+El tamaño por defecto (2000 pistas, 20 páginas) es el de una playlist grande
+real; Spotify no admite más de 10 000 pistas por playlist.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_logging --size 2000 --repeat 30
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.fake_server import DEFAULT_PLAYLIST_ID, FakeSpotifyServer, synthetic_playlists
+from rate_limiter import configure_scheduler
+
+
+def reset_root_logger():
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.WARNING)
+
+
+def iqr(samples: list[float]) -> float:
+    quartiles = statistics.quantiles(samples, n=4)
+    return quartiles[2] - quartiles[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=2000, help="Pistas (máx. 10 000)")
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    configure_scheduler(requests_per_second=1e9, burst=1_000_000)
+    with FakeSpotifyServer(synthetic_playlists([args.size])) as server, tempfile.TemporaryDirectory() as log_dir:
+        os.environ["PLAYLAB_API_BASE_URL"] = server.base_url
+        import logging_config
+        from spotify_api import PAGE_SIZE, create_spotify_client, get_playlist_tracks
+
+        client = create_spotify_client()
+        num_pages = -(-args.size // PAGE_SIZE)
+        log_path = os.path.join(log_dir, "playlab.log")
+
+        def setup_none():
+            reset_root_logger()
+
+        def setup_basic_config():
+            reset_root_logger()
+            logging.basicConfig(
+                filename=log_path,
+                level=logging.DEBUG,
+                format=logging_config.LOG_FORMAT,
+            )
+
+        def setup_queue(level):
+            def setup():
+                reset_root_logger()
+                logging_config.configure_logging(level=level, path=log_path)
+
+            return setup
+
+        def teardown():
+            logging_config.shutdown_logging()
+            reset_root_logger()
+
+        modes = [
+            ("sin log", setup_none),
+            ("basicConfig DEBUG (original)", setup_basic_config),
+            ("cola DEBUG", setup_queue("DEBUG")),
+            ("cola INFO", setup_queue("INFO")),
+        ]
+        timings = {label: [] for label, _ in modes}
+        cpu_timings = {label: [] for label, _ in modes}
+        teardown_timings = {label: [] for label, _ in modes}
+        # Una descarga de calentamiento (conexión, importaciones perezosas)
+        get_playlist_tracks(client, DEFAULT_PLAYLIST_ID, max_workers=1)
+        for _ in range(args.repeat):
+            for label, setup in modes:
+                setup()
+                start = time.perf_counter()
+                cpu_start = time.thread_time()
+                get_playlist_tracks(client, DEFAULT_PLAYLIST_ID, max_workers=1)
+                cpu_timings[label].append(time.thread_time() - cpu_start)
+                timings[label].append(time.perf_counter() - start)
+                start = time.perf_counter()
+                teardown()
+                teardown_timings[label].append(time.perf_counter() - start)
+
+        baseline = statistics.median(timings["sin log"])
+        cpu_baseline = statistics.median(cpu_timings["sin log"])
+        print(
+            f"{args.size} pistas, {num_pages} páginas, mediana de {args.repeat} "
+            f"descargas por modo"
+        )
+        for label, samples in timings.items():
+            elapsed = statistics.median(samples)
+            overhead_us = (elapsed - baseline) / num_pages * 1e6
+            cpu_overhead_us = (
+                (statistics.median(cpu_timings[label]) - cpu_baseline) / num_pages * 1e6
+            )
+            print(
+                f"{label:<30} {elapsed * 1000:9.1f} ms "
+                f"(IQR {iqr(samples) * 1000:6.1f} ms) | "
+                f"{overhead_us:8.1f} µs de log por página | "
+                f"{cpu_overhead_us:8.1f} µs de CPU del hilo que descarga | "
+                f"{statistics.median(teardown_timings[label]) * 1000:6.1f} ms al cerrar el log"
+            )
+
+
+if __name__ == "__main__":
+    main()
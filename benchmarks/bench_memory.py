@@ -0,0 +1,96 @@
+"""
+Benchmark de memoria de los modelos: bytes retenidos por canción con las clases
+originales (con __dict__ y un Artist nuevo por crédito) frente a los modelos con
+__slots__ y el registro de artistas y álbumes compartidos.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_memory --sizes 10000 100000
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.synthetic import make_playlist_items
+from model_registry import ModelRegistry
+from spotify_api import _songs_from_items
+
+
+class LegacyArtist:
+    def __init__(self, id: str, name: str):
+        self.id = id
+        self.name = name
+
+
+class LegacySong:
+    def __init__(self, id, album, artists, duration_ms, explicit, title):
+        self.id = id
+        self.album = album
+        self.artists = artists
+        self.duration_ms = duration_ms
+        self.explicit = explicit
+        self.title = title
+
+
+def legacy_songs_from_items(items: list[dict]) -> list[LegacySong]:
+    """
+    Conversión original de items a canciones, sin compartir objetos.
+    """
+    songs = []
+    for item in items:
+        track_data = item.get("track")
+        if track_data and track_data.get("id"):
+            artists = [
+                LegacyArtist(
+                    id=artist_info.get("id", "unknown"),
+                    name=artist_info.get("name", "Unknown Artist"),
+                )
+                for artist_info in track_data.get("artists", [])
+            ]
+            songs.append(
+                LegacySong(
+                    id=track_data["id"],
+                    title=track_data["name"],
+                    artists=artists,
+                    album=track_data.get("album", {}).get("name", "Álbum Desconocido"),
+                    duration_ms=track_data.get("duration_ms", 0),
+                    explicit=track_data.get("explicit", False),
+                )
+            )
+    return songs
+
+
+def retained_bytes(parse, size: int) -> int:
+    """
+    Memoria que sigue viva tras convertir `size` items y liberar las respuestas
+    de la API: solo cuenta lo que retienen las canciones.
+    """
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    songs = parse(make_playlist_items(size))
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del songs
+    return retained
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        before = retained_bytes(legacy_songs_from_items, size)
+        after = retained_bytes(
+            lambda items: _songs_from_items(items, ModelRegistry()), size
+        )
+        print(
+            f"{size:>9} canciones: antes {before / size:7.1f} B/canción, "
+            f"después {after / size:7.1f} B/canción ({after / before:.0%})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark de consultas sobre una playlist: `Playlist.query()` con índices frente
+a recorrer `songs` a mano, sobre una playlist sintética.
+
+Se mide la construcción de los índices (una vez por playlist) y la latencia de
+cada consulta interactiva, comprobando que ambos caminos devuelven lo mismo.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_query --size 100000
+"""
+
+import argparse
+import heapq
+import time
+from collections import Counter
+
+from benchmarks.bench_stats import best_of
+from benchmarks.synthetic import make_songs
+from playlist_analyzer import Playlist
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    songs = make_songs(args.size)
+    playlist = Playlist("bench", "Benchmark", songs)
+    playlist.num_songs  # columnas ya creadas, como tras mostrar el resumen
+    start = time.perf_counter()
+    query = playlist.query()
+    build_elapsed = time.perf_counter() - start
+
+    artist_id = songs[len(songs) // 2].artists[0].id
+    album = songs[len(songs) // 3].album
+
+    def scan_top_albums():
+        totals = Counter()
+        for song in songs:
+            totals[song.album] += song.duration_ms
+        return heapq.nlargest(10, totals.items(), key=lambda item: item[1])
+
+    cases = [
+        (
+            "canciones del artista X",
+            lambda: query.by_artist(artist_id).songs(),
+            lambda: [s for s in songs if any(a.id == artist_id for a in s.artists)],
+        ),
+        (
+            "pistas de 3 a 4 minutos",
+            lambda: query.duration_between(180_000, 240_000).songs(),
+            lambda: [s for s in songs if 180_000 <= s.duration_ms <= 240_000],
+        ),
+        (
+            "explícitas del álbum Y",
+            lambda: query.by_album(album).explicit().songs(),
+            lambda: [s for s in songs if s.album == album and s.explicit],
+        ),
+        (
+            "top 10 álbumes por duración",
+            lambda: query.group_by("album").top_k(10, by="total_duration_ms"),
+            scan_top_albums,
+        ),
+        (
+            "top 10 canciones más largas",
+            lambda: query.top_k(10),
+            lambda: heapq.nlargest(10, songs, key=lambda s: s.duration_ms),
+        ),
+    ]
+
+    print(f"{args.size} canciones | índices construidos en {build_elapsed * 1000:.1f} ms")
+    for label, indexed, scan in cases:
+        assert indexed() == scan(), label
+        indexed_elapsed = best_of(indexed, args.repeat)
+        scan_elapsed = best_of(scan, max(1, args.repeat // 10))
+        print(
+            f"{label:<30} {indexed_elapsed * 1e6:9.1f} µs | recorrido "
+            f"{scan_elapsed * 1e3:8.2f} ms (x{scan_elapsed / indexed_elapsed:,.0f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de búsqueda de playlists parecidas: comparar todos los pares de
+conjuntos de ids (Jaccard exacta) frente al índice MinHash + LSH de `similarity`.
+
+Se generan `--playlists` playlists sacadas de un mismo catálogo; una de cada
+`--dup-every` es una copia retocada de otra (casi duplicada). Se mide el tiempo
+de cada camino y la exhaustividad del LSH: qué fracción de los pares con
+Jaccard exacta >= `--threshold` encuentra.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_similarity --playlists 2000 --size 200
+"""
+
+import argparse
+import itertools
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.synthetic import make_songs
+from playlist_analyzer import Playlist
+from similarity import SimilarityIndex, exact_jaccard
+
+
+def make_playlists(
+    num_playlists: int, size: int, catalog_size: int, dup_every: int, seed: int = 0
+) -> list[Playlist]:
+    rng = random.Random(seed)
+    catalog = make_songs(catalog_size)
+    playlists = []
+    for index in range(num_playlists):
+        if index and index % dup_every == 0:
+            # Casi duplicada: la anterior con un 10-30 % de pistas cambiadas
+            songs = list(playlists[index - 1].songs)
+            for position in rng.sample(range(len(songs)), int(size * rng.uniform(0.1, 0.3))):
+                songs[position] = rng.choice(catalog)
+        else:
+            songs = rng.sample(catalog, size)
+        playlists.append(Playlist(f"bench{index}", f"Playlist {index}", songs))
+    return playlists
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--playlists", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=200)
+    parser.add_argument("--catalog", type=int, default=50_000)
+    parser.add_argument("--dup-every", type=int, default=10)
+    parser.add_argument("--threshold", type=float, default=0.5)
+    args = parser.parse_args()
+
+    playlists = make_playlists(args.playlists, args.size, args.catalog, args.dup_every)
+
+    start = time.perf_counter()
+    id_sets = {playlist.id: {song.id for song in playlist.songs} for playlist in playlists}
+    exact_pairs = set()
+    for a, b in itertools.combinations(playlists, 2):
+        ids_a, ids_b = id_sets[a.id], id_sets[b.id]
+        if len(ids_a & ids_b) / len(ids_a | ids_b) >= args.threshold:
+            exact_pairs.add((a.id, b.id))
+    exact_elapsed = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as index_dir:
+        index = SimilarityIndex(os.path.join(index_dir, "similarity.sqlite"))
+        start = time.perf_counter()
+        for playlist in playlists:
+            index.add_playlist(playlist)
+        build_elapsed = time.perf_counter() - start
+        start = time.perf_counter()
+        # Margen bajo el umbral: la estimación tiene un error típico de ~0.05
+        found = index.similar_pairs(threshold=args.threshold - 0.1)
+        query_elapsed = time.perf_counter() - start
+        index.close()
+
+    found_pairs = {tuple(sorted((id_a, id_b))) for id_a, id_b, _ in found}
+    exact_sorted = {tuple(sorted(pair)) for pair in exact_pairs}
+    recall = len(exact_sorted & found_pairs) / len(exact_sorted) if exact_sorted else 1.0
+    by_id = {playlist.id: playlist for playlist in playlists}
+    errors = [
+        abs(similarity - exact_jaccard(by_id[id_a], by_id[id_b]))
+        for id_a, id_b, similarity in found
+    ]
+
+    num_pairs = args.playlists * (args.playlists - 1) // 2
+    print(f"{args.playlists} playlists de {args.size} pistas ({num_pairs:,} pares)")
+    print(f"Todos los pares (exacto)   {exact_elapsed * 1000:9.1f} ms | {len(exact_pairs)} pares")
+    print(f"MinHash: construir índice  {build_elapsed * 1000:9.1f} ms")
+    print(
+        f"MinHash: pares candidatos  {query_elapsed * 1000:9.1f} ms | "
+        f"{len(found)} pares, exhaustividad {recall:.1%}"
+    )
+    if errors:
+        print(
+            f"Error de la Jaccard estimada: medio {sum(errors) / len(errors):.3f}, "
+            f"máximo {max(errors):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
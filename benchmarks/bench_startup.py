@@ -0,0 +1,103 @@
+"""
+Benchmark de arranque de PlayLab.
+
+Mide, en procesos nuevos, el tiempo hasta la primera ventana de `main.py` y el
+tiempo hasta el primer prompt de `terminal_mode.main`, incluido el arranque del
+intérprete y todas las importaciones. Termina con código 1 si la mediana supera
+el presupuesto indicado, para poder usarlo como control de regresión.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_startup --runs 5 --max-window 2.0 --max-prompt 1.0
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Reproduce start_gui() pero sale en cuanto la ventana se ha mostrado
+WINDOW_SNIPPET = """
+import sys, time
+sys.argv = ["main.py"]
+from PyQt5.QtWidgets import QApplication
+import gui_app
+app = QApplication(sys.argv)
+window = gui_app.PlayLabApp()
+window.show()
+app.processEvents()
+print(time.time())
+"""
+
+# Ejecuta terminal_mode.main() y sale en cuanto se pide la URL de la playlist
+PROMPT_SNIPPET = """
+import builtins, sys, time
+def first_prompt(prompt=""):
+    print(time.time(), file=sys.stderr)
+    raise SystemExit(0)
+builtins.input = first_prompt
+import terminal_mode
+terminal_mode.main()
+"""
+
+
+def measure(snippet: str, timestamp_stream: str) -> float:
+    """
+    Lanza el fragmento en un proceso nuevo y devuelve los segundos transcurridos
+    hasta el instante que el propio proceso imprime.
+    """
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=REPO_ROOT,
+        env=env,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    output = result.stdout if timestamp_stream == "stdout" else result.stderr
+    lines = [line for line in output.splitlines() if line.strip()]
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"El proceso de medida falló:\n{result.stderr}")
+    return float(lines[-1]) - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--max-window", type=float, default=None, help="Presupuesto en segundos"
+    )
+    parser.add_argument(
+        "--max-prompt", type=float, default=None, help="Presupuesto en segundos"
+    )
+    args = parser.parse_args()
+
+    checks = [
+        ("main.py -> primera ventana", WINDOW_SNIPPET, "stdout", args.max_window),
+        ("terminal_mode.main -> prompt", PROMPT_SNIPPET, "stderr", args.max_prompt),
+    ]
+    failed = False
+    for label, snippet, stream, budget in checks:
+        samples = [measure(snippet, stream) for _ in range(args.runs)]
+        median = statistics.median(samples)
+        status = ""
+        if budget is not None:
+            ok = median <= budget
+            failed = failed or not ok
+            status = f"  [{'OK' if ok else 'REGRESIÓN'} <= {budget:.3f}s]"
+        print(
+            f"{label}: mediana {median:.3f}s, mín {min(samples):.3f}s, "
+            f"máx {max(samples):.3f}s ({args.runs} ejecuciones){status}"
+        )
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
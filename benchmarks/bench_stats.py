@@ -0,0 +1,133 @@
+"""
+Benchmark de Playlist._calculate_stats: motor columnar (NumPy) frente al recorrido
+canción a canción original, sobre playlists sintéticas.
+
+Se mide por separado la construcción de las columnas a partir de los objetos Song
+(un único recorrido en Python) y las reducciones vectorizadas, que es lo que se
+paga cuando las columnas ya existen.
+
+Con los objetos Song ya creados, como en `get_playlist_data`, la construcción de
+las columnas domina y la ganancia total es moderada; el recorrido completo desde
+las páginas se mide en `bench_decode`.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_stats --sizes 100000 1000000
+"""
+
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.synthetic import make_songs
+from playlist_analyzer import Playlist
+from playlist_columns import PlaylistColumns
+
+
+def legacy_calculate_stats(playlist: Playlist):
+    """
+    Implementación original de `_calculate_stats` (un bucle Python por canción),
+    conservada como referencia de rendimiento y de resultados.
+    """
+    playlist.num_songs = len(playlist.songs)
+    unique_artists = set()
+    playlist.total_duration_ms = 0
+    all_artists_names = []
+    playlist.num_explicit_songs = 0
+    playlist.num_collaborative_songs = 0
+    playlist.artist_collaboration_counts = Counter()
+    playlist.album_counts = Counter()
+    playlist.shortest_song = {"title": "N/A", "duration_ms": float("inf")}
+    playlist.longest_song = {"title": "N/A", "duration_ms": 0}
+
+    for song in playlist.songs:
+        playlist.total_duration_ms += song.duration_ms
+        if song.explicit:
+            playlist.num_explicit_songs += 1
+        if len(song.artists) > 1:
+            playlist.num_collaborative_songs += 1
+            for artist in song.artists:
+                playlist.artist_collaboration_counts[artist.name] += 1
+        for artist in song.artists:
+            unique_artists.add(artist.name)
+            all_artists_names.append(artist.name)
+        playlist.album_counts[song.album] += 1
+        if 0 < song.duration_ms < playlist.shortest_song["duration_ms"]:
+            playlist.shortest_song["duration_ms"] = song.duration_ms
+            playlist.shortest_song["title"] = song.title
+        if song.duration_ms > playlist.longest_song["duration_ms"]:
+            playlist.longest_song["duration_ms"] = song.duration_ms
+            playlist.longest_song["title"] = song.title
+
+    playlist.num_non_collaborative_songs = (
+        playlist.num_songs - playlist.num_collaborative_songs
+    )
+    playlist.num_artists = len(unique_artists)
+    playlist.duration_minutes = round(playlist.total_duration_ms / 60000, 2)
+    playlist.artist_frequencies = Counter(all_artists_names)
+    playlist.num_unique_albums = len(playlist.album_counts)
+    playlist.most_represented_album = (
+        playlist.album_counts.most_common(1)[0] if playlist.album_counts else ("N/A", 0)
+    )
+
+
+def build_columns(songs: list) -> PlaylistColumns:
+    """
+    Construye todas las columnas (from_songs las calcula de forma perezosa).
+    """
+    columns = PlaylistColumns.from_songs(songs)
+    for attribute in (
+        "durations",
+        "explicit",
+        "titles",
+        "album_codes",
+        "artist_offsets",
+        "artist_codes",
+    ):
+        getattr(columns, attribute)
+    return columns
+
+
+def best_of(func, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        playlist = Playlist(id="bench", name="Benchmark", songs=make_songs(size))
+        summary = playlist.get_summary()
+
+        # Playlist nueva en cada repetición para no reutilizar columnas ya calculadas
+        columnar = best_of(
+            lambda: Playlist("bench", "Benchmark", playlist.songs)._calculate_stats(),
+            args.repeat,
+        )
+        build = best_of(lambda: build_columns(playlist.songs), args.repeat)
+        columns = build_columns(playlist.songs)
+        reduce_only = best_of(lambda: playlist._calculate_stats(columns), args.repeat)
+        legacy = best_of(lambda: legacy_calculate_stats(playlist), args.repeat)
+
+        legacy_summary = playlist.get_summary()
+        assert list(summary.items()) == list(legacy_summary.items())
+        for key in ("artist_frequencies", "artist_collaboration_counts"):
+            assert list(summary[key].items()) == list(legacy_summary[key].items())
+
+        print(
+            f"{size:>9} canciones: original {legacy * 1000:9.1f} ms | "
+            f"columnar {columnar * 1000:9.1f} ms (x{legacy / columnar:.2f}) = "
+            f"columnas {build * 1000:.1f} ms + reducciones {reduce_only * 1000:.1f} ms "
+            f"(x{legacy / reduce_only:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Cliente de Spotify falso, en memoria, para medir el código de `spotify_api` sin red.
+"""
+
+import threading
+import time
+
+from spotify_api import PAGE_SIZE
+
+
+class FakeSpotifyClient:
+    """
+    Implementa `playlist` y `playlist_items` (y `me`) con la misma forma de
+    respuesta que spotipy, sirviendo siempre la misma lista de items.
+
+    Con `latency_s` cada petición espera ese tiempo antes de responder, para
+    simular la latencia de red.
+    """
+
+    def __init__(
+        self,
+        items: list[dict],
+        name: str = "Playlist sintética",
+        snapshot_id: str = "snapshot-0",
+        latency_s: float = 0.0,
+    ):
+        self.items = items
+        self.name = name
+        self.snapshot_id = snapshot_id
+        self.latency_s = latency_s
+        self.num_requests = 0
+        self._lock = threading.Lock()
+
+    def _request(self):
+        with self._lock:
+            self.num_requests += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+
+    def me(self) -> dict:
+        self._request()
+        return {"id": "benchmark"}
+
+    def playlist(self, playlist_id: str, fields: str | None = None, **kwargs) -> dict:
+        self._request()
+        return {"id": playlist_id, "name": self.name, "snapshot_id": self.snapshot_id}
+
+    def playlist_items(
+        self,
+        playlist_id: str,
+        fields: str | None = None,
+        limit: int = PAGE_SIZE,
+        offset: int = 0,
+        **kwargs,
+    ) -> dict:
+        self._request()
+        return {
+            "items": self.items[offset : offset + limit],
+            "total": len(self.items),
+        }
@@ -0,0 +1,373 @@
+"""
+Servidor HTTP local que imita los endpoints de la API de Spotify que usa PlayLab,
+para medir la descarga de playlists sin red y de forma reproducible.
+
+Sirve `/v1/playlists/{id}` (nombre, `snapshot_id` y total de pistas),
+`/v1/playlists/{id}/tracks` o `/items` (paginado con `offset`/`limit`, con
+`total`), `/v1/me`, `/v1/me/playlists` (todas las playlists del servidor,
+paginadas), `/v1/tracks?ids=...`, `/v1/artists?ids=...` (hasta 50) y
+`/v1/albums?ids=...` (hasta 20). Artistas y álbumes se inventan a partir del id
+(géneros, popularidad y fecha deterministas). Las playlists se generan
+(`benchmarks.synthetic`) o se cargan de un JSON grabado con la forma
+{"id", "name", "snapshot_id", "items"}.
+
+Se puede inyectar latencia por petición, respuestas 429 con `Retry-After` y
+fallos 5xx aleatorios.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.fake_server --port 8899 --size 10000 --latency 0.05 --throttle 0.02
+    PLAYLAB_API_BASE_URL=http://127.0.0.1:8899/v1 python terminal_mode.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import make_playlist_items
+
+MAX_PAGE_SIZE = 100
+MAX_ARTISTS_PER_REQUEST = 50
+MAX_ALBUMS_PER_REQUEST = 20
+SYNTHETIC_GENRES = (
+    "pop",
+    "rock",
+    "indie",
+    "hip hop",
+    "electronic",
+    "jazz",
+    "flamenco",
+    "reggaeton",
+    "folk",
+    "classical",
+)
+DEFAULT_PLAYLIST_ID = "fakeplaylist"
+
+
+class FakeSpotifyServer:
+    """
+    Servidor con las playlists de `playlists` (id -> {"name", "snapshot_id",
+    "items"}), que escucha en un hilo propio entre `start()` y `stop()` (o dentro
+    de un bloque `with`).
+
+    - `latency_s`: espera antes de cada respuesta.
+    - `throttle_ratio`: probabilidad de responder 429 con `Retry-After: retry_after_s`.
+    - `failure_ratio`: probabilidad de responder un error 500/502/503.
+    """
+
+    def __init__(
+        self,
+        playlists: dict[str, dict],
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_s: float = 0.0,
+        throttle_ratio: float = 0.0,
+        retry_after_s: float = 1.0,
+        failure_ratio: float = 0.0,
+        seed: int = 0,
+    ):
+        self.playlists = playlists
+        self.latency_s = latency_s
+        self.throttle_ratio = throttle_ratio
+        self.retry_after_s = retry_after_s
+        self.failure_ratio = failure_ratio
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "throttled": 0,
+            "failures": 0,
+            "bytes_sent": 0,
+            "artist_requests": 0,
+            "album_requests": 0,
+        }
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+        self._tracks_by_id = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeSpotifyServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FakeSpotifyServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+    def _draw(self) -> float:
+        with self._lock:
+            return self._rng.random()
+
+    def respond(self, path: str, query: dict[str, list[str]]) -> tuple[int, dict, dict]:
+        """
+        Devuelve (status, cabeceras, cuerpo JSON) para una petición GET.
+        """
+        self._count("requests")
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if self.throttle_ratio and self._draw() < self.throttle_ratio:
+            self._count("throttled")
+            return (
+                429,
+                {"Retry-After": f"{self.retry_after_s:g}"},
+                _error(429, "API rate limit exceeded"),
+            )
+        if self.failure_ratio and self._draw() < self.failure_ratio:
+            self._count("failures")
+            status = (500, 502, 503)[int(self._draw() * 3)]
+            return status, {}, _error(status, "Injected failure")
+
+        parts = path.strip("/").split("/")
+        if parts == ["v1", "me"]:
+            return 200, {}, {"id": "playlab-local", "display_name": "PlayLab"}
+        if parts == ["v1", "me", "playlists"]:
+            offset = int(query.get("offset", ["0"])[0])
+            limit = min(50, int(query.get("limit", ["20"])[0]))
+            playlists = [
+                {
+                    "id": playlist_id,
+                    "name": playlist["name"],
+                    "snapshot_id": playlist["snapshot_id"],
+                    "tracks": {"total": len(playlist["items"])},
+                }
+                for playlist_id, playlist in self.playlists.items()
+            ]
+            return 200, {}, {
+                "items": playlists[offset : offset + limit],
+                "total": len(playlists),
+                "offset": offset,
+                "limit": limit,
+            }
+        if parts == ["v1", "tracks"]:
+            ids = query.get("ids", [""])[0].split(",")
+            if len(ids) > 50:
+                return 400, {}, _error(400, "Too many ids requested")
+            tracks_by_id = self._get_tracks_by_id()
+            return 200, {}, {"tracks": [tracks_by_id.get(i) for i in ids]}
+        if parts == ["v1", "artists"]:
+            ids = query.get("ids", [""])[0].split(",")
+            if len(ids) > MAX_ARTISTS_PER_REQUEST:
+                return 400, {}, _error(400, "Too many ids requested")
+            self._count("artist_requests")
+            return 200, {}, {"artists": [_synthetic_artist(i) for i in ids]}
+        if parts == ["v1", "albums"]:
+            ids = query.get("ids", [""])[0].split(",")
+            if len(ids) > MAX_ALBUMS_PER_REQUEST:
+                return 400, {}, _error(400, "Too many ids requested")
+            self._count("album_requests")
+            return 200, {}, {"albums": [_synthetic_album(i) for i in ids]}
+        if len(parts) in (3, 4) and parts[:2] == ["v1", "playlists"]:
+            playlist = self.playlists.get(parts[2])
+            if playlist is None:
+                return 404, {}, _error(404, "Not found.")
+            if len(parts) == 3:
+                return 200, {}, {
+                    "id": parts[2],
+                    "name": playlist["name"],
+                    "snapshot_id": playlist["snapshot_id"],
+                    "tracks": {"total": len(playlist["items"])},
+                }
+            # Las versiones recientes de spotipy piden /items en lugar de /tracks
+            if parts[3] in ("tracks", "items"):
+                offset = int(query.get("offset", ["0"])[0])
+                limit = min(MAX_PAGE_SIZE, int(query.get("limit", ["100"])[0]))
+                items = playlist["items"]
+                return 200, {}, {
+                    "items": items[offset : offset + limit],
+                    "total": len(items),
+                    "offset": offset,
+                    "limit": limit,
+                }
+        return 404, {}, _error(404, "Service not found")
+
+
+    def _get_tracks_by_id(self) -> dict[str, dict]:
+        with self._lock:
+            if self._tracks_by_id is None:
+                self._tracks_by_id = {
+                    item["track"]["id"]: item["track"]
+                    for playlist in self.playlists.values()
+                    for item in playlist["items"]
+                    if item.get("track") and item["track"].get("id")
+                }
+            return self._tracks_by_id
+
+
+def _synthetic_artist(artist_id: str) -> dict:
+    value = zlib.crc32(artist_id.encode("utf-8"))
+    num_genres = value % 4
+    return {
+        "id": artist_id,
+        "name": f"Artista {artist_id}",
+        "genres": list(
+            dict.fromkeys(
+                SYNTHETIC_GENRES[(value >> (4 * k)) % len(SYNTHETIC_GENRES)]
+                for k in range(num_genres)
+            )
+        ),
+        "popularity": (value >> 8) % 101,
+    }
+
+
+def _synthetic_album(album_id: str) -> dict:
+    value = zlib.crc32(album_id.encode("utf-8"))
+    return {
+        "id": album_id,
+        "name": f"Álbum {album_id}",
+        "release_date": f"{1960 + value % 65}-{1 + (value >> 8) % 12:02d}-01",
+        "release_date_precision": "day",
+    }
+
+
+def _error(status: int, message: str) -> dict:
+    return {"error": {"status": status, "message": message}}
+
+
+def _make_handler(server: FakeSpotifyServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, como la API real
+        # Cabeceras y cuerpo van en escrituras separadas: con Nagle, cada respuesta
+        # esperaría al ACK retardado del cliente (~40 ms)
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            status, headers, body = server.respond(url.path, parse_qs(url.query))
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+            server._count("bytes_sent", len(payload))
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def synthetic_playlists(sizes: list[int], seed: int = 0) -> dict[str, dict]:
+    """
+    Una playlist sintética por tamaño. La primera tiene el id `fakeplaylist` y el
+    resto `fakeplaylist{tamaño}`.
+    """
+    playlists = {}
+    for index, size in enumerate(sizes):
+        playlist_id = DEFAULT_PLAYLIST_ID if index == 0 else f"{DEFAULT_PLAYLIST_ID}{size}"
+        playlists[playlist_id] = {
+            "name": f"Playlist sintética de {size} canciones",
+            "snapshot_id": f"snapshot-{seed}-{size}",
+            "items": make_playlist_items(size, seed=seed),
+        }
+    return playlists
+
+
+def synthetic_library(
+    num_playlists: int, playlist_size: int, num_tracks: int, seed: int = 0
+) -> dict[str, dict]:
+    """
+    Biblioteca sintética: `num_playlists` playlists de `playlist_size` pistas
+    escogidas de un mismo catálogo de `num_tracks`, de modo que se repiten entre
+    playlists. Ids `library0`, `library1`...
+    """
+    rng = random.Random(seed)
+    catalog = make_playlist_items(num_tracks, seed=seed)
+    return {
+        f"library{index}": {
+            "name": f"Playlist de biblioteca {index}",
+            "snapshot_id": f"snapshot-{seed}-library{index}",
+            "items": rng.sample(catalog, min(playlist_size, num_tracks)),
+        }
+        for index in range(num_playlists)
+    }
+
+
+def load_recorded_playlist(path: str) -> tuple[str, dict]:
+    with open(path, encoding="utf-8") as f:
+        recorded = json.load(f)
+    return recorded["id"], {
+        "name": recorded["name"],
+        "snapshot_id": recorded["snapshot_id"],
+        "items": recorded["items"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8899)
+    parser.add_argument("--size", type=int, nargs="+", default=[10_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--library",
+        type=int,
+        nargs=3,
+        metavar=("PLAYLISTS", "TAMAÑO", "CATÁLOGO"),
+        help="Añade una biblioteca sintética con pistas repetidas entre playlists",
+    )
+    parser.add_argument(
+        "--recorded", nargs="*", default=[], help="JSON de playlists grabadas"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos")
+    parser.add_argument("--throttle", type=float, default=0.0, help="Proporción de 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Segundos")
+    parser.add_argument("--failures", type=float, default=0.0, help="Proporción de 5xx")
+    args = parser.parse_args()
+
+    playlists = synthetic_playlists(args.size, args.seed)
+    if args.library:
+        playlists.update(synthetic_library(*args.library, seed=args.seed))
+    for path in args.recorded:
+        playlist_id, playlist = load_recorded_playlist(path)
+        playlists[playlist_id] = playlist
+
+    server = FakeSpotifyServer(
+        playlists,
+        host=args.host,
+        port=args.port,
+        latency_s=args.latency,
+        throttle_ratio=args.throttle,
+        retry_after_s=args.retry_after,
+        failure_ratio=args.failures,
+        seed=args.seed,
+    )
+    print(f"Sirviendo en {server.base_url} las playlists: {', '.join(playlists)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+        print(f"Peticiones: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Prueba de carga del servicio de análisis (`analysis_service`) contra el servidor
+local de `fake_server`, sin red.
+
+1. Ráfaga en frío: todos los clientes piden a la vez la misma playlist, que se
+   debe descargar una sola vez (peticiones agrupadas).
+2. Carga mixta: `--requests` peticiones repartidas entre las playlists con
+   popularidad Zipf (`--skew`). A mitad de la prueba cambia el `snapshot_id` de
+   la playlist más pedida, que se debe volver a descargar una vez.
+
+Muestra el rendimiento y las latencias vistos por los clientes, las métricas
+de `/metrics` (aciertos, agrupadas, expulsiones) y las peticiones que llegaron
+a la API falsa.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.load_service --playlists 30 --size 2000 --clients 16 --requests 2000
+"""
+
+import argparse
+import itertools
+import json
+import logging
+import os
+import random
+import statistics
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_server import FakeSpotifyServer, synthetic_playlists
+from rate_limiter import configure_scheduler
+
+
+def fetch_json(url: str) -> tuple[float, str, dict]:
+    """
+    Devuelve (segundos, cabecera X-PlayLab-Cache, cuerpo) de una petición GET.
+    """
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as response:
+        body = json.loads(response.read())
+        outcome = response.headers.get("X-PlayLab-Cache", "")
+    return time.perf_counter() - start, outcome, body
+
+
+def print_latencies(label: str, latencies: list[float], elapsed: float):
+    latencies = sorted(latencies)
+    print(
+        f"{label:<22} {len(latencies):6d} peticiones en {elapsed:6.2f} s "
+        f"({len(latencies) / elapsed:8.1f}/s) | p50 "
+        f"{statistics.median(latencies) * 1000:7.2f} ms | p95 "
+        f"{latencies[int(0.95 * (len(latencies) - 1))] * 1000:7.2f} ms | máx "
+        f"{latencies[-1] * 1000:7.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--playlists", type=int, default=30)
+    parser.add_argument("--size", type=int, default=2000, help="Pistas por playlist")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--skew", type=float, default=1.1, help="Exponente Zipf")
+    parser.add_argument(
+        "--max-entries", type=int, default=10, help="Playlists en la caché del servicio"
+    )
+    parser.add_argument("--latency", type=float, default=0.02, help="Segundos")
+    parser.add_argument("--no-enrich", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    # Tamaños distintos para que cada playlist tenga su propio id
+    playlists = synthetic_playlists(
+        [args.size + i for i in range(args.playlists)], seed=args.seed
+    )
+    playlist_ids = list(playlists)
+    server = FakeSpotifyServer(playlists, latency_s=args.latency)
+    # Presupuesto ilimitado: se mide el servicio, no el límite de peticiones
+    configure_scheduler(1e9, 1_000_000)
+
+    with server, tempfile.TemporaryDirectory() as cache_dir:
+        os.environ["PLAYLAB_API_BASE_URL"] = server.base_url
+        # Las cachés en disco se crean en el directorio de trabajo
+        os.chdir(cache_dir)
+
+        from analysis_service import AnalysisServer, AnalysisService
+        from spotify_api import create_spotify_client
+
+        service = AnalysisService(
+            create_spotify_client(),
+            max_entries=args.max_entries,
+            enrich=not args.no_enrich,
+        )
+        with AnalysisServer(service, port=0) as analysis_server, ThreadPoolExecutor(
+            args.clients
+        ) as executor:
+            base_url = analysis_server.base_url
+            print(
+                f"Servicio {base_url} | {args.playlists} playlists de ~{args.size} "
+                f"pistas | {args.clients} clientes | latencia de la API {args.latency} s"
+            )
+
+            # 1. Ráfaga en frío sobre una sola playlist
+            requests_before = server.stats["requests"]
+            start = time.perf_counter()
+            burst = list(
+                executor.map(
+                    lambda _: fetch_json(f"{base_url}/playlists/{playlist_ids[0]}"),
+                    range(args.clients),
+                )
+            )
+            elapsed = time.perf_counter() - start
+            print_latencies("ráfaga en frío", [r[0] for r in burst], elapsed)
+            outcomes = [r[1] for r in burst]
+            print(
+                f"  {outcomes.count('miss')} descarga(s), {outcomes.count('coalesced')} "
+                f"agrupadas, {server.stats['requests'] - requests_before} peticiones "
+                f"a la API"
+            )
+
+            # 2. Carga mixta con popularidad Zipf
+            rng = random.Random(args.seed)
+            weights = list(
+                itertools.accumulate(
+                    1 / (rank**args.skew) for rank in range(1, args.playlists + 1)
+                )
+            )
+            targets = rng.choices(playlist_ids, cum_weights=weights, k=args.requests)
+            counter = itertools.count()
+
+            def request(playlist_id: str) -> float:
+                if next(counter) == args.requests // 2:
+                    playlists[playlist_ids[0]]["snapshot_id"] += "-v2"
+                return fetch_json(f"{base_url}/playlists/{playlist_id}")[0]
+
+            requests_before = server.stats["requests"]
+            start = time.perf_counter()
+            latencies = list(executor.map(request, targets))
+            print_latencies("carga mixta", latencies, time.perf_counter() - start)
+            print(f"  {server.stats['requests'] - requests_before} peticiones a la API")
+
+            _, _, metrics = fetch_json(f"{base_url}/metrics")
+            print(
+                f"Servicio: {metrics['requests']} peticiones, {metrics['hits']} aciertos, "
+                f"{metrics['misses']} descargas, {metrics['coalesced']} agrupadas, "
+                f"{metrics['errors']} errores | tasa de aciertos "
+                f"{metrics['hit_rate']:.1%} | {metrics['evictions']} expulsiones"
+            )
+            print(f"Latencias del servicio (ms): {metrics['latency_ms']}")
+    print(f"API falsa: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
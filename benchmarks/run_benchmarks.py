@@ -0,0 +1,216 @@
+"""
+Suite de benchmarks sin red de PlayLab sobre playlists sintéticas.
+
+Para cada tamaño mide el tiempo (mínimo y mediana de varias repeticiones) y el
+pico de memoria (tracemalloc, en una ejecución aparte) de:
+- `parse`: `get_playlist_tracks` contra un cliente falso en memoria.
+- `calculate_stats`: `Playlist._calculate_stats` sobre una playlist nueva.
+- `format_duration_ms`: formatear la duración de todas las canciones.
+- `get_summary`: `Playlist.get_summary` con las estadísticas ya calculadas.
+- `gui_display`: `PlayLabApp._display_summary` (construcción de las tarjetas).
+
+Los resultados se pueden guardar en JSON (`--output`) y comparar con una
+ejecución anterior (`--compare`).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.run_benchmarks --sizes 100 10000 1000000 --output resultados.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.fake_client import FakeSpotifyClient
+from benchmarks.synthetic import (
+    DEFAULT_ALBUM_SKEW,
+    DEFAULT_COLLAB_RATIO,
+    DEFAULT_EXPLICIT_RATIO,
+    DEFAULT_MAX_ARTISTS_PER_SONG,
+    make_playlist_items,
+)
+from playlist_analyzer import Playlist
+from rate_limiter import configure_scheduler
+from spotify_api import get_playlist_tracks
+from utils import format_duration_ms
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+
+
+def measure(func, setup=None, repeat: int = 3) -> dict:
+    """
+    Ejecuta `func(setup())` `repeat` veces midiendo el tiempo y una vez más con
+    tracemalloc para el pico de memoria. `setup` no cuenta en la medida.
+    """
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup else None
+        start = time.perf_counter()
+        func(argument)
+        timings.append(time.perf_counter() - start)
+
+    argument = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func(argument)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_s_min": min(timings),
+        "wall_s_median": statistics.median(timings),
+        "peak_bytes": peak,
+        "repeat": repeat,
+    }
+
+
+def _gui_window():
+    """
+    Ventana de PlayLab sin mostrar (plataforma Qt offscreen si no hay otra).
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+
+    from gui_app import PlayLabApp
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    return app, PlayLabApp()
+
+
+def run_size(size: int, args, gui) -> list[dict]:
+    items = make_playlist_items(
+        size,
+        seed=args.seed,
+        collab_ratio=args.collab_ratio,
+        max_artists_per_song=args.max_artists_per_song,
+        album_skew=args.album_skew,
+        explicit_ratio=args.explicit_ratio,
+    )
+    client = FakeSpotifyClient(items)
+    songs = get_playlist_tracks(client, "bench")
+    durations = [song.duration_ms for song in songs]
+    repeat = args.repeat
+
+    def stats_playlist() -> Playlist:
+        playlist = Playlist("bench", client.name, songs)
+        playlist._calculate_stats()
+        return playlist
+
+    cases = {
+        "parse": measure(
+            lambda _: get_playlist_tracks(client, "bench"), repeat=repeat
+        ),
+        "calculate_stats": measure(
+            lambda playlist: playlist._calculate_stats(),
+            setup=lambda: Playlist("bench", client.name, songs),
+            repeat=repeat,
+        ),
+        "format_duration_ms": measure(
+            lambda _: [format_duration_ms(duration) for duration in durations],
+            repeat=repeat,
+        ),
+        "get_summary": measure(
+            lambda playlist: playlist.get_summary(),
+            setup=stats_playlist,
+            repeat=repeat,
+        ),
+    }
+
+    if gui is not None:
+        app, window = gui
+        summary = stats_playlist().get_summary()
+
+        def clear_window():
+            from PyQt5.QtCore import QCoreApplication, QEvent
+
+            window.clear_results_display()
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+            return summary
+
+        cases["gui_display"] = measure(
+            window._display_summary, setup=clear_window, repeat=repeat
+        )
+
+    return [{"size": size, "case": case, **result} for case, result in cases.items()]
+
+
+def print_results(results: list[dict], baseline: dict | None):
+    for result in results:
+        line = (
+            f"{result['size']:>9} {result['case']:<20} "
+            f"{result['wall_s_min'] * 1000:10.2f} ms (mediana "
+            f"{result['wall_s_median'] * 1000:.2f} ms) | pico "
+            f"{result['peak_bytes'] / 1024 / 1024:8.2f} MiB"
+        )
+        previous = (baseline or {}).get((result["size"], result["case"]))
+        if previous:
+            line += (
+                f" | x{result['wall_s_min'] / previous['wall_s_min']:.2f} tiempo, "
+                f"x{result['peak_bytes'] / max(1, previous['peak_bytes']):.2f} memoria"
+            )
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--collab-ratio", type=float, default=DEFAULT_COLLAB_RATIO)
+    parser.add_argument(
+        "--max-artists-per-song", type=int, default=DEFAULT_MAX_ARTISTS_PER_SONG
+    )
+    parser.add_argument("--album-skew", type=float, default=DEFAULT_ALBUM_SKEW)
+    parser.add_argument("--explicit-ratio", type=float, default=DEFAULT_EXPLICIT_RATIO)
+    parser.add_argument("--no-gui", action="store_true", help="No medir la GUI")
+    parser.add_argument("--output", help="Fichero JSON donde guardar los resultados")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior")
+    args = parser.parse_args()
+
+    # El cliente falso no tiene límite de peticiones: no se mide el planificador
+    configure_scheduler(requests_per_second=1e9, burst=1_000_000)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = {
+                (result["size"], result["case"]): result
+                for result in json.load(f)["results"]
+            }
+
+    gui = None if args.no_gui else _gui_window()
+    results = []
+    for size in args.sizes:
+        size_results = run_size(size, args, gui)
+        print_results(size_results, baseline)
+        results.extend(size_results)
+
+    if args.output:
+        report = {
+            "metadata": {
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "parameters": {
+                    key: value
+                    for key, value in vars(args).items()
+                    if key not in ("output", "compare")
+                },
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Generación de playlists sintéticas reproducibles para los benchmarks.
+
+Además del tamaño, se puede ajustar la forma de la playlist:
+- `collab_ratio` y `max_artists_per_song`: proporción de canciones con varios
+  artistas y cuántos como máximo.
+- `album_skew`: exponente Zipf del reparto de canciones entre álbumes (0 es
+  uniforme; valores mayores concentran más canciones en pocos álbumes).
+- `explicit_ratio`: proporción de canciones explícitas.
+"""
+
+import itertools
+import random
+from collections.abc import Iterator
+
+from artist import Artist
+from song import Song
+
+DEFAULT_COLLAB_RATIO = 0.25
+DEFAULT_MAX_ARTISTS_PER_SONG = 4
+DEFAULT_ALBUM_SKEW = 0.0
+DEFAULT_EXPLICIT_RATIO = 0.2
+
+
+def _track_specs(
+    num_songs: int,
+    num_artists: int | None,
+    num_albums: int | None,
+    seed: int,
+    collab_ratio: float,
+    max_artists_per_song: int,
+    album_skew: float,
+    explicit_ratio: float,
+) -> Iterator[tuple[int, list[int], int, int, bool]]:
+    """
+    Produce, por canción: posición, números de sus artistas, número de álbum,
+    duración en ms y si es explícita.
+    """
+    rng = random.Random(seed)
+    num_artists = num_artists or max(1, num_songs // 10)
+    num_albums = num_albums or max(1, num_songs // 12)
+    album_weights = None
+    if album_skew > 0:
+        album_weights = list(
+            itertools.accumulate(
+                1 / (rank**album_skew) for rank in range(1, num_albums + 1)
+            )
+        )
+
+    for i in range(num_songs):
+        credits = (
+            rng.randint(2, max_artists_per_song)
+            if max_artists_per_song > 1 and rng.random() >= 1 - collab_ratio
+            else 1
+        )
+        artist_numbers = [rng.randrange(num_artists) for _ in range(credits)]
+        if album_weights is None:
+            album_number = rng.randrange(num_albums)
+        else:
+            album_number = rng.choices(
+                range(num_albums), cum_weights=album_weights
+            )[0]
+        yield (
+            i,
+            artist_numbers,
+            album_number,
+            rng.randint(30_000, 420_000),
+            rng.random() < explicit_ratio,
+        )
+
+
+def make_songs(
+    num_songs: int,
+    num_artists: int | None = None,
+    num_albums: int | None = None,
+    seed: int = 0,
+    collab_ratio: float = DEFAULT_COLLAB_RATIO,
+    max_artists_per_song: int = DEFAULT_MAX_ARTISTS_PER_SONG,
+    album_skew: float = DEFAULT_ALBUM_SKEW,
+    explicit_ratio: float = DEFAULT_EXPLICIT_RATIO,
+) -> list[Song]:
+    """
+    Genera `num_songs` canciones con artistas, álbumes y duraciones aleatorias
+    pero deterministas para una misma semilla.
+    """
+    num_artists = num_artists or max(1, num_songs // 10)
+    artists = [Artist(id=f"artist{i}", name=f"Artista {i}") for i in range(num_artists)]
+    return [
+        Song(
+            id=f"track{i}",
+            title=f"Canción {i}",
+            artists=[artists[n] for n in artist_numbers],
+            album=f"Álbum {album_number}",
+            duration_ms=duration_ms,
+            explicit=explicit,
+            album_id=f"album{album_number}",
+        )
+        for i, artist_numbers, album_number, duration_ms, explicit in _track_specs(
+            num_songs,
+            num_artists,
+            num_albums,
+            seed,
+            collab_ratio,
+            max_artists_per_song,
+            album_skew,
+            explicit_ratio,
+        )
+    ]
+
+
+def make_playlist_items(
+    num_songs: int,
+    num_artists: int | None = None,
+    num_albums: int | None = None,
+    seed: int = 0,
+    collab_ratio: float = DEFAULT_COLLAB_RATIO,
+    max_artists_per_song: int = DEFAULT_MAX_ARTISTS_PER_SONG,
+    album_skew: float = DEFAULT_ALBUM_SKEW,
+    explicit_ratio: float = DEFAULT_EXPLICIT_RATIO,
+) -> list[dict]:
+    """
+    Genera items con la forma de las respuestas de `playlist_items`. Como al
+    decodificar JSON, cada item tiene sus propias cadenas aunque el artista o el
+    álbum se repitan.
+    """
+    return [
+        {
+            "track": {
+                "id": f"track{i}",
+                "name": f"Canción {i}",
+                "artists": [
+                    {"id": f"artist{n}", "name": f"Artista {n}"}
+                    for n in artist_numbers
+                ],
+                "album": {
+                    "id": f"album{album_number}",
+                    "name": f"Álbum {album_number}",
+                },
+                "duration_ms": duration_ms,
+                "explicit": explicit,
+            }
+        }
+        for i, artist_numbers, album_number, duration_ms, explicit in _track_specs(
+            num_songs,
+            num_artists,
+            num_albums,
+            seed,
+            collab_ratio,
+            max_artists_per_song,
+            album_skew,
+            explicit_ratio,
+        )
+    ]
@@ -0,0 +1,175 @@
+# collaboration_graph.py
+
+from collections.abc import Iterable
+
+import numpy as np
+
+from artist import Artist
+from playlist_columns import _artist_credits
+from song import Song
+
+
+class CollaborationGraph:
+    """
+    Grafo de colaboraciones entre artistas, identificados por su id: dos artistas
+    están unidos si aparecen juntos en alguna canción, con un peso igual al número
+    de canciones que comparten.
+
+    Se guarda como una matriz dispersa de coocurrencias, nunca como una matriz
+    N×N:
+    - COO del triángulo superior (`pair_rows`, `pair_cols`, `pair_weights`), una
+      entrada por pareja, ordenada por (fila, columna);
+    - CSR simétrica para los vecinos de cada artista.
+
+    Los códigos de artista se asignan por orden de primera aparición.
+    """
+
+    def __init__(
+        self,
+        artist_ids: list[str],
+        artist_names: list[str],
+        artist_codes: np.ndarray,
+        artist_offsets: np.ndarray,
+    ):
+        """
+        Construye el grafo a partir de los créditos en formato CSR: los artistas
+        de la canción i son `artist_codes[artist_offsets[i]:artist_offsets[i + 1]]`,
+        sin repetidos dentro de una misma canción.
+        """
+        self.artist_ids = artist_ids
+        self.artist_names = artist_names
+        self._index = {artist_id: code for code, artist_id in enumerate(artist_ids)}
+        num_artists = len(artist_ids)
+
+        # Cada pareja (a, b) con a < b se codifica como a * num_artists + b. Las
+        # canciones se agrupan por número de artistas para generar sus parejas
+        # con una sola operación vectorizada por grupo.
+        artists_per_song = np.diff(artist_offsets)
+        pair_keys = []
+        for k in np.unique(artists_per_song[artists_per_song > 1]).tolist():
+            starts = artist_offsets[:-1][artists_per_song == k]
+            credits = artist_codes[starts[:, None] + np.arange(k)]
+            first, second = np.triu_indices(k, 1)
+            a = credits[:, first].ravel()
+            b = credits[:, second].ravel()
+            pair_keys.append(np.minimum(a, b) * num_artists + np.maximum(a, b))
+        keys, weights = np.unique(
+            np.concatenate(pair_keys) if pair_keys else np.empty(0, dtype=np.int64),
+            return_counts=True,
+        )
+        self.pair_rows = keys // max(num_artists, 1)
+        self.pair_cols = keys % max(num_artists, 1)
+        self.pair_weights = weights
+
+        # CSR simétrica: los vecinos del artista c son
+        # _neighbor_codes[_neighbor_offsets[c]:_neighbor_offsets[c + 1]]
+        sources = np.concatenate((self.pair_rows, self.pair_cols))
+        order = np.argsort(sources, kind="stable")
+        self._neighbor_codes = np.concatenate((self.pair_cols, self.pair_rows))[order]
+        self._neighbor_weights = np.concatenate((weights, weights))[order]
+        self._neighbor_offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(sources, minlength=num_artists)))
+        )
+        self._components = None
+
+    @classmethod
+    def from_songs(cls, songs: Iterable[Song]) -> "CollaborationGraph":
+        """
+        Grafo de las canciones dadas. Un artista acreditado dos veces en la misma
+        canción cuenta una sola vez.
+        """
+        return cls(*_artist_credits(songs))
+
+    @property
+    def num_artists(self) -> int:
+        return len(self.artist_ids)
+
+    @property
+    def num_pairs(self) -> int:
+        return len(self.pair_weights)
+
+    def _artist(self, code: int) -> Artist:
+        return Artist(self.artist_ids[code], self.artist_names[code])
+
+    def top_pairs(self, n: int = 10) -> list[tuple[Artist, Artist, int]]:
+        """
+        Las `n` parejas que más canciones comparten, como (artista, artista,
+        canciones), de más a menos. Los empates se resuelven por orden de primera
+        aparición de los artistas.
+        """
+        weights = self.pair_weights
+        if n <= 0 or not len(weights):
+            return []
+        if n < len(weights):
+            # Selección parcial en O(E): las parejas por encima del n-ésimo peso y
+            # los primeros empates con él
+            kth = np.partition(weights, len(weights) - n)[len(weights) - n]
+            above = np.flatnonzero(weights > kth)
+            ties = np.flatnonzero(weights == kth)[: n - len(above)]
+            candidates = np.concatenate((above, ties))
+        else:
+            candidates = np.arange(len(weights))
+        candidates = candidates[np.lexsort((candidates, -weights[candidates]))]
+        return [
+            (self._artist(row), self._artist(col), weight)
+            for row, col, weight in zip(
+                self.pair_rows[candidates].tolist(),
+                self.pair_cols[candidates].tolist(),
+                weights[candidates].tolist(),
+            )
+        ]
+
+    def neighbors(self, artist_id: str) -> list[tuple[Artist, int]]:
+        """
+        Artistas que han colaborado con `artist_id`, con el número de canciones
+        compartidas, de más a menos.
+        """
+        code = self._index.get(artist_id)
+        if code is None:
+            raise KeyError(f"El artista {artist_id} no aparece en el grafo")
+        start, end = self._neighbor_offsets[code], self._neighbor_offsets[code + 1]
+        codes = self._neighbor_codes[start:end]
+        weights = self._neighbor_weights[start:end]
+        order = np.lexsort((codes, -weights))
+        return [
+            (self._artist(neighbor), weight)
+            for neighbor, weight in zip(codes[order].tolist(), weights[order].tolist())
+        ]
+
+    def connected_components(self) -> list[list[Artist]]:
+        """
+        Grupos de artistas conectados por colaboraciones (directas o a través de
+        otros artistas), del más grande al más pequeño. Los artistas sin ninguna
+        colaboración no forman parte de ningún grupo.
+
+        Se calculan con union-find sobre las parejas, en O(E · α(N)).
+        """
+        if self._components is None:
+            parent = list(range(self.num_artists))
+            size = [1] * self.num_artists
+
+            def find(code: int) -> int:
+                while parent[code] != code:
+                    parent[code] = parent[parent[code]]  # compresión por mitades
+                    code = parent[code]
+                return code
+
+            for a, b in zip(self.pair_rows.tolist(), self.pair_cols.tolist()):
+                root_a, root_b = find(a), find(b)
+                if root_a != root_b:
+                    if size[root_a] < size[root_b]:
+                        root_a, root_b = root_b, root_a
+                    parent[root_b] = root_a
+                    size[root_a] += size[root_b]
+
+            groups = {}
+            for code in np.flatnonzero(np.diff(self._neighbor_offsets)).tolist():
+                groups.setdefault(find(code), []).append(code)
+            self._components = sorted(groups.values(), key=len, reverse=True)
+        return [[self._artist(code) for code in group] for group in self._components]
+
+    def __repr__(self) -> str:
+        return (
+            f"CollaborationGraph(num_artists={self.num_artists}, "
+            f"num_pairs={self.num_pairs})"
+        )
@@ -0,0 +1,265 @@
+# enrichment.py
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import spotipy
+
+import instrumentation
+from playlist_analyzer import Playlist
+from rate_limiter import get_scheduler
+from spotify_api import DEFAULT_MAX_WORKERS
+from track_cache import CACHE_PATH
+
+# Máximo de ids por petición que admite la API en /artists y /albums
+ARTISTS_BATCH_SIZE = 50
+ALBUMS_BATCH_SIZE = 20
+# Los géneros, la popularidad o la fecha de un álbum cambian poco: se reutilizan
+# durante una semana antes de volver a pedirlos
+DEFAULT_TTL_S = 7 * 24 * 3600
+# Ids por consulta al leer de la caché (por debajo del límite de parámetros de SQLite)
+_CACHE_QUERY_CHUNK = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS enrichment (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    data TEXT,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (kind, id)
+) WITHOUT ROWID;
+"""
+
+
+class EnrichmentCache:
+    """
+    Caché en disco (SQLite) de los datos de artistas y álbumes, por id, con
+    caducidad: una entrada guardada hace más de `ttl_s` segundos se ignora y se
+    vuelve a pedir.
+
+    También se guardan los ids que la API no reconoce (con datos nulos), para no
+    pedirlos de nuevo en cada análisis.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl_s: float = DEFAULT_TTL_S):
+        self.path = path
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, kind: str, ids: list[str]) -> dict[str, dict | None]:
+        """
+        Entradas vigentes de tipo `kind` ("artists" o "albums") para los ids
+        dados. Los ids que faltan en el resultado hay que pedirlos a la API.
+        """
+        oldest = time.time() - self.ttl_s
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), _CACHE_QUERY_CHUNK):
+                chunk = ids[start : start + _CACHE_QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT id, data FROM enrichment WHERE kind = ? "
+                    f"AND fetched_at >= ? AND id IN ({placeholders})",
+                    (kind, oldest, *chunk),
+                ).fetchall()
+                for item_id, data in rows:
+                    found[item_id] = json.loads(data) if data is not None else None
+        return found
+
+    def put(self, kind: str, entries: dict[str, dict | None]):
+        """
+        Guarda (o renueva) las entradas de tipo `kind`, con la hora actual.
+        """
+        now = time.time()
+        rows = [
+            (
+                kind,
+                item_id,
+                json.dumps(data, ensure_ascii=False) if data is not None else None,
+                now,
+            )
+            for item_id, data in entries.items()
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO enrichment VALUES (?, ?, ?, ?)", rows
+            )
+
+    def purge_expired(self) -> int:
+        """
+        Borra las entradas caducadas y devuelve cuántas había.
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM enrichment WHERE fetched_at < ?",
+                (time.time() - self.ttl_s,),
+            )
+        return cursor.rowcount
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """
+    Devuelve la caché compartida por defecto, abriéndola en el primer uso.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = EnrichmentCache()
+        return _default_cache
+
+
+class Enrichment:
+    """
+    Datos de los artistas y álbumes de una playlist, por id:
+    - `artists`: {"name", "genres", "popularity"}
+    - `albums`: {"name", "release_date"}
+
+    `num_requests` es el número de peticiones hechas a la API y `num_cached` el
+    de ids que se resolvieron desde la caché.
+    """
+
+    def __init__(
+        self,
+        artists: dict[str, dict],
+        albums: dict[str, dict],
+        num_requests: int = 0,
+        num_cached: int = 0,
+    ):
+        self.artists = artists
+        self.albums = albums
+        self.num_requests = num_requests
+        self.num_cached = num_cached
+
+    def __repr__(self) -> str:
+        return (
+            f"Enrichment(artists={len(self.artists)}, albums={len(self.albums)}, "
+            f"num_requests={self.num_requests}, num_cached={self.num_cached})"
+        )
+
+
+def _artist_data(artist: dict) -> dict:
+    return {
+        "name": artist.get("name"),
+        "genres": artist.get("genres") or [],
+        "popularity": artist.get("popularity"),
+    }
+
+
+def _album_data(album: dict) -> dict:
+    return {"name": album.get("name"), "release_date": album.get("release_date")}
+
+
+def _fetch_batch(
+    sp_client: spotipy.Spotify, kind: str, ids: list[str]
+) -> dict[str, dict | None]:
+    """
+    Pide un lote de artistas o álbumes en una sola petición. Los ids que la API
+    no devuelve quedan con None.
+    """
+    with instrumentation.span("fetch.enrichment"):
+        if kind == "artists":
+            response = get_scheduler().call(sp_client.artists, ids)
+        else:
+            response = get_scheduler().call(sp_client.albums, ids)
+    instrumentation.increment("enrichment_requests")
+    to_data = _artist_data if kind == "artists" else _album_data
+    entries = dict.fromkeys(ids)
+    for item in response.get(kind) or []:
+        if item and item.get("id") in entries:
+            entries[item["id"]] = to_data(item)
+    return entries
+
+
+def enrich_playlist(
+    sp_client: spotipy.Spotify,
+    playlist: Playlist,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    cache: EnrichmentCache | None = None,
+) -> Enrichment:
+    """
+    Completa la playlist con los géneros y la popularidad de sus artistas y la
+    fecha de publicación de sus álbumes, que pasan a formar parte de sus
+    estadísticas (`genre_counts`, `release_year_counts`, `artist_popularity`...).
+
+    1. Reúne los ids únicos de artistas y álbumes.
+    2. Toma de la caché los que siguen vigentes.
+    3. Pide el resto en lotes del tamaño máximo de cada endpoint, a la vez.
+    4. Guarda lo descargado en la caché.
+    """
+    cache = cache or get_enrichment_cache()
+    songs = playlist.songs
+    wanted = {
+        "artists": list(
+            dict.fromkeys(
+                artist.id
+                for song in songs
+                for artist in song.artists
+                if artist.id and artist.id != "unknown"
+            )
+        ),
+        "albums": list(
+            dict.fromkeys(song.album_id for song in songs if song.album_id)
+        ),
+    }
+    batch_sizes = {"artists": ARTISTS_BATCH_SIZE, "albums": ALBUMS_BATCH_SIZE}
+
+    found = {}
+    tasks = []
+    for kind, ids in wanted.items():
+        found[kind] = cache.get(kind, ids)
+        missing = [item_id for item_id in ids if item_id not in found[kind]]
+        size = batch_sizes[kind]
+        tasks.extend(
+            (kind, missing[start : start + size]) for start in range(0, len(missing), size)
+        )
+    num_cached = sum(len(entries) for entries in found.values())
+
+    if tasks:
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                results = list(
+                    executor.map(
+                        lambda task: (task[0], _fetch_batch(sp_client, *task)), tasks
+                    )
+                )
+        except spotipy.SpotifyException as e:
+            logging.error(
+                f"Error de Spotify al enriquecer la playlist {playlist.id}: {e}"
+            )
+            raise
+        for kind, entries in results:
+            cache.put(kind, entries)
+            found[kind].update(entries)
+
+    enrichment = Enrichment(
+        artists={k: v for k, v in found["artists"].items() if v is not None},
+        albums={k: v for k, v in found["albums"].items() if v is not None},
+        num_requests=len(tasks),
+        num_cached=num_cached,
+    )
+    playlist.apply_enrichment(enrichment.artists, enrichment.albums)
+    logging.info(
+        "Playlist %s enriquecida: %d artistas y %d álbumes (%d desde caché, %d peticiones).",
+        playlist.id,
+        len(wanted["artists"]),
+        len(wanted["albums"]),
+        num_cached,
+        len(tasks),
+    )
+    return enrichment
@@ -1,4 +1,9 @@
+import html
+import logging
+import os
 import sys
+import time
+from collections import Counter, OrderedDict
 from PyQt5.QtWidgets import (
     QApplication,
     QWidget,
@@ -10,18 +15,139 @@ from PyQt5.QtWidgets import (
     QLabel,
     QMessageBox,
     QDialog,
-    QListWidget,
+    QTableView,
+    QAbstractItemView,
+    QHeaderView,
     QScrollArea,
     QFrame,
     QSizePolicy,
+    QFileDialog,
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
-from spotify_api import get_playlist_data, sp_user
-from playlist_analyzer import Playlist
+from PyQt5.QtCore import Qt, QThread, pyqtSignal
+from spotify_api import (
+    FetchCancelled,
+    get_playlist_data,
+    get_spotify_client,
+)
+from enrichment import enrich_playlist
+from logging_config import configure_logging
+from playlist_analyzer import Playlist, PlaylistStatsAccumulator
+from playlist_diff import diff_playlists, format_diff
+from playlist_snapshot import PlaylistSnapshot, save_snapshot
+from gui_models import ArtistFrequencyModel, TrackTableModel
+import instrumentation
 from utils import format_duration_ms
 import re
 
+# Versiones anteriores que se guardan en memoria para mostrar los cambios al volver
+# a analizar una playlist; al pasarse se olvida la analizada hace más tiempo
+MAX_PREVIOUS_PLAYLISTS = 5
+
+
+class AnalysisWorker(QThread):
+    """
+    Descarga la playlist y calcula sus estadísticas fuera del hilo de la interfaz.
+    Las estadísticas de Playlist se calculan al leerlas, así que antes de emitir
+    `succeeded` se fuerzan aquí (resumen, grafo de colaboraciones y diff con
+    `previous`, si lo hay): el hilo de la interfaz solo construye las tarjetas.
+    Tras cada página emite el progreso y, como mucho cada PARTIAL_INTERVAL_S
+    segundos, un resumen parcial de las canciones cargadas hasta el momento.
+    """
+
+    PARTIAL_INTERVAL_S = 0.3
+
+    progress = pyqtSignal(int, int)  # pistas cargadas, total
+    partial_summary = pyqtSignal(dict)
+    # Playlist, su resumen y el PlaylistDiff con `previous` (o None)
+    succeeded = pyqtSignal(object, object, object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(
+        self, sp_client, playlist_id: str, previous: Playlist | None = None, parent=None
+    ):
+        super().__init__(parent)
+        self.sp_client = sp_client
+        self.playlist_id = playlist_id
+        self.previous = previous  # Análisis anterior de la misma playlist
+
+    def run(self):
+        accumulator = PlaylistStatsAccumulator("")
+        last_partial = 0.0
+
+        def on_page(page_songs, loaded: int, total: int):
+            nonlocal last_partial
+            if self.isInterruptionRequested():
+                raise FetchCancelled()
+            accumulator.add_songs(page_songs)
+            self.progress.emit(loaded, total)
+            now = time.monotonic()
+            if loaded < total and now - last_partial >= self.PARTIAL_INTERVAL_S:
+                last_partial = now
+                summary = accumulator.get_summary()
+                # Copias: los contadores siguen cambiando en este hilo
+                summary["artist_frequencies"] = Counter(summary["artist_frequencies"])
+                summary["artist_collaboration_counts"] = Counter(
+                    summary["artist_collaboration_counts"]
+                )
+                self.partial_summary.emit(summary)
+
+        try:
+            playlist = get_playlist_data(
+                self.sp_client, self.playlist_id, progress_callback=on_page
+            )
+        except FetchCancelled:
+            self.cancelled.emit()
+            return
+        except Exception as e:
+            import traceback
+
+            traceback.print_exc()
+            self.failed.emit(str(e))
+            return
+        if playlist.num_songs and not self.isInterruptionRequested():
+            # Sin géneros ni popularidad el resto del análisis sigue siendo válido
+            try:
+                enrich_playlist(self.sp_client, playlist)
+            except Exception as e:
+                logging.warning(f"No se pudo enriquecer la playlist {playlist.id}: {e}")
+
+        with instrumentation.span("gui.prepare"):
+            playlist._calculate_stats()
+            summary = playlist.get_summary()
+            playlist.collaboration_graph.connected_components()
+            # También si la playlist se ha quedado vacía: el diff lista lo eliminado
+            diff = (
+                diff_playlists(self.previous, playlist)
+                if self.previous is not None
+                else None
+            )
+        self.succeeded.emit(playlist, summary, diff)
+
+
+class SnapshotDiffWorker(QThread):
+    """
+    Abre un snapshot guardado y lo compara con la playlist actual fuera del hilo
+    de la interfaz.
+    """
+
+    succeeded = pyqtSignal(object)  # PlaylistDiff
+    failed = pyqtSignal(str)
+
+    def __init__(self, path: str, playlist: Playlist, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.playlist = playlist
+
+    def run(self):
+        try:
+            diff = diff_playlists(PlaylistSnapshot(self.path), self.playlist)
+        except (OSError, ValueError) as e:
+            self.failed.emit(str(e))
+            return
+        self.succeeded.emit(diff)
+
 
 class PlayLabApp(QWidget):
     def __init__(self):
@@ -30,6 +156,11 @@ class PlayLabApp(QWidget):
         self.setGeometry(100, 100, 950, 750)  # Ventana un poco más grande
         self.setMinimumSize(750, 600)  # Tamaño mínimo
         self.current_playlist = None  # Para almacenar la playlist analizada
+        self.worker = None  # Hilo de análisis en curso, si lo hay
+        self.diff_worker = None  # Comparación con un snapshot en curso, si la hay
+        # Última versión analizada de cada playlist en esta sesión, para mostrar
+        # los cambios si se vuelve a analizar (como mucho MAX_PREVIOUS_PLAYLISTS)
+        self.previous_playlists = OrderedDict()
         self.init_ui()
 
     def init_ui(self):
@@ -194,13 +325,8 @@ class PlayLabApp(QWidget):
         )
         self.results_layout.addWidget(self.status_label)
 
-        # Botón para mostrar todos los artistas (debajo de los resultados, fuera del scrollarea)
-        self.show_all_artists_button = QPushButton("Mostrar Todos los Artistas")
-        self.show_all_artists_button.setFont(QFont("Arial", 12, QFont.Bold))
-        self.show_all_artists_button.setFixedHeight(45)
-        self.show_all_artists_button.setCursor(Qt.PointingHandCursor)
-        self.show_all_artists_button.setStyleSheet(
-            """
+        # Botones para mostrar todos los artistas y todas las canciones (debajo de los resultados, fuera del scrollarea)
+        secondary_button_style = """
             QPushButton {
                 background-color: #535353; /* Gris más oscuro */
                 color: white;
@@ -219,12 +345,28 @@ class PlayLabApp(QWidget):
                 color: #606060;
             }
         """
-        )
+        details_layout = QHBoxLayout()
+        self.show_all_artists_button = QPushButton("Mostrar Todos los Artistas")
+        self.show_all_tracks_button = QPushButton("Mostrar Todas las Canciones")
+        self.save_snapshot_button = QPushButton("Guardar Snapshot")
+        self.compare_snapshot_button = QPushButton("Comparar con Snapshot")
+        for button in (
+            self.show_all_artists_button,
+            self.show_all_tracks_button,
+            self.save_snapshot_button,
+            self.compare_snapshot_button,
+        ):
+            button.setFont(QFont("Arial", 12, QFont.Bold))
+            button.setFixedHeight(45)
+            button.setCursor(Qt.PointingHandCursor)
+            button.setStyleSheet(secondary_button_style)
+            button.setEnabled(False)  # Deshabilitado hasta que haya datos
+            details_layout.addWidget(button)
         self.show_all_artists_button.clicked.connect(self.show_all_artists_dialog)
-        self.show_all_artists_button.setEnabled(
-            False
-        )  # Deshabilitado hasta que haya datos
-        main_layout.addWidget(self.show_all_artists_button)
+        self.show_all_tracks_button.clicked.connect(self.show_all_tracks_dialog)
+        self.save_snapshot_button.clicked.connect(self.save_snapshot_dialog)
+        self.compare_snapshot_button.clicked.connect(self.compare_snapshot_dialog)
+        main_layout.addLayout(details_layout)
 
         self.setLayout(main_layout)
 
@@ -294,6 +436,13 @@ class PlayLabApp(QWidget):
             )
 
     def analyze_playlist(self):
+        # Mientras hay un análisis en curso, el botón actúa como "Cancelar"
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.analyze_button.setEnabled(False)
+            self.analyze_button.setText("Cancelando...")
+            return
+
         url = self.url_input.text().strip()
         if not url:
             QMessageBox.warning(
@@ -308,209 +457,372 @@ class PlayLabApp(QWidget):
         )
         self.status_label.setVisible(True)
         self.show_all_artists_button.setEnabled(False)
-        QApplication.processEvents()  # Actualiza la interfaz para mostrar el mensaje
+        self.show_all_tracks_button.setEnabled(False)
+        self.save_snapshot_button.setEnabled(False)
+        self.compare_snapshot_button.setEnabled(False)
 
         try:
             playlist_id = self.extract_playlist_id(url)
+        except ValueError as e:
+            QMessageBox.warning(self, "URL Inválida", str(e))
+            self.status_label.setText(
+                f"<p style='color:red; text-align:center;'>Error: {e}</p>"
+            )
+            self.status_label.setVisible(True)
+            return
 
-            if not sp_user:
-                QMessageBox.critical(
-                    self,
-                    "Error de Conexión",
-                    "No se pudo conectar con Spotify. "
-                    "Revisa tu conexión a internet o credenciales de API.",
-                )
-                self.status_label.setText(
-                    "<p style='color:red; text-align:center;'>Error: No se pudo conectar con Spotify.</p>"
-                )
-                return
+        sp_client = get_spotify_client()
+        if not sp_client:
+            QMessageBox.critical(
+                self,
+                "Error de Conexión",
+                "No se pudo conectar con Spotify. "
+                "Revisa tu conexión a internet o credenciales de API.",
+            )
+            self.status_label.setText(
+                "<p style='color:red; text-align:center;'>Error: No se pudo conectar con Spotify.</p>"
+            )
+            return
 
-            playlist: Playlist = get_playlist_data(sp_user, playlist_id)
-            self.current_playlist = playlist  # Almacenar la playlist
+        # La descarga y el cálculo de estadísticas se hacen en un hilo aparte
+        self.worker = AnalysisWorker(
+            sp_client, playlist_id, self.previous_playlists.get(playlist_id), self
+        )
+        self.worker.progress.connect(self.on_analysis_progress)
+        self.worker.partial_summary.connect(self.on_partial_summary)
+        self.worker.succeeded.connect(self.on_analysis_succeeded)
+        self.worker.failed.connect(self.on_analysis_failed)
+        self.worker.cancelled.connect(self.on_analysis_cancelled)
+        self.worker.finished.connect(self.on_worker_finished)
+        self.analyze_button.setText("Cancelar")
+        self.worker.start()
 
-            if not playlist.songs:
-                self.status_label.setText(
-                    "<p style='color:#b3b3b3; text-align:center;'>No se encontraron pistas en la playlist o la playlist está vacía.</p>"
-                )
-                return
+    def on_analysis_progress(self, loaded: int, total: int):
+        self.status_label.setText(
+            f"<p style='color:#b3b3b3; text-align:center;'>Cargando pistas: {loaded} de {total}...</p>"
+        )
+
+    def on_partial_summary(self, summary: dict):
+        # Resultados provisionales mientras siguen llegando páginas
+        self.clear_results_display()
+        self._display_summary(summary)
+
+    def on_analysis_succeeded(self, playlist: Playlist, summary: dict, diff):
+        self.current_playlist = playlist  # Almacenar la playlist
+        self.clear_results_display()
 
-            # Ocultar el mensaje de estado y construir los resultados
-            self.status_label.setVisible(False)
+        if not summary["num_songs"]:
+            self.status_label.setText(
+                "<p style='color:#b3b3b3; text-align:center;'>No se encontraron pistas en la playlist o la playlist está vacía.</p>"
+            )
+            self.status_label.setVisible(True)
+            # Si antes tenía canciones, el diff muestra las que se han eliminado
+            if diff is not None:
+                self._display_diff(diff, "Cambios desde el último análisis")
+            self._remember_playlist(playlist)
+            return
+
+        # Ocultar el mensaje de estado y construir los resultados
+        self.status_label.setVisible(False)
+        self._display_summary(summary)
+        self._display_collaboration_pairs(playlist.collaboration_graph)
+        if summary["genre_counts"] or summary["release_year_counts"]:
+            self._display_enrichment(summary)
+
+        if diff is not None:
+            self._display_diff(diff, "Cambios desde el último análisis")
+        self._remember_playlist(playlist)
+
+        # Habilitar el botón de "Mostrar Todos los Artistas" si hay datos
+        if summary["num_artists"] > 0:
+            self.show_all_artists_button.setEnabled(True)
+        self.show_all_tracks_button.setEnabled(True)
+        self.save_snapshot_button.setEnabled(True)
+        self.compare_snapshot_button.setEnabled(True)
+
+    def _remember_playlist(self, playlist: Playlist):
+        self.previous_playlists[playlist.id] = playlist
+        self.previous_playlists.move_to_end(playlist.id)
+        if len(self.previous_playlists) > MAX_PREVIOUS_PLAYLISTS:
+            self.previous_playlists.popitem(last=False)
+
+    def on_analysis_failed(self, message: str):
+        self.clear_results_display()
+        QMessageBox.critical(
+            self,
+            "Error al Analizar",
+            f"Ha ocurrido un error inesperado al analizar la playlist: {message}",
+        )
+        self.status_label.setText(
+            f"<p style='color:red; text-align:center;'>Error inesperado: {message}</p>"
+        )
+        self.status_label.setVisible(True)
+        self.show_all_artists_button.setEnabled(False)
+        self.show_all_tracks_button.setEnabled(False)
+        self.save_snapshot_button.setEnabled(False)
+        self.compare_snapshot_button.setEnabled(False)
+
+    def on_analysis_cancelled(self):
+        self.clear_results_display()
+        self.status_label.setText(
+            "<p style='color:#b3b3b3; text-align:center;'>Análisis cancelado.</p>"
+        )
+        self.status_label.setVisible(True)
+
+    def on_worker_finished(self):
+        self.worker = None
+        self.analyze_button.setText("Analizar Playlist")
+        self.analyze_button.setEnabled(True)
+
+    def _display_summary(self, summary: dict):
+        """
+        Construye las tarjetas de resultados a partir de un resumen con el formato
+        de `Playlist.get_summary()` (definitivo o parcial).
+        """
+        with instrumentation.span("gui.render"):
+            self._build_summary_cards(summary)
 
-            # --- Título de la Playlist Analizada ---
-            playlist_title_label = QLabel(f"'{playlist.name}'")
+    def _build_summary_cards(self, summary: dict):
+        # --- Título de la Playlist Analizada (los resúmenes parciales no lo tienen) ---
+        if summary["name"]:
+            playlist_title_label = QLabel(f"'{summary['name']}'")
             playlist_title_label.setFont(QFont("Arial", 20, QFont.Bold))
             playlist_title_label.setAlignment(Qt.AlignCenter)
             playlist_title_label.setStyleSheet("color: #1DB954; margin-bottom: 10px;")
             self.results_layout.addWidget(playlist_title_label)
 
-            # --- Tarjeta de Estadísticas Principales ---
-            main_stats_card = self._create_card_frame("Resumen de la Playlist")
-            main_stats_grid = QGridLayout()
-            main_stats_grid.setSpacing(15)  # Espacio entre elementos en la rejilla
+        # --- Tarjeta de Estadísticas Principales ---
+        main_stats_card = self._create_card_frame("Resumen de la Playlist")
+        main_stats_grid = QGridLayout()
+        main_stats_grid.setSpacing(15)  # Espacio entre elementos en la rejilla
 
-            main_stats_grid.addLayout(
-                self._create_stat_pair("Pistas:", str(playlist.num_songs)), 0, 0
-            )
-            main_stats_grid.addLayout(
-                self._create_stat_pair("Artistas Únicos:", str(playlist.num_artists)),
-                0,
-                1,
+        main_stats_grid.addLayout(
+            self._create_stat_pair("Pistas:", str(summary["num_songs"])), 0, 0
+        )
+        main_stats_grid.addLayout(
+            self._create_stat_pair("Artistas Únicos:", str(summary["num_artists"])),
+            0,
+            1,
+        )
+        main_stats_grid.addLayout(
+            self._create_stat_pair(
+                "Duración Total:", format_duration_ms(summary["total_duration_ms"])
+            ),
+            1,
+            0,
+        )
+        main_stats_grid.addLayout(
+            self._create_stat_pair(
+                "Álbumes Únicos:", str(summary["num_unique_albums"])
+            ),
+            1,
+            1,
+        )
+        main_stats_grid.addLayout(
+            self._create_stat_pair("Explícitas:", str(summary["num_explicit_songs"])),
+            2,
+            0,
+        )
+        main_stats_grid.addLayout(
+            self._create_stat_pair(
+                "Colaborativas:", str(summary["num_collaborative_songs"])
+            ),
+            2,
+            1,
+        )
+
+        main_stats_card.layout().addLayout(
+            main_stats_grid
+        )  # Añadir el grid al layout de la tarjeta
+        self.results_layout.addWidget(main_stats_card)
+
+        # --- Tarjeta de Duración de Canciones ---
+        duration_card = self._create_card_frame("Canciones por Duración")
+        duration_layout = QVBoxLayout()
+        duration_layout.setSpacing(8)
+        duration_layout.addLayout(
+            self._create_stat_pair(
+                "Más Corta:",
+                f"'{summary['shortest_song']['title']}' ({format_duration_ms(summary['shortest_song']['duration_ms'])})",
+                is_title=True,
             )
-            main_stats_grid.addLayout(
-                self._create_stat_pair(
-                    "Duración Total:", format_duration_ms(playlist.total_duration_ms)
-                ),
-                1,
-                0,
+        )
+        duration_layout.addLayout(
+            self._create_stat_pair(
+                "Más Larga:",
+                f"'{summary['longest_song']['title']}' ({format_duration_ms(summary['longest_song']['duration_ms'])})",
+                is_title=True,
             )
-            main_stats_grid.addLayout(
-                self._create_stat_pair(
-                    "Álbumes Únicos:", str(playlist.num_unique_albums)
-                ),
-                1,
-                1,
+        )
+        duration_card.layout().addLayout(duration_layout)
+        self.results_layout.addWidget(duration_card)
+
+        # --- Tarjeta de Álbum Más Representado ---
+        album_card = self._create_card_frame("Álbum Más Representado")
+        album_layout = QVBoxLayout()
+        album_layout.setSpacing(8)
+        album_layout.addLayout(
+            self._create_stat_pair(
+                "Álbum:",
+                f"'{summary['most_represented_album'][0]}' ({summary['most_represented_album'][1]} canciones)",
+                is_title=True,
             )
-            main_stats_grid.addLayout(
-                self._create_stat_pair("Explícitas:", str(playlist.num_explicit_songs)),
-                2,
-                0,
+        )
+        album_card.layout().addLayout(album_layout)
+        self.results_layout.addWidget(album_card)
+
+        # --- Tarjeta de Top Artistas y Colaboraciones ---
+        artist_card = self._create_card_frame("Estadísticas de Artistas")
+        artist_content_layout = QVBoxLayout()
+        artist_content_layout.setSpacing(10)
+
+        # Top 5 artistas
+        top_artists_text = (
+            "<span class='stat_name'>Top 5 Artistas con más apariciones:</span>"
+        )
+        if summary["artist_frequencies"]:
+            top_artists_list_html = "<ul style='margin-top:5px; margin-bottom: 5px; padding-left: 20px;'>"
+            for artist, count in summary["artist_frequencies"].most_common(5):
+                top_artists_list_html += f"<li style='color:#b3b3b3;'>{artist}: <span class='stat_value'>{count} canción{'es' if count > 1 else ''}</span></li>"
+            top_artists_list_html += "</ul>"
+            top_artists_label_content = QLabel(
+                top_artists_text + top_artists_list_html
             )
-            main_stats_grid.addLayout(
-                self._create_stat_pair(
-                    "Colaborativas:", str(playlist.num_collaborative_songs)
-                ),
-                2,
-                1,
+        else:
+            top_artists_label_content = QLabel(
+                top_artists_text
+                + "<br><span style='color:#b3b3b3;'>No se encontraron artistas.</span>"
             )
+        top_artists_label_content.setFont(QFont("Arial", 10))
+        artist_content_layout.addWidget(top_artists_label_content)
 
-            main_stats_card.layout().addLayout(
-                main_stats_grid
-            )  # Añadir el grid al layout de la tarjeta
-            self.results_layout.addWidget(main_stats_card)
-
-            # --- Tarjeta de Duración de Canciones ---
-            duration_card = self._create_card_frame("Canciones por Duración")
-            duration_layout = QVBoxLayout()
-            duration_layout.setSpacing(8)
-            duration_layout.addLayout(
-                self._create_stat_pair(
-                    "Más Corta:",
-                    f"'{playlist.shortest_song['title']}' ({format_duration_ms(playlist.shortest_song['duration_ms'])})",
-                    is_title=True,
-                )
-            )
-            duration_layout.addLayout(
-                self._create_stat_pair(
-                    "Más Larga:",
-                    f"'{playlist.longest_song['title']}' ({format_duration_ms(playlist.longest_song['duration_ms'])})",
-                    is_title=True,
-                )
+        # Top 5 colaboraciones
+        top_collaborators_text = (
+            "<span class='stat_name'>Top 5 Artistas con más Colaboraciones:</span>"
+        )
+        top_collaborators = [
+            (artist, count)
+            for artist, count in summary["artist_collaboration_counts"].most_common(5)
+            if count > 0
+        ]
+        if top_collaborators:
+            top_collaborators_list_html = "<ul style='margin-top:5px; margin-bottom: 5px; padding-left: 20px;'>"
+            for artist, count in top_collaborators:
+                top_collaborators_list_html += f"<li style='color:#b3b3b3;'>{artist}: <span class='stat_value'>{count} colaboracion{'es' if count > 1 else ''}</span></li>"
+            top_collaborators_list_html += "</ul>"
+            top_collaborators_label_content = QLabel(
+                top_collaborators_text + top_collaborators_list_html
             )
-            duration_card.layout().addLayout(duration_layout)
-            self.results_layout.addWidget(duration_card)
-
-            # --- Tarjeta de Álbum Más Representado ---
-            album_card = self._create_card_frame("Álbum Más Representado")
-            album_layout = QVBoxLayout()
-            album_layout.setSpacing(8)
-            album_layout.addLayout(
-                self._create_stat_pair(
-                    "Álbum:",
-                    f"'{playlist.most_represented_album[0]}' ({playlist.most_represented_album[1]} canciones)",
-                    is_title=True,
-                )
+        else:
+            top_collaborators_label_content = QLabel(
+                top_collaborators_text
+                + "<br><span style='color:#b3b3b3;'>No se encontraron colaboraciones.</span>"
             )
-            album_card.layout().addLayout(album_layout)
-            self.results_layout.addWidget(album_card)
+        top_collaborators_label_content.setFont(QFont("Arial", 10))
+        artist_content_layout.addWidget(top_collaborators_label_content)
 
-            # --- Tarjeta de Top Artistas y Colaboraciones ---
-            artist_card = self._create_card_frame("Estadísticas de Artistas")
-            artist_content_layout = QVBoxLayout()
-            artist_content_layout.setSpacing(10)
+        artist_card.layout().addLayout(artist_content_layout)
+        self.results_layout.addWidget(artist_card)
 
-            # Top 5 artistas
-            top_artists_text = (
-                "<span class='stat_name'>Top 5 Artistas con más apariciones:</span>"
-            )
-            if playlist.artist_frequencies:
-                top_artists_list_html = "<ul style='margin-top:5px; margin-bottom: 5px; padding-left: 20px;'>"
-                for artist, count in playlist.artist_frequencies.most_common(5):
-                    top_artists_list_html += f"<li style='color:#b3b3b3;'>{artist}: <span class='stat_value'>{count} canción{'es' if count > 1 else ''}</span></li>"
-                top_artists_list_html += "</ul>"
-                top_artists_label_content = QLabel(
-                    top_artists_text + top_artists_list_html
+    def _display_collaboration_pairs(self, graph):
+        """
+        Tarjeta con las parejas de artistas (por id) que más canciones comparten,
+        a partir del grafo de colaboraciones de la playlist.
+        """
+        with instrumentation.span("gui.render"):
+            pairs_card = self._create_card_frame("Parejas con más Colaboraciones")
+            top_pairs = graph.top_pairs(5)
+            if top_pairs:
+                pairs_html = "<ul style='margin-top:5px; margin-bottom: 5px; padding-left: 20px;'>"
+                for artist_a, artist_b, count in top_pairs:
+                    pairs_html += f"<li style='color:#b3b3b3;'>{artist_a.name} y {artist_b.name}: <span class='stat_value'>{count} canci{'ones' if count > 1 else 'ón'}</span></li>"
+                pairs_html += "</ul>"
+                components = graph.connected_components()
+                pairs_html += (
+                    f"<span class='stat_name'>Grupos de artistas conectados: </span>"
+                    f"<span class='stat_value'>{len(components)}</span>"
+                    f"<span class='stat_name'> (el mayor con {len(components[0])} artistas)</span>"
                 )
+                pairs_label = QLabel(pairs_html)
             else:
-                top_artists_label_content = QLabel(
-                    top_artists_text
-                    + "<br><span style='color:#b3b3b3;'>No se encontraron artistas.</span>"
+                pairs_label = QLabel(
+                    "<span style='color:#b3b3b3;'>No se encontraron colaboraciones.</span>"
                 )
-            top_artists_label_content.setFont(QFont("Arial", 10))
-            artist_content_layout.addWidget(top_artists_label_content)
+            pairs_label.setFont(QFont("Arial", 10))
+            pairs_label.setWordWrap(True)
+            pairs_card.layout().addWidget(pairs_label)
+            self.results_layout.addWidget(pairs_card)
 
-            # Top 5 colaboraciones
-            top_collaborators_text = (
-                "<span class='stat_name'>Top 5 Artistas con más Colaboraciones:</span>"
-            )
-            top_collaborators = [
-                (artist, count)
-                for artist, count in playlist.artist_collaboration_counts.most_common(5)
-                if count > 0
-            ]
-            if top_collaborators:
-                top_collaborators_list_html = "<ul style='margin-top:5px; margin-bottom: 5px; padding-left: 20px;'>"
-                for artist, count in top_collaborators:
-                    top_collaborators_list_html += f"<li style='color:#b3b3b3;'>{artist}: <span class='stat_value'>{count} colaboracion{'es' if count > 1 else ''}</span></li>"
-                top_collaborators_list_html += "</ul>"
-                top_collaborators_label_content = QLabel(
-                    top_collaborators_text + top_collaborators_list_html
-                )
-            else:
-                top_collaborators_label_content = QLabel(
-                    top_collaborators_text
-                    + "<br><span style='color:#b3b3b3;'>No se encontraron colaboraciones.</span>"
+    def _display_enrichment(self, summary: dict):
+        """
+        Tarjeta con los géneros más frecuentes, las canciones por década de
+        publicación y la popularidad de los artistas (ver enrichment.py).
+        """
+        with instrumentation.span("gui.render"):
+            card = self._create_card_frame("Géneros y Épocas")
+            content = ""
+            if summary["genre_counts"]:
+                content += "<span class='stat_name'>Top 5 Géneros:</span>"
+                content += "<ul style='margin-top:5px; margin-bottom: 5px; padding-left: 20px;'>"
+                for genre, count in summary["genre_counts"].most_common(5):
+                    content += f"<li style='color:#b3b3b3;'>{html.escape(genre)}: <span class='stat_value'>{count} canci{'ones' if count > 1 else 'ón'}</span></li>"
+                content += "</ul>"
+            if summary["release_year_counts"]:
+                decades = Counter()
+                for year, count in summary["release_year_counts"].items():
+                    decades[year // 10 * 10] += count
+                largest = max(decades.values())
+                content += "<span class='stat_name'>Canciones por década:</span><br>"
+                for decade, count in sorted(decades.items()):
+                    bar = "█" * max(1, round(20 * count / largest))
+                    content += (
+                        f"<span style='color:#b3b3b3;'>{decade}s </span>"
+                        f"<span style='color:#1DB954;'>{bar}</span>"
+                        f"<span class='stat_value'> {count}</span><br>"
+                    )
+            if summary["average_artist_popularity"] is not None:
+                content += (
+                    f"<span class='stat_name'>Popularidad media de los artistas: </span>"
+                    f"<span class='stat_value'>{summary['average_artist_popularity']}/100</span>"
                 )
-            top_collaborators_label_content.setFont(QFont("Arial", 10))
-            artist_content_layout.addWidget(top_collaborators_label_content)
+            label = QLabel(content)
+            label.setFont(QFont("Arial", 10))
+            label.setWordWrap(True)
+            card.layout().addWidget(label)
+            self.results_layout.addWidget(card)
 
-            artist_card.layout().addLayout(artist_content_layout)
-            self.results_layout.addWidget(artist_card)
-
-            # Habilitar el botón de "Mostrar Todos los Artistas" si hay datos
-            if playlist.num_artists > 0:
-                self.show_all_artists_button.setEnabled(True)
-
-        except ValueError as e:
-            QMessageBox.warning(self, "URL Inválida", str(e))
-            self.status_label.setText(
-                f"<p style='color:red; text-align:center;'>Error: {e}</p>"
-            )
-            self.status_label.setVisible(True)
-            self.show_all_artists_button.setEnabled(False)
-        except Exception as e:
-            QMessageBox.critical(
-                self,
-                "Error al Analizar",
-                f"Ha ocurrido un error inesperado al analizar la playlist: {e}",
-            )
-            self.status_label.setText(
-                f"<p style='color:red; text-align:center;'>Error inesperado: {e}</p>"
+    def _display_diff(self, diff, title: str):
+        with instrumentation.span("gui.render"):
+            diff_card = self._create_card_frame(title)
+            diff_label = QLabel(
+                "<br>".join(
+                    html.escape(line).replace("  ", "&nbsp;&nbsp;")
+                    for line in format_diff(diff)
+                )
             )
-            self.status_label.setVisible(True)
-            self.show_all_artists_button.setEnabled(False)
-            import traceback
+            diff_label.setFont(QFont("Arial", 10))
+            diff_label.setStyleSheet("color: #b3b3b3;")
+            diff_label.setWordWrap(True)
+            diff_card.layout().addWidget(diff_label)
+            self.results_layout.addWidget(diff_card)
 
-            traceback.print_exc()
+    def closeEvent(self, event):
+        # No cerrar la ventana con el hilo de análisis todavía en marcha
+        if self.worker is not None:
+            self.worker.requestInterruption()
+            self.worker.wait()
+        if self.diff_worker is not None:
+            self.diff_worker.wait()
+        super().closeEvent(event)
 
     def clear_results_display(self):
-        # Elimina todos los widgets actuales del layout de resultados (excepto el status_label si está visible)
+        # Elimina todos los widgets actuales del layout de resultados (excepto el status_label)
         for i in reversed(range(self.results_layout.count())):
             item = self.results_layout.itemAt(i)
             widget = item.widget()
 
-            # No eliminamos el status_label si está presente y es el único widget
-            if widget is self.status_label and self.status_label.isVisible():
+            # El status_label se reutiliza en cada análisis: solo se oculta, nunca se elimina
+            if widget is self.status_label:
                 continue
 
             if widget is not None:
@@ -542,8 +854,95 @@ class PlayLabApp(QWidget):
             )
             return
 
+        model = ArtistFrequencyModel(self.current_playlist.artist_frequencies)
+        self._show_table_dialog(
+            "Todos los Artistas por Apariciones",
+            "Lista Completa de Artistas",
+            model,
+            # Por número de canciones descendente: el orden de most_common()
+            sort_column=1,
+            sort_order=Qt.DescendingOrder,
+        )
+
+    def show_all_tracks_dialog(self):
+        if not self.current_playlist or not self.current_playlist.songs:
+            QMessageBox.information(
+                self,
+                "Info",
+                "No hay canciones para mostrar. Analiza una playlist primero.",
+            )
+            return
+
+        model = TrackTableModel(self.current_playlist.songs)
+        # Sin columna de orden: las canciones aparecen en el orden de la playlist
+        self._show_table_dialog(
+            "Todas las Canciones", "Canciones de la Playlist", model, sort_column=-1
+        )
+
+    def save_snapshot_dialog(self):
+        if not self.current_playlist:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Guardar Snapshot",
+            f"{self.current_playlist.id}.plsnap",
+            "Snapshots de PlayLab (*.plsnap)",
+        )
+        if not path:
+            return
+        try:
+            save_snapshot(self.current_playlist, path)
+        except OSError as e:
+            QMessageBox.critical(
+                self, "Error al Guardar", f"No se pudo guardar el snapshot: {e}"
+            )
+
+    def compare_snapshot_dialog(self):
+        if not self.current_playlist or self.diff_worker is not None:
+            return
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Comparar con Snapshot", "", "Snapshots de PlayLab (*.plsnap)"
+        )
+        if not path:
+            return
+        # Abrir el snapshot y compararlo se hace en un hilo aparte, como el análisis
+        self.diff_worker = SnapshotDiffWorker(path, self.current_playlist, self)
+        self.diff_worker.succeeded.connect(self.on_snapshot_diff_succeeded)
+        self.diff_worker.failed.connect(self.on_snapshot_diff_failed)
+        self.diff_worker.finished.connect(self.on_diff_worker_finished)
+        self.compare_snapshot_button.setEnabled(False)
+        self.diff_worker.start()
+
+    def on_snapshot_diff_succeeded(self, diff):
+        # Si entretanto se ha empezado otro análisis, el diff ya no corresponde
+        worker = self.diff_worker
+        if self.worker is not None or worker.playlist is not self.current_playlist:
+            return
+        self._display_diff(diff, f"Cambios desde {os.path.basename(worker.path)}")
+
+    def on_snapshot_diff_failed(self, message: str):
+        QMessageBox.critical(
+            self, "Error al Comparar", f"No se pudo abrir el snapshot: {message}"
+        )
+
+    def on_diff_worker_finished(self):
+        self.diff_worker = None
+        self.compare_snapshot_button.setEnabled(
+            self.worker is None and self.current_playlist is not None
+        )
+
+    def _show_table_dialog(
+        self,
+        window_title: str,
+        heading: str,
+        model,
+        sort_column: int,
+        sort_order=Qt.AscendingOrder,
+    ):
+        # Diálogo con una tabla virtualizada: solo se pintan las filas visibles y
+        # el modelo entrega más filas a medida que se hace scroll
         dialog = QDialog(self)
-        dialog.setWindowTitle("Todos los Artistas por Apariciones")
+        dialog.setWindowTitle(window_title)
         dialog.setGeometry(
             self.x() + 100, self.y() + 100, 550, 750
         )  # Más grande para la lista
@@ -559,22 +958,29 @@ class PlayLabApp(QWidget):
                 font-size: 18pt; /* Título del diálogo más grande */
                 margin-bottom: 15px;
             }
-            QListWidget {
+            QTableView {
                 background-color: #121212;
                 color: #b3b3b3;
                 border: 1px solid #282828;
                 border-radius: 8px;
                 padding: 10px;
                 outline: none;
+                gridline-color: #282828;
                 font-size: 10pt; /* Tamaño de fuente para los items */
             }
-            QListWidget::item {
+            QTableView::item {
                 padding: 8px; /* Más padding para los items */
             }
-            QListWidget::item:selected {
+            QTableView::item:selected {
                 background-color: #1DB954;
                 color: white;
             }
+            QHeaderView::section {
+                background-color: #282828;
+                color: #b3b3b3;
+                border: none;
+                padding: 6px;
+            }
             QPushButton {
                 background-color: #1DB954;
                 color: white;
@@ -595,21 +1001,28 @@ class PlayLabApp(QWidget):
         dialog_layout.setContentsMargins(20, 20, 20, 20)
         dialog_layout.setSpacing(15)
 
-        dialog_title_label = QLabel("Lista Completa de Artistas")
+        dialog_title_label = QLabel(heading)
         dialog_title_label.setObjectName("dialogTitle")
         dialog_title_label.setAlignment(Qt.AlignCenter)
         dialog_layout.addWidget(dialog_title_label)
 
-        list_widget = QListWidget()
-
-        # Llenar la lista con todos los artistas ordenados por frecuencia
-        for i, (artist, count) in enumerate(
-            self.current_playlist.artist_frequencies.most_common()
-        ):
-            item_text = f"{i+1}. {artist}: {count} canci{'ones' if count > 1 else 'ón'}"
-            list_widget.addItem(item_text)
+        table_view = QTableView()
+        table_view.setModel(model)
+        model.setParent(table_view)
+        table_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        table_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        table_view.setWordWrap(False)
+        # Altura de fila fija: la vista no necesita medir cada fila
+        table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        table_view.verticalHeader().setDefaultSectionSize(32)
+        table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        table_view.horizontalHeader().setStretchLastSection(True)
+        table_view.horizontalHeader().setSortIndicator(sort_column, sort_order)
+        # El orden lo hace el modelo (permutación de índices), sin copiar los datos
+        table_view.setSortingEnabled(True)
+        table_view.setColumnWidth(0, 260)
 
-        dialog_layout.addWidget(list_widget)
+        dialog_layout.addWidget(table_view)
 
         close_button = QPushButton("Cerrar")
         close_button.setFont(QFont("Arial", 12, QFont.Bold))
@@ -624,6 +1037,7 @@ class PlayLabApp(QWidget):
 
 # Función para iniciar la aplicación
 def start_gui():
+    configure_logging()
     app = QApplication(sys.argv)
     window = PlayLabApp()
     window.show()
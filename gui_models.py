@@ -0,0 +1,181 @@
+from collections import Counter
+
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from song import Song
+from utils import format_duration_ms
+
+# Filas que se entregan a la vista cada vez que pide más al hacer scroll
+FETCH_BATCH_SIZE = 200
+
+
+class _LazyTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla que lee directamente de los datos de la playlist, sin copiarlos.
+
+    El orden de las filas es una permutación de índices (`_order`) sobre los datos
+    originales, por lo que ordenar no duplica las filas. Las filas se exponen a la
+    vista por lotes (canFetchMore/fetchMore) a medida que el usuario hace scroll.
+
+    Las subclases implementan `_display` y `_sort_order`, y pueden pasar el orden
+    con el que se abre la tabla (`default_order`, None para el orden natural).
+    """
+
+    HEADERS: tuple[str, ...] = ()
+
+    def __init__(
+        self, num_rows: int, parent=None, default_order: np.ndarray | None = None
+    ):
+        super().__init__(parent)
+        self._num_rows = num_rows
+        self._default_order = default_order
+        self._order = default_order  # None: orden natural de los datos
+        self._loaded = min(FETCH_BATCH_SIZE, num_rows)
+
+    # --- Subclases ---
+    def _display(self, index: int, column: int) -> str:
+        """
+        Texto de la celda `column` del elemento `index` de los datos.
+        """
+        raise NotImplementedError
+
+    def _sort_order(self, column: int, descending: bool) -> np.ndarray:
+        """
+        Índices de los datos ordenados (de forma estable) según `column`.
+        """
+        raise NotImplementedError
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        row = index.row()
+        if self._order is not None:
+            row = int(self._order[row])
+        return self._display(row, index.column())
+
+    def headerData(self, section: int, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()) -> bool:
+        return not parent.isValid() and self._loaded < self._num_rows
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        remaining = min(FETCH_BATCH_SIZE, self._num_rows - self._loaded)
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + remaining - 1)
+        self._loaded += remaining
+        self.endInsertRows()
+
+    def sort(self, column: int, order=Qt.AscendingOrder):
+        self.layoutAboutToBeChanged.emit()
+        if column < 0:
+            self._order = self._default_order
+        else:
+            self._order = self._sort_order(column, order == Qt.DescendingOrder)
+        self.layoutChanged.emit()
+
+
+class ArtistFrequencyModel(_LazyTableModel):
+    """
+    Artistas y su número de canciones, leídos del Counter `artist_frequencies` sin
+    copiarlo: solo se guardan la lista de sus claves, para poder indexarlas, y la
+    permutación del orden actual. Los números de canciones se leen del Counter al
+    mostrar cada fila.
+
+    La tabla se abre en el orden de `most_common()`: número de canciones
+    descendente y, en los empates, orden de aparición.
+    """
+
+    HEADERS = ("Artista", "Canciones")
+
+    def __init__(self, artist_frequencies: Counter, parent=None):
+        self._counter = artist_frequencies
+        self._names = list(artist_frequencies)
+        super().__init__(
+            len(self._names), parent, default_order=self._count_order(descending=True)
+        )
+
+    def _display(self, index: int, column: int) -> str:
+        name = self._names[index]
+        if column == 0:
+            return name
+        count = self._counter[name]
+        return f"{count} canci{'ones' if count > 1 else 'ón'}"
+
+    def _count_order(self, descending: bool) -> np.ndarray:
+        counts = np.fromiter(
+            self._counter.values(), dtype=np.int64, count=len(self._names)
+        )
+        # Estable: los empates siguen por orden de aparición, como en most_common()
+        return np.argsort(-counts if descending else counts, kind="stable")
+
+    def _sort_order(self, column: int, descending: bool) -> np.ndarray:
+        if column == 0:
+            return _sorted_indices([name or "" for name in self._names], descending)
+        return self._count_order(descending)
+
+
+class TrackTableModel(_LazyTableModel):
+    """
+    Canciones de la playlist con título, artistas, álbum, duración y si son explícitas.
+    """
+
+    HEADERS = ("Título", "Artistas", "Álbum", "Duración", "Explícita")
+
+    def __init__(self, songs: list[Song], parent=None):
+        super().__init__(len(songs), parent)
+        self._songs = songs
+        self._sort_keys = {}  # columna de texto -> claves de ordenación, por canción
+
+    def _display(self, index: int, column: int) -> str:
+        song = self._songs[index]
+        if column == 0:
+            return song.title
+        if column == 1:
+            return ", ".join(artist.name for artist in song.artists)
+        if column == 2:
+            return song.album
+        if column == 3:
+            return format_duration_ms(song.duration_ms)
+        return "Sí" if song.explicit else "No"
+
+    def _sort_order(self, column: int, descending: bool) -> np.ndarray:
+        songs = self._songs
+        if column == 3:
+            keys = np.fromiter(
+                (song.duration_ms for song in songs), dtype=np.int64, count=len(songs)
+            )
+            return np.argsort(-keys if descending else keys, kind="stable")
+        if column == 4:
+            keys = np.fromiter(
+                (song.explicit for song in songs), dtype=np.int64, count=len(songs)
+            )
+            return np.argsort(-keys if descending else keys, kind="stable")
+        keys = self._sort_keys.get(column)
+        if keys is None:
+            # Se calculan una vez por columna; el título o el álbum pueden ser None
+            keys = self._sort_keys[column] = [
+                (self._display(i, column) or "").lower() for i in range(len(songs))
+            ]
+        return _sorted_indices(keys, descending)
+
+
+def _sorted_indices(keys: list[str], descending: bool) -> np.ndarray:
+    # sorted() es estable también con reverse=True
+    return np.array(
+        sorted(range(len(keys)), key=keys.__getitem__, reverse=descending),
+        dtype=np.int64,
+    )
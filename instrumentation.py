@@ -0,0 +1,170 @@
+# instrumentation.py
+
+import json
+import threading
+import time
+from collections import defaultdict
+
+# Desactivada por defecto: `span` e `increment` se reducen a comprobar esta
+# bandera, así que dejar las llamadas en el código no cuesta casi nada.
+_enabled = False
+_lock = threading.Lock()
+# nombre -> [número de llamadas, segundos totales, segundos máximos]
+_spans = defaultdict(lambda: [0, 0.0, 0.0])
+_counters = defaultdict(int)
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+
+
+class _Span:
+    __slots__ = ("name", "_start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        with _lock:
+            stats = _spans[self.name]
+            stats[0] += 1
+            stats[1] += elapsed
+            if elapsed > stats[2]:
+                stats[2] = elapsed
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """
+    Mide el tiempo del bloque `with` y lo acumula bajo `name`. Desactivada, devuelve
+    un gestor de contexto compartido que no hace nada.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def increment(name: str, amount: int | float = 1):
+    if not _enabled:
+        return
+    with _lock:
+        _counters[name] += amount
+
+
+def record_response_bytes(response, *args, **kwargs):
+    """
+    Hook de respuesta de `requests` que cuenta los bytes recibidos.
+    """
+    if _enabled:
+        increment("bytes_received", len(response.content))
+
+
+def get_report() -> dict:
+    """
+    Tiempos por fase (`spans`) y contadores acumulados desde el último `reset()`.
+    """
+    with _lock:
+        spans = {
+            name: {
+                "count": count,
+                "total_s": round(total, 6),
+                "mean_s": round(total / count, 6) if count else 0.0,
+                "max_s": round(maximum, 6),
+            }
+            for name, (count, total, maximum) in sorted(_spans.items())
+        }
+        counters = dict(sorted(_counters.items()))
+    return {"spans": spans, "counters": counters}
+
+
+def to_json(indent: int | None = 2) -> str:
+    return json.dumps(get_report(), indent=indent)
+
+
+def to_prometheus() -> str:
+    """
+    El informe en el formato de texto de Prometheus.
+    """
+    report = get_report()
+    lines = [
+        "# HELP playlab_span_seconds_total Tiempo total por fase.",
+        "# TYPE playlab_span_seconds_total counter",
+    ]
+    lines += [
+        f'playlab_span_seconds_total{{span="{name}"}} {stats["total_s"]}'
+        for name, stats in report["spans"].items()
+    ]
+    lines += [
+        "# HELP playlab_span_calls_total Veces que se ha ejecutado cada fase.",
+        "# TYPE playlab_span_calls_total counter",
+    ]
+    lines += [
+        f'playlab_span_calls_total{{span="{name}"}} {stats["count"]}'
+        for name, stats in report["spans"].items()
+    ]
+    lines += [
+        "# HELP playlab_span_max_seconds Duración máxima de una ejecución de cada fase.",
+        "# TYPE playlab_span_max_seconds gauge",
+    ]
+    lines += [
+        f'playlab_span_max_seconds{{span="{name}"}} {stats["max_s"]}'
+        for name, stats in report["spans"].items()
+    ]
+    for name, value in report["counters"].items():
+        lines.append(f"# TYPE playlab_{name}_total counter")
+        lines.append(f"playlab_{name}_total {value}")
+    return "\n".join(lines) + "\n"
+
+
+def format_report() -> str:
+    """
+    El informe como tabla legible para la terminal.
+    """
+    report = get_report()
+    lines = ["--- Perfil de la ejecución ---"]
+    if report["spans"]:
+        lines.append(
+            f"{'Fase':<24} {'Llamadas':>9} {'Total (ms)':>12} {'Media (ms)':>11} {'Máx (ms)':>10}"
+        )
+        for name, stats in report["spans"].items():
+            lines.append(
+                f"{name:<24} {stats['count']:>9} {stats['total_s'] * 1000:>12.1f} "
+                f"{stats['mean_s'] * 1000:>11.2f} {stats['max_s'] * 1000:>10.2f}"
+            )
+    for name, value in report["counters"].items():
+        lines.append(f"{name}: {round(value, 3) if isinstance(value, float) else value}")
+    return "\n".join(lines)
@@ -0,0 +1,211 @@
+# library.py
+
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+import spotipy
+
+import instrumentation
+from model_registry import ModelRegistry
+from playlist_analyzer import Playlist
+from rate_limiter import get_scheduler
+from similarity import SIMILARITY_INDEX_PATH, SimilarityIndex
+from song import Song
+from spotify_api import DEFAULT_MAX_WORKERS, _fetch_playlist_page, _songs_from_items
+from track_cache import get_track_cache
+
+# Máximo de la API: playlists por página de /me/playlists
+PLAYLISTS_PAGE_SIZE = 50
+
+# Recibe el número de playlists ya cargadas y el total
+LibraryProgressCallback = Callable[[int, int], None]
+
+
+class Library:
+    """
+    Biblioteca de un usuario: sus playlists (propias y seguidas) y las pistas
+    únicas entre todas ellas.
+
+    Cada pista existe una sola vez en `songs_by_id`; las playlists que la
+    contienen comparten el mismo objeto Song (a través del ModelRegistry).
+    """
+
+    def __init__(self, playlists: list[Playlist], songs_by_id: dict[str, Song]):
+        self.playlists = playlists
+        self.songs_by_id = songs_by_id
+        self._tracks = None
+
+    @property
+    def tracks(self) -> Playlist:
+        """
+        Las pistas únicas de la biblioteca como una Playlist, para reutilizar sus
+        estadísticas (artistas, álbumes, duración, explícitas).
+        """
+        if self._tracks is None:
+            self._tracks = Playlist(
+                id="library", name="Biblioteca", songs=list(self.songs_by_id.values())
+            )
+        return self._tracks
+
+    def get_summary(self) -> dict:
+        """
+        Estadísticas de toda la biblioteca, sobre las pistas únicas, con el mismo
+        formato que `Playlist.get_summary()` más algunos datos propios.
+        """
+        summary = self.tracks.get_summary()
+        num_unique = summary["num_songs"]
+        summary.update(
+            {
+                "num_playlists": len(self.playlists),
+                # Pistas contando repeticiones entre playlists
+                "num_playlist_tracks": sum(
+                    playlist.num_songs for playlist in self.playlists
+                ),
+                "num_unique_tracks": num_unique,
+                "explicit_share": (
+                    round(summary["num_explicit_songs"] / num_unique, 4)
+                    if num_unique
+                    else 0.0
+                ),
+            }
+        )
+        return summary
+
+    def get_playlist_summaries(self) -> list[dict]:
+        return [playlist.get_summary() for playlist in self.playlists]
+
+    def build_similarity_index(
+        self, path: str = SIMILARITY_INDEX_PATH
+    ) -> SimilarityIndex:
+        """
+        Añade las playlists de la biblioteca al índice de similitud en disco. Las
+        que ya estaban con el mismo `snapshot_id` no se vuelven a calcular.
+        """
+        index = SimilarityIndex(path)
+        with instrumentation.span("similarity.index"):
+            for playlist in self.playlists:
+                index.add_playlist(playlist)
+        return index
+
+
+def list_user_playlists(sp_client: spotipy.Spotify) -> list[dict]:
+    """
+    Todas las playlists que el usuario tiene o sigue, recorriendo la paginación
+    de /me/playlists. Devuelve id, nombre y snapshot_id de cada una.
+    """
+    scheduler = get_scheduler()
+    playlists = []
+    offset = 0
+    while True:
+        page = scheduler.call(
+            sp_client.current_user_playlists, limit=PLAYLISTS_PAGE_SIZE, offset=offset
+        )
+        items = page.get("items") or []
+        playlists.extend(
+            {
+                "id": item["id"],
+                "name": item.get("name", "Nombre desconocido"),
+                "snapshot_id": item.get("snapshot_id"),
+            }
+            for item in items
+            if item
+        )
+        offset += len(items)
+        if not items or offset >= (page.get("total") or 0):
+            break
+    return playlists
+
+
+def _load_playlist_songs(
+    sp_client: spotipy.Spotify, info: dict, registry: ModelRegistry
+) -> list[Song]:
+    """
+    Canciones de una playlist de la biblioteca: de la caché local si su
+    `snapshot_id` coincide; si no, página a página (con todos los datos de cada
+    pista) hasta el `total`, y se guardan en la caché.
+    """
+    playlist_id = info["id"]
+    snapshot_id = info["snapshot_id"]
+    cache = get_track_cache() if snapshot_id else None
+    if cache:
+        with instrumentation.span("cache.read"):
+            songs = cache.get(playlist_id, snapshot_id, registry)
+        if songs is not None:
+            instrumentation.increment("cached_playlists")
+            return songs
+
+    songs = []
+    offset = 0
+    while True:
+        page = _fetch_playlist_page(sp_client, playlist_id, offset)
+        items = page.get("items") or []
+        songs.extend(_songs_from_items(items, registry))
+        offset += len(items)
+        if not items or offset >= (page.get("total") or 0):
+            break
+    if cache:
+        with instrumentation.span("cache.write"):
+            cache.put(playlist_id, info["name"], snapshot_id, songs)
+    return songs
+
+
+def analyze_library(
+    sp_client: spotipy.Spotify,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    progress_callback: LibraryProgressCallback | None = None,
+) -> Library:
+    """
+    Analiza todas las playlists del usuario.
+
+    1. Lista las playlists (paginado), con su `snapshot_id`.
+    2. Carga a la vez las canciones de cada playlist: de la caché local si no ha
+       cambiado y, si no, con sus páginas completas (una petición por cada
+       PAGE_SIZE pistas, como una playlist suelta).
+    3. Construye una Playlist por playlist. Un único ModelRegistry hace que cada
+       artista y cada pista existan una sola vez en memoria, por muchas
+       playlists que la contengan.
+    """
+    if not sp_client:
+        raise Exception(
+            "El cliente de Spotify no se pudo inicializar. Verifica tus credenciales o conexión."
+        )
+
+    registry = ModelRegistry()
+    try:
+        playlist_infos = list_user_playlists(sp_client)
+        songs_by_playlist = []
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            for done, songs in enumerate(
+                executor.map(
+                    lambda info: _load_playlist_songs(sp_client, info, registry),
+                    playlist_infos,
+                ),
+                start=1,
+            ):
+                # En orden de playlist: la primera aparición de cada pista es la
+                # que se comparte, y `songs_by_id` conserva ese orden
+                songs_by_playlist.append([registry.song(song) for song in songs])
+                if progress_callback:
+                    progress_callback(done, len(playlist_infos))
+    except spotipy.SpotifyException as e:
+        logging.error(f"Error de Spotify al analizar la biblioteca: {e}")
+        raise
+
+    songs_by_id = {song.id: song for songs in songs_by_playlist for song in songs}
+    playlists = [
+        Playlist(
+            id=info["id"],
+            name=info["name"],
+            songs=songs,
+            snapshot_id=info["snapshot_id"],
+        )
+        for info, songs in zip(playlist_infos, songs_by_playlist)
+    ]
+    instrumentation.increment("tracks", len(songs_by_id))
+    logging.info(
+        "Biblioteca analizada: %d playlists, %d pistas únicas.",
+        len(playlists),
+        len(songs_by_id),
+    )
+    return Library(playlists, songs_by_id)
@@ -0,0 +1,162 @@
+# logging_config.py
+
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+LOG_PATH = "playlab.log"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+# Nivel inicial; se puede cambiar con PLAYLAB_LOG_LEVEL o, en marcha, con set_log_level
+LOG_LEVEL_ENV = "PLAYLAB_LOG_LEVEL"
+DEFAULT_LOG_LEVEL = "INFO"
+# Rotación del fichero de log: tamaño máximo y número de copias antiguas
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+# Registros por debajo de INFO que se agrupan en el hilo que llama antes de encolarlos
+LOG_BATCH_SIZE = 256
+
+_listener = None
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Encola el registro tal cual, sin formatearlo. El QueueHandler estándar
+    formatea el mensaje (y la traza de una excepción) en `prepare`, es decir, en
+    el hilo que llama; aquí ese trabajo lo hace el hilo del listener.
+
+    La cola no sale del proceso, así que no hace falta que el registro se pueda
+    serializar. Como los argumentos se formatean más tarde, no se deben pasar
+    objetos que el llamante vaya a modificar justo después de registrarlos.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _BatchingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Fichero rotativo para el hilo del listener: acumula las líneas formateadas
+    mientras queden registros en la cola y las escribe de una vez, con una sola
+    comprobación de rotación y un solo flush por lote. El RotatingFileHandler
+    estándar formatea cada registro dos veces (una para decidir si rota), y busca
+    el final del fichero y hace flush tras cada uno.
+
+    El tamaño para rotar se cuenta en caracteres, no en bytes, así que con texto
+    no ASCII el fichero puede pasar algo de `maxBytes`.
+    """
+
+    def __init__(self, log_queue: queue.SimpleQueue, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._queue = log_queue
+        self._pending = []
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self._pending.append(self.format(record) + self.terminator)
+            if self._queue.empty():
+                self._write_pending()
+        except Exception:
+            self.handleError(record)
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending.clear()
+        if self.stream is None:
+            self.stream = self._open()
+        if self.maxBytes > 0:
+            position = self.stream.tell()
+            if position and position + len(text) >= self.maxBytes:
+                self.doRollover()
+        self.stream.write(text)
+        self.stream.flush()
+
+    def close(self):
+        with self.lock:
+            try:
+                self._write_pending()
+            finally:
+                super().close()
+
+
+def configure_logging(
+    level: str | int | None = None,
+    path: str = LOG_PATH,
+    max_bytes: int = LOG_MAX_BYTES,
+    backup_count: int = LOG_BACKUP_COUNT,
+):
+    """
+    Configura el log de la aplicación. La llaman los puntos de entrada (GUI y
+    terminal), no la importación de los módulos.
+
+    Los hilos que registran mensajes solo dejan el registro, sin formatear, en
+    una cola; un hilo en segundo plano (QueueListener) sustituye los argumentos,
+    lo formatea y lo escribe en un fichero que rota al llegar a `max_bytes`. Así
+    el hilo de la GUI o los de descarga ni formatean ni esperan a una escritura
+    en disco.
+
+    Los registros DEBUG (varios por página descargada, con la respuesta entera de
+    spotipy) se agrupan antes en un MemoryHandler y pasan a la cola de
+    LOG_BATCH_SIZE en LOG_BATCH_SIZE, o en cuanto llega uno de nivel INFO o
+    superior, o al cerrar el log. Encolarlos uno a uno despierta al listener por
+    cada registro, y con un solo hilo de descarga ese ir y venir del GIL costaba
+    más que escribir en el propio hilo. A cambio, un mensaje DEBUG puede tardar en
+    aparecer en el fichero hasta que llega el siguiente INFO.
+    """
+    global _listener
+    if _listener is not None:
+        set_log_level(level or os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL))
+        return
+
+    log_queue = queue.SimpleQueue()
+    file_handler = _BatchingFileHandler(
+        log_queue, path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(
+        logging.handlers.MemoryHandler(
+            LOG_BATCH_SIZE,
+            flushLevel=logging.INFO,
+            target=_DeferredQueueHandler(log_queue),
+        )
+    )
+    set_log_level(level or os.environ.get(LOG_LEVEL_ENV, DEFAULT_LOG_LEVEL))
+
+
+def set_log_level(level: str | int):
+    """
+    Cambia el nivel del log en marcha (p. ej. "DEBUG" para diagnosticar un problema).
+    Los mensajes por debajo del nivel se descartan antes de formatearse.
+    """
+    if isinstance(level, str):
+        level = level.upper()
+    logging.getLogger().setLevel(level)
+
+
+def shutdown_logging():
+    """
+    Escribe los mensajes pendientes y detiene el hilo del log.
+    """
+    global _listener
+    if _listener is None:
+        return
+    # Primero se pasan a la cola los registros agrupados, y luego se vacía la cola
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, logging.handlers.MemoryHandler):
+            root.removeHandler(handler)
+            handler.close()
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
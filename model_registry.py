@@ -0,0 +1,51 @@
+# model_registry.py
+
+from artist import Artist
+from song import Song
+
+
+class ModelRegistry:
+    """
+    Registro de objetos compartidos (flyweights) para cargas grandes: cada artista
+    existe una sola vez por id y cada nombre de álbum una sola vez como cadena,
+    por muchas canciones que los referencien. Con `song`, también cada pista
+    existe una sola vez por id entre varias playlists.
+
+    Un mismo registro puede compartirse entre varias playlists (p. ej. al cargar
+    toda la biblioteca de un usuario).
+    """
+
+    def __init__(self):
+        self._artists = {}
+        self._albums = {}
+        self._songs = {}
+
+    def artist(self, id: str, name: str) -> Artist:
+        artist = self._artists.get(id)
+        if artist is None:
+            artist = self._artists[id] = Artist(id=id, name=name)
+        elif artist.name != name:
+            # Mismo id con otro nombre (p. ej. artistas sin id): no se comparte
+            return Artist(id=id, name=name)
+        return artist
+
+    def album(self, name: str) -> str:
+        return self._albums.setdefault(name, name)
+
+    def song(self, song: Song) -> Song:
+        """
+        Devuelve el Song ya registrado con el mismo id, o registra este.
+        """
+        return self._songs.setdefault(song.id, song)
+
+    @property
+    def num_artists(self) -> int:
+        return len(self._artists)
+
+    @property
+    def num_albums(self) -> int:
+        return len(self._albums)
+
+    @property
+    def num_songs(self) -> int:
+        return len(self._songs)
@@ -2,88 +2,631 @@
 
 from song import Song
 from artist import Artist
-from collections import Counter
+import heapq
+import itertools
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterable
+
+import numpy as np
+
+import instrumentation
+from collaboration_graph import CollaborationGraph
+from playlist_columns import PlaylistColumns
+from playlist_query import PlaylistIndex, SongQuery
 from utils import format_duration_ms
 
 
+# Separación inicial entre claves de orden consecutivas (ver _PlaylistOrder)
+_ORDER_KEY_GAP = 1 << 32
+# Valor imposible como álbum, para distinguir "canción eliminada" de álbum None
+_MISSING = object()
+
+
+class _PlaylistOrder:
+    """
+    Claves de orden de las canciones (`keys`, en paralelo a `songs`): enteros
+    crecientes con la posición, de modo que comparar dos claves equivale a
+    comparar las posiciones de sus canciones sin recorrer la lista.
+
+    Las canciones insertadas reciben claves repartidas en el hueco entre sus
+    vecinas. Si no caben, se renumeran todas (`insert` devuelve True) y las
+    estructuras que usan las claves se deben reconstruir; con huecos de 2**32 esto
+    solo ocurre tras muchas inserciones seguidas en el mismo punto.
+    """
+
+    def __init__(self, num_songs: int):
+        self.keys = [i * _ORDER_KEY_GAP for i in range(num_songs)]
+
+    def insert(self, position: int, count: int) -> bool:
+        keys = self.keys
+        if not count:
+            return False
+        low = keys[position - 1] if position > 0 else None
+        high = keys[position] if position < len(keys) else None
+        if low is None and high is None:
+            new_keys = [i * _ORDER_KEY_GAP for i in range(count)]
+        elif high is None:
+            new_keys = [low + (i + 1) * _ORDER_KEY_GAP for i in range(count)]
+        elif low is None:
+            new_keys = [high - (count - i) * _ORDER_KEY_GAP for i in range(count)]
+        else:
+            step = (high - low) // (count + 1)
+            if not step:
+                keys[position:position] = [None] * count
+                keys[:] = [i * _ORDER_KEY_GAP for i in range(len(keys))]
+                return True
+            new_keys = [low + (i + 1) * step for i in range(count)]
+        keys[position:position] = new_keys
+        return False
+
+
+class _DurationIndex:
+    """
+    Canción más corta y más larga con altas y bajas en O(log n): dos montículos
+    con borrado perezoso, por (duración, clave de orden).
+
+    Como en el cálculo completo, en caso de empate de duración gana la que aparece
+    antes en la playlist, que es la de menor clave: el empate se resuelve en el
+    propio montículo. Una clave puede reutilizarse tras eliminar su canción, así
+    que una entrada solo es válida si la canción viva con esa clave tiene esa
+    duración.
+    """
+
+    def __init__(self, songs: list[Song], keys: list[int]):
+        self._songs = dict(zip(keys, songs))  # clave -> canción viva
+        # Duraciones > 0 para la más corta, como en el cálculo completo
+        self._min_heap = [
+            (song.duration_ms, key)
+            for key, song in self._songs.items()
+            if song.duration_ms > 0
+        ]
+        self._max_heap = [(-song.duration_ms, key) for key, song in self._songs.items()]
+        heapq.heapify(self._min_heap)
+        heapq.heapify(self._max_heap)
+
+    def add(self, key: int, song: Song):
+        self._songs[key] = song
+        if song.duration_ms > 0:
+            heapq.heappush(self._min_heap, (song.duration_ms, key))
+        heapq.heappush(self._max_heap, (-song.duration_ms, key))
+
+    def remove(self, key: int):
+        del self._songs[key]
+        # Si los montículos acumulan demasiadas entradas muertas, se compactan
+        if len(self._max_heap) > 2 * len(self._songs) + 64:
+            self._min_heap = [e for e in self._min_heap if self._is_live(e[0], e[1])]
+            self._max_heap = [e for e in self._max_heap if self._is_live(-e[0], e[1])]
+            heapq.heapify(self._min_heap)
+            heapq.heapify(self._max_heap)
+
+    def _is_live(self, duration_ms: int, key: int) -> bool:
+        song = self._songs.get(key)
+        return song is not None and song.duration_ms == duration_ms
+
+    def shortest(self) -> Song | None:
+        heap = self._min_heap
+        while heap and not self._is_live(heap[0][0], heap[0][1]):
+            heapq.heappop(heap)
+        return self._songs[heap[0][1]] if heap else None
+
+    def longest(self) -> Song | None:
+        heap = self._max_heap
+        while heap and not self._is_live(-heap[0][0], heap[0][1]):
+            heapq.heappop(heap)
+        if not heap or heap[0][0] >= 0:
+            return None
+        return self._songs[heap[0][1]]
+
+
+class _AlbumRanking:
+    """
+    Álbum más representado con altas y bajas en O(log n).
+
+    Para cada álbum se guarda un montículo con las claves de orden de sus
+    canciones, cuya cima es su primera aparición, y los álbumes se agrupan por
+    número de canciones en montículos por (primera aparición, álbum). Como en el
+    cálculo completo, si varios empatan en el máximo gana el que aparece antes en
+    la playlist. Todos los montículos usan borrado perezoso: una entrada de grupo
+    solo es válida si el álbum sigue teniendo ese número de canciones y esa
+    primera aparición.
+    """
+
+    def __init__(self, songs: list[Song], keys: list[int]):
+        self._albums = {}  # clave -> álbum de la canción viva
+        self._keys = defaultdict(list)  # álbum -> montículo de claves
+        self._counts = {}
+        for key, song in zip(keys, songs):
+            self._albums[key] = song.album
+            # Las claves llegan en orden creciente: cada lista ya es un montículo
+            self._keys[song.album].append(key)
+        self._buckets = defaultdict(list)  # número de canciones -> montículo
+        self._num_entries = 0
+        self._entry_ids = itertools.count()  # desempate: los álbumes pueden ser None
+        for album, album_keys in self._keys.items():
+            self._counts[album] = len(album_keys)
+            self._push(album)
+        for bucket in self._buckets.values():
+            heapq.heapify(bucket)
+        self._max = max(self._buckets, default=0)
+
+    def _first_key(self, album) -> int:
+        album_keys = self._keys[album]
+        while self._albums.get(album_keys[0], _MISSING) != album:
+            heapq.heappop(album_keys)
+        return album_keys[0]
+
+    def _push(self, album):
+        count = self._counts[album]
+        entry = (self._first_key(album), next(self._entry_ids), album)
+        heapq.heappush(self._buckets[count], entry)
+        self._num_entries += 1
+
+    def add(self, key: int, song: Song):
+        album = song.album
+        self._albums[key] = album
+        heapq.heappush(self._keys[album], key)
+        self._counts[album] = self._counts.get(album, 0) + 1
+        self._push(album)
+        self._max = max(self._max, self._counts[album])
+
+    def remove(self, key: int):
+        album = self._albums.pop(key)
+        self._counts[album] -= 1
+        if self._counts[album]:
+            self._push(album)
+        else:
+            del self._counts[album]
+            del self._keys[album]
+        if self._num_entries > 2 * len(self._albums) + 64:
+            self._compact()
+
+    def _is_live(self, entry: tuple, count: int) -> bool:
+        first_key, _, album = entry
+        return self._counts.get(album) == count and self._first_key(album) == first_key
+
+    def _compact(self):
+        for count, bucket in list(self._buckets.items()):
+            bucket[:] = [entry for entry in bucket if self._is_live(entry, count)]
+            heapq.heapify(bucket)
+            if not bucket:
+                del self._buckets[count]
+        self._num_entries = sum(len(bucket) for bucket in self._buckets.values())
+
+    def top(self) -> tuple:
+        while self._max:
+            bucket = self._buckets.get(self._max)
+            while bucket:
+                if self._is_live(bucket[0], self._max):
+                    return (bucket[0][2], self._max)
+                heapq.heappop(bucket)
+            self._max -= 1
+        return ("N/A", 0)
+
+
 class Playlist:
-    def __init__(self, id: str, name: str, songs: list[Song]):
+    # Estadísticas derivadas que se calculan la primera vez que se leen. Las que
+    # comparten recorrido sobre las canciones se calculan juntas con el mismo método.
+    _LAZY_STATS = {
+        "num_songs": "_calculate_num_songs",
+        "total_duration_ms": "_calculate_duration_stats",
+        "duration_minutes": "_calculate_duration_stats",
+        "shortest_song": "_calculate_duration_stats",
+        "longest_song": "_calculate_duration_stats",
+        "num_explicit_songs": "_calculate_explicit_stats",
+        "num_artists": "_calculate_artist_stats",
+        "artist_frequencies": "_calculate_artist_stats",
+        "num_collaborative_songs": "_calculate_artist_stats",
+        "num_non_collaborative_songs": "_calculate_artist_stats",
+        "artist_collaboration_counts": "_calculate_artist_stats",
+        "album_counts": "_calculate_album_stats",
+        "num_unique_albums": "_calculate_album_stats",
+        "most_represented_album": "_calculate_album_stats",
+        "genre_counts": "_calculate_enrichment_stats",
+        "release_year_counts": "_calculate_enrichment_stats",
+        "artist_popularity": "_calculate_enrichment_stats",
+        "average_artist_popularity": "_calculate_enrichment_stats",
+    }
+    _ENRICHMENT_STATS = (
+        "genre_counts",
+        "release_year_counts",
+        "artist_popularity",
+        "average_artist_popularity",
+    )
+
+    def __init__(
+        self, id: str, name: str, songs: list[Song], snapshot_id: str | None = None
+    ):
         self.id = id
         self.name = name
         self.songs = songs
-        self._calculate_stats()
+        self.snapshot_id = snapshot_id  # Versión de la playlist según Spotify
+        self._columns = None  # PlaylistColumns, creadas al calcular la primera estadística
+        # Estructuras para actualizar estadísticas incrementalmente; se crean en la
+        # primera modificación para no penalizar a las playlists de solo lectura
+        self._song_order = None  # _PlaylistOrder
+        self._duration_index = None
+        self._album_ranking = None
+        self._song_loader = None  # Crea `songs` bajo demanda (ver from_columns)
+        self._collaboration_graph = None
+        self._query_index = None  # PlaylistIndex, creado en la primera consulta
+        # Datos de artistas y álbumes por id (ver enrichment.py); None si no se
+        # ha enriquecido la playlist
+        self.artist_info = None
+        self.album_info = None
 
-    def _calculate_stats(self):
+    @classmethod
+    def from_columns(
+        cls,
+        id: str,
+        name: str,
+        columns: PlaylistColumns,
+        song_loader: Callable[[], list[Song]],
+        snapshot_id: str | None = None,
+    ) -> "Playlist":
+        """
+        Playlist cuyas estadísticas salen de `columns`; `song_loader` crea los
+        objetos Song la primera vez que se accede a `songs`.
+        """
+        playlist = cls(id, name, [], snapshot_id)
+        del playlist.songs
+        playlist._columns = columns
+        playlist._song_loader = song_loader
+        return playlist
+
+    def __getattr__(self, name: str):
+        # Solo se llama si el atributo aún no existe: calcula su grupo y lo memoriza
+        if name == "songs" and self._song_loader is not None:
+            self.songs = self._song_loader()
+            self._song_loader = None
+            return self.songs
+        method = Playlist._LAZY_STATS.get(name)
+        if method is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        with instrumentation.span(f"stats.{method.removeprefix('_calculate_')}"):
+            getattr(self, method)()
+        return self.__dict__[name]
+
+    @property
+    def columns(self) -> PlaylistColumns:
+        if self._columns is None:
+            self._columns = PlaylistColumns.from_songs(self.songs)
+        return self._columns
+
+    @property
+    def collaboration_graph(self) -> CollaborationGraph:
+        """
+        Grafo de colaboraciones entre los artistas de la playlist (por id), creado
+        en el primer acceso.
+        """
+        if self._collaboration_graph is None:
+            with instrumentation.span("stats.collaboration_graph"):
+                self._collaboration_graph = CollaborationGraph.from_songs(self.songs)
+        return self._collaboration_graph
+
+    def query(self) -> SongQuery:
+        """
+        Consulta sobre las canciones de la playlist (filtros, agrupaciones, top-k)
+        apoyada en índices por artista, álbum y duración, que se crean en la
+        primera consulta y se reutilizan en las siguientes.
+        """
+        if self._query_index is None:
+            with instrumentation.span("query.index"):
+                self._query_index = PlaylistIndex(self.songs, self.columns)
+        return SongQuery(self._query_index, self.songs)
+
+    def _calculate_stats(self, columns: PlaylistColumns | None = None):
         """
         Calcula varias estadísticas sobre la playlist y las almacena como atributos.
         No incluye estadísticas basadas en audio_features.
+
+        Las canciones se pasan primero a columnas (PlaylistColumns) y todas las
+        estadísticas se obtienen con reducciones vectorizadas de NumPy. Si ya se
+        dispone de las columnas, se pueden pasar directamente.
+
+        Normalmente no hace falta llamarlo: cada estadística se calcula sola la
+        primera vez que se lee.
         """
-        self.num_songs = len(self.songs)
-        unique_artists = set()
-        self.total_duration_ms = 0  # Inicialización correcta de total_duration_ms
-        all_artists_names = []
+        if columns is not None:
+            self._columns = columns
+        with instrumentation.span("stats.calculate"):
+            self._calculate_num_songs()
+            self._calculate_duration_stats()
+            self._calculate_explicit_stats()
+            self._calculate_artist_stats()
+            self._calculate_album_stats()
 
-        # Inicialización de estadísticas de colaboración y explícitas
-        self.num_explicit_songs = 0
-        self.num_collaborative_songs = 0
-        self.artist_collaboration_counts = Counter()
+    def _calculate_num_songs(self):
+        self.num_songs = len(self.columns)
 
-        # Inicialización de nuevas estadísticas solicitadas
-        self.album_counts = Counter()  # Para contar frecuencias de álbumes
+    def _calculate_duration_stats(self):
+        durations = self.columns.durations
+        self.total_duration_ms = int(durations.sum())
+        self.duration_minutes = round(
+            self.total_duration_ms / 60000, 2
+        )  # Esta variable se puede mantener para un resumen general si se desea
 
-        # Inicialización de shortest_song y longest_song directamente con MS
+        # Canción más corta y más larga. Solo consideramos canciones con duración > 0
+        # para la más corta; argmin/argmax devuelven la primera aparición, como el
+        # recorrido secuencial con comparaciones estrictas.
         self.shortest_song = {"title": "N/A", "duration_ms": float("inf")}
         self.longest_song = {"title": "N/A", "duration_ms": 0}
+        positive = durations > 0
+        if positive.any():
+            titles = self.columns.titles
+            shortest_index = int(
+                np.argmin(np.where(positive, durations, np.iinfo(np.int64).max))
+            )
+            self.shortest_song = {
+                "title": titles[shortest_index],
+                "duration_ms": int(durations[shortest_index]),
+            }
+            longest_index = int(np.argmax(durations))
+            self.longest_song = {
+                "title": titles[longest_index],
+                "duration_ms": int(durations[longest_index]),
+            }
 
-        for song in self.songs:
-            self.total_duration_ms += song.duration_ms  # Acumula aquí
+    def _calculate_explicit_stats(self):
+        self.num_explicit_songs = int(np.count_nonzero(self.columns.explicit))
 
-            # Estadísticas de canciones explícitas
-            if song.explicit:
-                self.num_explicit_songs += 1
+    def _calculate_artist_stats(self):
+        columns = self.columns
 
-            # Estadísticas de canciones colaborativas
-            if (
-                len(song.artists) > 1
-            ):  # Una canción es colaborativa si tiene más de un artista
-                self.num_collaborative_songs += 1
-                for artist in song.artists:
-                    self.artist_collaboration_counts[artist.name] += 1
+        # Una canción es colaborativa si tiene más de un artista
+        artists_per_song = columns.artists_per_song
+        is_collaborative = artists_per_song > 1
+        self.num_collaborative_songs = int(np.count_nonzero(is_collaborative))
+        self.num_non_collaborative_songs = (
+            len(columns) - self.num_collaborative_songs
+        )
 
-            # Conteo de artistas para frecuencias
-            for artist in song.artists:
-                unique_artists.add(artist.name)
-                all_artists_names.append(artist.name)
-
-            # Conteo de álbumes
-            self.album_counts[song.album] += 1
-
-            # Determinación de la canción más corta y más larga usando duration_ms
-            # Solo consideramos canciones con duración > 0 para evitar duraciones "infinitas" o errores
-            if (
-                song.duration_ms > 0
-                and song.duration_ms < self.shortest_song["duration_ms"]
-            ):
-                self.shortest_song["duration_ms"] = song.duration_ms
-                self.shortest_song["title"] = song.title
-
-            if song.duration_ms > self.longest_song["duration_ms"]:
-                self.longest_song["duration_ms"] = song.duration_ms
-                self.longest_song["title"] = song.title
-
-        # Finalización de cálculos basados en iteraciones
-        self.num_non_collaborative_songs = self.num_songs - self.num_collaborative_songs
-        self.num_artists = len(unique_artists)
-        self.duration_minutes = round(
-            self.total_duration_ms / 60000, 2
-        )  # Esta variable se puede mantener para un resumen general si se desea
-        self.artist_frequencies = Counter(all_artists_names)
+        # Frecuencias de artistas: los códigos siguen el orden de primera aparición
+        artist_counts = np.bincount(
+            columns.artist_codes, minlength=len(columns.artist_names)
+        )
+        self.artist_frequencies = Counter(
+            dict(zip(columns.artist_names, artist_counts.tolist()))
+        )
+        self.num_artists = len(columns.artist_names)
+
+        # Colaboraciones: solo los créditos de canciones colaborativas, en el orden
+        # en que cada artista aparece por primera vez en una de ellas
+        collaborative_codes = columns.artist_codes[
+            np.repeat(is_collaborative, artists_per_song)
+        ]
+        codes, first_seen, counts = np.unique(
+            collaborative_codes, return_index=True, return_counts=True
+        )
+        order = np.argsort(first_seen, kind="stable")
+        self.artist_collaboration_counts = Counter(
+            {
+                columns.artist_names[code]: count
+                for code, count in zip(codes[order].tolist(), counts[order].tolist())
+            }
+        )
+
+    def _calculate_album_stats(self):
+        columns = self.columns
+
+        # Conteo de álbumes
+        album_counts = np.bincount(
+            columns.album_codes, minlength=len(columns.album_names)
+        )
+        self.album_counts = Counter(dict(zip(columns.album_names, album_counts.tolist())))
 
         # Nuevas estadísticas derivadas de album_counts
         self.num_unique_albums = len(self.album_counts)
-        # most_common(1) devuelve una lista de una tupla, ej: [('Album A', 10)]
-        self.most_represented_album = (
-            self.album_counts.most_common(1)[0] if self.album_counts else ("N/A", 0)
+        if self.num_unique_albums:
+            # argmax devuelve el primer máximo, igual que most_common(1)
+            top_album = int(np.argmax(album_counts))
+            self.most_represented_album = (
+                columns.album_names[top_album],
+                int(album_counts[top_album]),
+            )
+        else:
+            self.most_represented_album = ("N/A", 0)
+
+    def apply_enrichment(
+        self, artist_info: dict[str, dict], album_info: dict[str, dict]
+    ):
+        """
+        Asocia a la playlist los datos de sus artistas (géneros, popularidad) y
+        álbumes (fecha de publicación), por id. Las estadísticas que dependen de
+        ellos se recalculan en la siguiente lectura.
+        """
+        self.artist_info = artist_info
+        self.album_info = album_info
+        for name in self._ENRICHMENT_STATS:
+            self.__dict__.pop(name, None)
+
+    def _calculate_enrichment_stats(self):
+        """
+        Estadísticas a partir de los datos de enriquecimiento:
+        - `genre_counts`: canciones por género (una canción cuenta una vez por
+          cada género de alguno de sus artistas);
+        - `release_year_counts`: canciones por año de publicación del álbum, de
+          más antiguo a más reciente;
+        - `artist_popularity`: popularidad (0-100) de cada artista, por nombre;
+        - `average_artist_popularity`: media por crédito, o None sin datos.
+
+        Sin enriquecimiento quedan vacías, sin recorrer las canciones.
+        """
+        self.genre_counts = Counter()
+        self.release_year_counts = Counter()
+        self.artist_popularity = Counter()
+        self.average_artist_popularity = None
+        if self.artist_info is None:
+            return
+
+        artist_info = self.artist_info
+        album_info = self.album_info or {}
+        years = Counter()
+        popularity_total = 0
+        popularity_credits = 0
+        for song in self.songs:
+            genres = set()
+            for artist in song.artists:
+                info = artist_info.get(artist.id)
+                if info is None:
+                    continue
+                genres.update(info["genres"])
+                if info["popularity"] is not None:
+                    self.artist_popularity.setdefault(artist.name, info["popularity"])
+                    popularity_total += info["popularity"]
+                    popularity_credits += 1
+            for genre in genres:
+                self.genre_counts[genre] += 1
+            album = album_info.get(song.album_id)
+            release_date = album and album["release_date"]
+            if release_date and release_date[:4].isdigit():
+                years[int(release_date[:4])] += 1
+
+        self.release_year_counts = Counter(dict(sorted(years.items())))
+        self.artist_popularity = Counter(dict(self.artist_popularity.most_common()))
+        if popularity_credits:
+            self.average_artist_popularity = round(
+                popularity_total / popularity_credits, 1
+            )
+
+    def add_songs(self, songs: list[Song], position: int | None = None):
+        """
+        Inserta canciones en `position` (al final por defecto) y actualiza las
+        estadísticas en tiempo proporcional al número de canciones añadidas.
+
+        Tras una modificación los contadores (artist_frequencies,
+        artist_collaboration_counts, album_counts) tienen los mismos valores que
+        con un cálculo completo, pero sus claves siguen el orden en que se fueron
+        añadiendo y no el de primera aparición en la playlist, así que los empates
+        de `most_common()` pueden salir en otro orden. El resto de estadísticas,
+        incluidos los desempates de canción más corta, más larga y álbum más
+        representado, coincide con un cálculo completo.
+        """
+        if position is None:
+            position = len(self.songs)
+        position = slice(position, position).indices(len(self.songs))[0]
+        self._ensure_incremental_state()
+        self._insert_songs(position, songs)
+        self._finish_incremental_update()
+
+    def remove_songs(self, positions: list[int]):
+        """
+        Elimina las canciones de las posiciones indicadas y actualiza las
+        estadísticas en tiempo proporcional al número de canciones eliminadas.
+        Las posiciones negativas cuentan desde el final, como en las listas; si
+        alguna está fuera de la playlist no se elimina ninguna. Ver `add_songs`
+        sobre el orden de los contadores.
+        """
+        num_songs = len(self.songs)
+        normalized = set()
+        for position in positions:
+            if not -num_songs <= position < num_songs:
+                raise IndexError(f"La posición {position} está fuera de la playlist.")
+            normalized.add(position % num_songs)
+        self._ensure_incremental_state()
+        for position in sorted(normalized, reverse=True):
+            self._delete_songs(position, position + 1)
+        self._finish_incremental_update()
+
+    def replace_songs(self, start: int, songs: list[Song], end: int | None = None):
+        """
+        Sustituye las canciones del tramo [start, end) por `songs`, como
+        `songs[start:end] = songs`. Por defecto `end` es `start + len(songs)`, es
+        decir, se reemplaza el mismo número de canciones; con otro `end` el tramo
+        puede crecer o encoger. Sirve tanto para editar pistas como para reordenar
+        un tramo: el coste es proporcional a `end - start + len(songs)`. Ver
+        `add_songs` sobre el orden de los contadores.
+        """
+        if end is None:
+            end = start + len(songs)
+        if not 0 <= start <= end <= len(self.songs):
+            raise IndexError("El tramo a reemplazar está fuera de la playlist.")
+        self._ensure_incremental_state()
+        self._delete_songs(start, end)
+        self._insert_songs(start, songs)
+        self._finish_incremental_update()
+
+    def _ensure_incremental_state(self):
+        if self._song_order is None:
+            # Los contadores se actualizan a partir de aquí: se calculan todos antes
+            # de la primera modificación
+            self._calculate_stats()
+            self._song_order = _PlaylistOrder(len(self.songs))
+            self._build_order_indexes()
+
+    def _build_order_indexes(self):
+        keys = self._song_order.keys
+        self._duration_index = _DurationIndex(self.songs, keys)
+        self._album_ranking = _AlbumRanking(self.songs, keys)
+
+    def _insert_songs(self, position: int, songs: list[Song]):
+        self.songs[position:position] = songs
+        for song in songs:
+            self._update_song_stats(song, 1)
+        if self._song_order.insert(position, len(songs)):
+            # Se han renumerado las claves de orden: los índices se reconstruyen
+            self._build_order_indexes()
+            return
+        keys = self._song_order.keys[position : position + len(songs)]
+        for key, song in zip(keys, songs):
+            self._duration_index.add(key, song)
+            self._album_ranking.add(key, song)
+
+    def _delete_songs(self, start: int, end: int):
+        keys = self._song_order.keys
+        for key, song in zip(keys[start:end], self.songs[start:end]):
+            self._duration_index.remove(key)
+            self._album_ranking.remove(key)
+            self._update_song_stats(song, -1)
+        del keys[start:end]
+        del self.songs[start:end]
+
+    def _update_song_stats(self, song: Song, sign: int):
+        """
+        Suma (sign=1) o resta (sign=-1) la contribución de una canción a los contadores.
+        """
+        self.total_duration_ms += sign * song.duration_ms
+        if song.explicit:
+            self.num_explicit_songs += sign
+
+        names = [artist.name for artist in song.artists]
+        _add_counts(self.artist_frequencies, names, sign)
+        if len(names) > 1:
+            self.num_collaborative_songs += sign
+            _add_counts(self.artist_collaboration_counts, names, sign)
+
+        _add_counts(self.album_counts, [song.album], sign)
+
+    def _finish_incremental_update(self):
+        """
+        Recalcula en O(1) las estadísticas derivadas de los contadores.
+        """
+        # Las columnas, el grafo y los índices ya no reflejan las canciones; se
+        # reconstruyen si se piden
+        self._columns = None
+        self._collaboration_graph = None
+        self._query_index = None
+        for name in self._ENRICHMENT_STATS:
+            self.__dict__.pop(name, None)
+        self.num_songs = len(self.songs)
+        self.num_non_collaborative_songs = self.num_songs - self.num_collaborative_songs
+        self.num_artists = len(self.artist_frequencies)
+        self.duration_minutes = round(self.total_duration_ms / 60000, 2)
+        self.num_unique_albums = len(self.album_counts)
+        self.most_represented_album = self._album_ranking.top()
+
+        shortest = self._duration_index.shortest()
+        longest = self._duration_index.longest()
+        self.shortest_song = (
+            {"title": shortest.title, "duration_ms": shortest.duration_ms}
+            if shortest
+            else {"title": "N/A", "duration_ms": float("inf")}
+        )
+        self.longest_song = (
+            {"title": longest.title, "duration_ms": longest.duration_ms}
+            if longest
+            else {"title": "N/A", "duration_ms": 0}
         )
 
     def get_summary(self) -> dict:
@@ -105,6 +648,11 @@ class Playlist:
             "most_represented_album": self.most_represented_album,
             "shortest_song": self.shortest_song,  # Ya tienen duration_ms
             "longest_song": self.longest_song,  # Ya tienen duration_ms
+            # Vacías si la playlist no se ha enriquecido (ver enrichment.py)
+            "genre_counts": self.genre_counts,
+            "release_year_counts": self.release_year_counts,
+            "artist_popularity": self.artist_popularity,
+            "average_artist_popularity": self.average_artist_popularity,
         }
 
     def __str__(self) -> str:
@@ -129,3 +677,86 @@ class Playlist:
         return (
             f"Playlist(id='{self.id}', name='{self.name}', num_songs={self.num_songs})"
         )
+
+
+class PlaylistStatsAccumulator:
+    """
+    Calcula las estadísticas de una playlist en una sola pasada sobre un flujo de
+    canciones, sin guardarlas. `get_summary()` devuelve lo mismo que
+    `Playlist.get_summary()` para las mismas canciones en el mismo orden.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.num_songs = 0
+        self.total_duration_ms = 0
+        self.num_explicit_songs = 0
+        self.num_collaborative_songs = 0
+        self.artist_frequencies = Counter()
+        self.artist_collaboration_counts = Counter()
+        self.album_counts = Counter()
+        self.shortest_song = {"title": "N/A", "duration_ms": float("inf")}
+        self.longest_song = {"title": "N/A", "duration_ms": 0}
+
+    def add(self, song: Song):
+        self.num_songs += 1
+        self.total_duration_ms += song.duration_ms
+        if song.explicit:
+            self.num_explicit_songs += 1
+
+        if len(song.artists) > 1:
+            self.num_collaborative_songs += 1
+            for artist in song.artists:
+                self.artist_collaboration_counts[artist.name] += 1
+        for artist in song.artists:
+            self.artist_frequencies[artist.name] += 1
+
+        self.album_counts[song.album] += 1
+
+        if 0 < song.duration_ms < self.shortest_song["duration_ms"]:
+            self.shortest_song = {"title": song.title, "duration_ms": song.duration_ms}
+        if song.duration_ms > self.longest_song["duration_ms"]:
+            self.longest_song = {"title": song.title, "duration_ms": song.duration_ms}
+
+    def add_songs(self, songs: Iterable[Song]):
+        for song in songs:
+            self.add(song)
+
+    def get_summary(self) -> dict:
+        return {
+            "name": self.name,
+            "num_songs": self.num_songs,
+            "num_artists": len(self.artist_frequencies),
+            "duration_minutes": round(self.total_duration_ms / 60000, 2),
+            "total_duration_ms": self.total_duration_ms,
+            "artist_frequencies": self.artist_frequencies,
+            "num_explicit_songs": self.num_explicit_songs,
+            "num_collaborative_songs": self.num_collaborative_songs,
+            "num_non_collaborative_songs": self.num_songs
+            - self.num_collaborative_songs,
+            "artist_collaboration_counts": self.artist_collaboration_counts,
+            "num_unique_albums": len(self.album_counts),
+            "most_represented_album": (
+                self.album_counts.most_common(1)[0] if self.album_counts else ("N/A", 0)
+            ),
+            "shortest_song": self.shortest_song,
+            "longest_song": self.longest_song,
+            # Sin enriquecimiento al procesar en streaming
+            "genre_counts": Counter(),
+            "release_year_counts": Counter(),
+            "artist_popularity": Counter(),
+            "average_artist_popularity": None,
+        }
+
+
+def _add_counts(counter: Counter, keys: list, sign: int):
+    """
+    Suma `sign` a cada clave del contador, eliminando las que llegan a cero para
+    que len(counter) siga siendo el número de valores distintos.
+    """
+    for key in keys:
+        count = counter[key] + sign
+        if count:
+            counter[key] = count
+        else:
+            del counter[key]
@@ -0,0 +1,167 @@
+# playlist_columns.py
+
+from collections.abc import Iterable
+from functools import cached_property
+from operator import attrgetter
+
+import numpy as np
+
+from song import Song
+
+
+class PlaylistColumns:
+    """
+    Representación columnar de las canciones de una playlist.
+
+    - `durations`: duración de cada canción en ms (int64).
+    - `explicit`: si cada canción es explícita (bool).
+    - `album_codes`: índice de cada canción en `album_names`.
+    - `artist_codes` + `artist_offsets`: créditos de artista en formato CSR; los
+      artistas de la canción i son `artist_codes[artist_offsets[i]:artist_offsets[i + 1]]`,
+      cada uno un índice en `artist_names`.
+
+    Los códigos se asignan por orden de primera aparición, de modo que los
+    Counter construidos a partir de ellos conservan el mismo orden de inserción
+    que los que se construyen recorriendo las canciones una a una.
+
+    Construidas con `from_songs`, cada familia de columnas (duraciones, explícitas,
+    álbumes, artistas, títulos) se calcula la primera vez que se usa.
+    """
+
+    def __init__(
+        self,
+        titles: list[str],
+        durations: np.ndarray,
+        explicit: np.ndarray,
+        album_codes: np.ndarray,
+        album_names: list[str],
+        artist_codes: np.ndarray,
+        artist_offsets: np.ndarray,
+        artist_names: list[str],
+    ):
+        self._songs = None
+        self._num_songs = len(durations)
+        self.titles = titles
+        self.durations = durations
+        self.explicit = explicit
+        self.album_codes = album_codes
+        self.album_names = album_names
+        self.artist_codes = artist_codes
+        self.artist_offsets = artist_offsets
+        self.artist_names = artist_names
+
+    @classmethod
+    def from_songs(cls, songs: list[Song]) -> "PlaylistColumns":
+        columns = cls.__new__(cls)
+        columns._songs = songs
+        columns._num_songs = len(songs)
+        return columns
+
+    # Columnas perezosas: solo se usan cuando el objeto se creó con from_songs;
+    # si se pasaron al constructor, el atributo de instancia tiene prioridad.
+    @cached_property
+    def durations(self) -> np.ndarray:
+        return np.fromiter(
+            map(attrgetter("duration_ms"), self._songs),
+            dtype=np.int64,
+            count=self._num_songs,
+        )
+
+    @cached_property
+    def explicit(self) -> np.ndarray:
+        return np.fromiter(
+            map(attrgetter("explicit"), self._songs), dtype=bool, count=self._num_songs
+        )
+
+    @cached_property
+    def titles(self) -> list[str]:
+        return [song.title for song in self._songs]
+
+    @cached_property
+    def _albums(self) -> tuple[np.ndarray, list[str]]:
+        return _encode([song.album for song in self._songs])
+
+    @cached_property
+    def album_codes(self) -> np.ndarray:
+        return self._albums[0]
+
+    @cached_property
+    def album_names(self) -> list[str]:
+        return self._albums[1]
+
+    @cached_property
+    def artist_offsets(self) -> np.ndarray:
+        artists_per_song = np.fromiter(
+            (len(song.artists) for song in self._songs),
+            dtype=np.int64,
+            count=self._num_songs,
+        )
+        artist_offsets = np.zeros(self._num_songs + 1, dtype=np.int64)
+        np.cumsum(artists_per_song, out=artist_offsets[1:])
+        return artist_offsets
+
+    @cached_property
+    def _artists(self) -> tuple[np.ndarray, list[str]]:
+        return _encode(
+            [artist.name for song in self._songs for artist in song.artists]
+        )
+
+    @cached_property
+    def artist_codes(self) -> np.ndarray:
+        return self._artists[0]
+
+    @cached_property
+    def artist_names(self) -> list[str]:
+        return self._artists[1]
+
+    def __len__(self) -> int:
+        return self._num_songs
+
+    @property
+    def artists_per_song(self) -> np.ndarray:
+        return np.diff(self.artist_offsets)
+
+
+def _encode(values: list[str]) -> tuple[np.ndarray, list[str]]:
+    """
+    Codifica cada valor como un entero, asignando los códigos por orden de primera
+    aparición. dict.fromkeys deduplica conservando ese orden sin bucle Python
+    por elemento.
+    """
+    index = dict.fromkeys(values)
+    for code, value in enumerate(index):
+        index[value] = code
+    codes = np.fromiter(map(index.__getitem__, values), dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+def _artist_credits(
+    songs: Iterable[Song],
+) -> tuple[list[str], list[str], np.ndarray, np.ndarray]:
+    """
+    Créditos de artista por id en CSR, como `artist_codes` + `artist_offsets` pero
+    con un código por id de artista en lugar de por nombre. Devuelve (ids,
+    nombres, códigos, desplazamientos), con los códigos por orden de primera
+    aparición. Un artista acreditado dos veces en la misma canción cuenta una vez.
+    """
+    index = {}
+    artist_names = []
+    codes = []
+    offsets = [0]
+    for song in songs:
+        song_codes = set()
+        for artist in song.artists:
+            code = index.get(artist.id)
+            if code is None:
+                code = index[artist.id] = len(index)
+                artist_names.append(artist.name)
+            if code not in song_codes:
+                song_codes.add(code)
+                codes.append(code)
+        offsets.append(len(codes))
+    return (
+        list(index),
+        artist_names,
+        np.array(codes, dtype=np.int64),
+        np.array(offsets, dtype=np.int64),
+    )
@@ -0,0 +1,264 @@
+# playlist_diff.py
+
+from bisect import bisect_left
+
+import numpy as np
+
+from artist import Artist
+from playlist_analyzer import Playlist
+from playlist_snapshot import PlaylistSnapshot
+from song import Song
+from utils import format_duration_ms
+
+
+class PlaylistDiff:
+    """
+    Cambios entre dos versiones de una playlist.
+
+    - `added`: (posición nueva, canción) de las canciones que no estaban.
+    - `removed`: (posición antigua, canción) de las que ya no están.
+    - `moved`: (posición antigua, posición nueva, canción) de las que siguen pero
+      cambiaron de orden relativo; las que solo se desplazan porque se añadieron
+      o quitaron otras no cuentan como movidas.
+    - `stats`: para cada estadística, el par (antes, después).
+    - `new_artists` / `removed_artists`: artistas (por id) que aparecen o
+      desaparecen.
+
+    Si ambas versiones tienen el mismo `snapshot_id`, `unchanged` es True y no se
+    compara nada más.
+    """
+
+    def __init__(
+        self,
+        old_name: str,
+        new_name: str,
+        unchanged: bool = False,
+        added: list[tuple[int, Song]] | None = None,
+        removed: list[tuple[int, Song]] | None = None,
+        moved: list[tuple[int, int, Song]] | None = None,
+        stats: dict[str, tuple] | None = None,
+        new_artists: list[Artist] | None = None,
+        removed_artists: list[Artist] | None = None,
+    ):
+        self.old_name = old_name
+        self.new_name = new_name
+        self.unchanged = unchanged
+        self.added = added or []
+        self.removed = removed or []
+        self.moved = moved or []
+        self.stats = stats or {}
+        self.new_artists = new_artists or []
+        self.removed_artists = removed_artists or []
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.removed or self.moved)
+
+    def __repr__(self) -> str:
+        return (
+            f"PlaylistDiff(unchanged={self.unchanged}, added={len(self.added)}, "
+            f"removed={len(self.removed)}, moved={len(self.moved)})"
+        )
+
+
+def _occurrence_keys(track_ids: list[str | None]) -> list[tuple[str, int]]:
+    """
+    Clave (id, n.º de aparición) de cada canción: una pista repetida en la
+    playlist se trata como varias canciones distintas.
+    """
+    seen = {}
+    keys = []
+    for track_id in track_ids:
+        occurrence = seen.get(track_id, 0)
+        seen[track_id] = occurrence + 1
+        keys.append((track_id, occurrence))
+    return keys
+
+
+def _longest_increasing_subsequence(values: list[int]) -> set[int]:
+    """
+    Índices de una subsecuencia creciente de longitud máxima de `values` (todos
+    distintos), en O(n log n) con el algoritmo de patience sorting.
+    """
+    tails = []  # menor valor final de una subsecuencia de cada longitud
+    tail_indices = []
+    previous = [-1] * len(values)
+    for i, value in enumerate(values):
+        length = bisect_left(tails, value)
+        if length == len(tails):
+            tails.append(value)
+            tail_indices.append(i)
+        else:
+            tails[length] = value
+            tail_indices[length] = i
+        previous[i] = tail_indices[length - 1] if length else -1
+
+    result = set()
+    i = tail_indices[-1] if tail_indices else -1
+    while i != -1:
+        result.add(i)
+        i = previous[i]
+    return result
+
+
+def _track_ids(version: Playlist | PlaylistSnapshot) -> list[str | None]:
+    if isinstance(version, PlaylistSnapshot):
+        return version.track_ids.tolist()
+    return [song.id for song in version.songs]
+
+
+def _songs_at(version: Playlist | PlaylistSnapshot, positions: list[int]) -> list[Song]:
+    if isinstance(version, PlaylistSnapshot):
+        return version.songs_at(positions)
+    return [version.songs[position] for position in positions]
+
+
+def _artists_by_id(version: Playlist | PlaylistSnapshot) -> dict[str, Artist]:
+    artists = {}
+    if isinstance(version, PlaylistSnapshot):
+        # La tabla de artistas está en orden de primera aparición
+        artist_ids = version.artist_ids.tolist()
+        artist_names = version.artist_names.tolist()
+        for code in np.unique(version.artist_codes).tolist():
+            artists.setdefault(artist_ids[code], Artist(artist_ids[code], artist_names[code]))
+        return artists
+    for song in version.songs:
+        for artist in song.artists:
+            artists.setdefault(artist.id, artist)
+    return artists
+
+
+def _explicit_share(playlist: Playlist) -> float:
+    return round(playlist.num_explicit_songs / playlist.num_songs, 4) if playlist.num_songs else 0.0
+
+
+def diff_playlists(
+    old: Playlist | PlaylistSnapshot, new: Playlist | PlaylistSnapshot
+) -> PlaylistDiff:
+    """
+    Compara dos versiones de una playlist en tiempo lineal (más O(k log k) para
+    las k canciones comunes al detectar las movidas) con tablas hash de ids.
+
+    Cualquiera de las dos puede ser un PlaylistSnapshot abierto: se comparan sus
+    columnas de ids y solo se crean objetos Song para las canciones que aparecen
+    en el diff.
+    """
+    if old.snapshot_id is not None and old.snapshot_id == new.snapshot_id:
+        return PlaylistDiff(old.name, new.name, unchanged=True)
+
+    old_positions = {key: position for position, key in enumerate(_occurrence_keys(_track_ids(old)))}
+    new_keys = _occurrence_keys(_track_ids(new))
+    new_key_set = set(new_keys)
+
+    added_positions = []
+    common = []  # (posición antigua, posición nueva) en el orden nuevo
+    for position, key in enumerate(new_keys):
+        old_position = old_positions.get(key)
+        if old_position is None:
+            added_positions.append(position)
+        else:
+            common.append((old_position, position))
+    removed_positions = [
+        position for key, position in old_positions.items() if key not in new_key_set
+    ]
+
+    # Las canciones de la subsecuencia creciente más larga de posiciones antiguas
+    # mantienen su orden relativo; el resto se ha movido
+    in_order = _longest_increasing_subsequence([old_position for old_position, _ in common])
+    moved_positions = [
+        (old_position, new_position)
+        for i, (old_position, new_position) in enumerate(common)
+        if i not in in_order
+    ]
+
+    # Las estadísticas se leen de la Playlist, como en el resumen del análisis; la
+    # de un snapshot se calcula sobre sus columnas
+    old_stats = old.to_playlist() if isinstance(old, PlaylistSnapshot) else old
+    new_stats = new.to_playlist() if isinstance(new, PlaylistSnapshot) else new
+    stats = {
+        "num_songs": (old_stats.num_songs, new_stats.num_songs),
+        "num_artists": (old_stats.num_artists, new_stats.num_artists),
+        "total_duration_ms": (old_stats.total_duration_ms, new_stats.total_duration_ms),
+        "explicit_share": (_explicit_share(old_stats), _explicit_share(new_stats)),
+    }
+    old_artists = _artists_by_id(old)
+    new_artists = _artists_by_id(new)
+    return PlaylistDiff(
+        old.name,
+        new.name,
+        added=list(zip(added_positions, _songs_at(new, added_positions))),
+        removed=list(zip(removed_positions, _songs_at(old, removed_positions))),
+        moved=[
+            (old_position, new_position, song)
+            for (old_position, new_position), song in zip(
+                moved_positions,
+                _songs_at(new, [new_position for _, new_position in moved_positions]),
+            )
+        ],
+        stats=stats,
+        new_artists=[artist for artist_id, artist in new_artists.items() if artist_id not in old_artists],
+        removed_artists=[
+            artist for artist_id, artist in old_artists.items() if artist_id not in new_artists
+        ],
+    )
+
+
+def format_diff(diff: PlaylistDiff, max_items: int = 10) -> list[str]:
+    """
+    Líneas de texto con el resumen de un diff, para la terminal y la GUI.
+    """
+    if diff.unchanged:
+        return ["La playlist no ha cambiado desde el último análisis (mismo snapshot)."]
+
+    lines = []
+    num_songs = diff.stats["num_songs"]
+    num_artists = diff.stats["num_artists"]
+    old_duration, new_duration = diff.stats["total_duration_ms"]
+    old_explicit, new_explicit = diff.stats["explicit_share"]
+    duration_change = new_duration - old_duration
+    lines.append(f"Pistas: {num_songs[0]} → {num_songs[1]} ({num_songs[1] - num_songs[0]:+d})")
+    lines.append(
+        f"Artistas únicos: {num_artists[0]} → {num_artists[1]} ({num_artists[1] - num_artists[0]:+d})"
+    )
+    lines.append(
+        f"Duración total: {'+' if duration_change >= 0 else '-'}"
+        f"{format_duration_ms(abs(duration_change))}"
+    )
+    lines.append(
+        f"Canciones explícitas: {old_explicit:.1%} → {new_explicit:.1%} "
+        f"({(new_explicit - old_explicit) * 100:+.1f} puntos)"
+    )
+    lines.append(
+        f"Añadidas: {len(diff.added)} | Eliminadas: {len(diff.removed)} | "
+        f"Movidas: {len(diff.moved)}"
+    )
+    for label, entries in (
+        ("Añadidas", [(new, song) for new, song in diff.added]),
+        ("Eliminadas", [(old, song) for old, song in diff.removed]),
+    ):
+        if entries:
+            lines.append(f"{label}:")
+            for position, song in entries[:max_items]:
+                artists = ", ".join(artist.name for artist in song.artists)
+                lines.append(f"  {position + 1}. '{song.title}' de {artists}")
+            if len(entries) > max_items:
+                lines.append(f"  ... y {len(entries) - max_items} más")
+    if diff.moved:
+        lines.append("Movidas:")
+        for old_position, new_position, song in diff.moved[:max_items]:
+            lines.append(f"  '{song.title}': {old_position + 1} → {new_position + 1}")
+        if len(diff.moved) > max_items:
+            lines.append(f"  ... y {len(diff.moved) - max_items} más")
+    if diff.new_artists:
+        names = ", ".join(artist.name for artist in diff.new_artists[:max_items])
+        more = f" y {len(diff.new_artists) - max_items} más" if len(diff.new_artists) > max_items else ""
+        lines.append(f"Artistas nuevos: {names}{more}")
+    if diff.removed_artists:
+        names = ", ".join(artist.name for artist in diff.removed_artists[:max_items])
+        more = (
+            f" y {len(diff.removed_artists) - max_items} más"
+            if len(diff.removed_artists) > max_items
+            else ""
+        )
+        lines.append(f"Artistas que ya no aparecen: {names}{more}")
+    return lines
@@ -0,0 +1,415 @@
+# playlist_query.py
+
+import heapq
+from collections import Counter
+from collections.abc import Callable
+
+import numpy as np
+
+from artist import Artist
+from playlist_columns import PlaylistColumns, _artist_credits
+from song import Song
+
+# Claves admitidas por SongQuery.group_by y valores por los que ordenar los grupos
+GROUP_KEYS = ("album", "artist", "explicit")
+GROUP_VALUES = ("count", "total_duration_ms")
+
+
+def _csr_groups(codes: np.ndarray, positions: np.ndarray, num_groups: int):
+    """
+    Agrupa `positions` por `codes` en formato CSR: las posiciones del grupo g son
+    result[offsets[g]:offsets[g + 1]], en orden creciente.
+    """
+    order = np.argsort(codes, kind="stable")
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=num_groups))))
+    return positions[order], offsets
+
+
+class PlaylistIndex:
+    """
+    Índices sobre las canciones de una playlist para consultas interactivas:
+    - posiciones de las canciones de cada artista (por id) y de cada álbum, en CSR;
+    - las posiciones ordenadas por duración, para rangos con búsqueda binaria;
+    - las posiciones de las canciones explícitas y de las que no lo son.
+
+    Las posiciones son índices en `playlist.songs`. Los códigos de artista y de
+    álbum siguen el orden de primera aparición.
+    """
+
+    def __init__(self, songs: list[Song], columns: PlaylistColumns):
+        num_songs = len(songs)
+        self.num_songs = num_songs
+        self.durations = columns.durations
+        self.explicit = columns.explicit
+        self.album_codes = columns.album_codes
+        self.album_names = columns.album_names
+        self._album_index = {name: code for code, name in enumerate(self.album_names)}
+        self._album_positions, self._album_offsets = _csr_groups(
+            self.album_codes, np.arange(num_songs), len(self.album_names)
+        )
+
+        # Créditos por id de artista en CSR (un artista repetido en una misma
+        # canción cuenta una vez)
+        (
+            self.artist_ids,
+            self.artist_names,
+            self.credit_codes,
+            self.credit_offsets,
+        ) = _artist_credits(songs)
+        self._artist_index = {artist_id: code for code, artist_id in enumerate(self.artist_ids)}
+        # Posición de la canción de cada crédito
+        self.credit_positions = np.repeat(np.arange(num_songs), np.diff(self.credit_offsets))
+        self._artist_positions, self._artist_offsets = _csr_groups(
+            self.credit_codes, self.credit_positions, len(self.artist_ids)
+        )
+
+        # Orden estable: a igual duración, las canciones quedan por posición
+        self.duration_order = np.argsort(self.durations, kind="stable")
+        self.sorted_durations = self.durations[self.duration_order]
+        self._explicit_positions = (
+            np.flatnonzero(~self.explicit),
+            np.flatnonzero(self.explicit),
+        )
+        # Agrupaciones de la playlist completa, que se reutilizan entre consultas
+        self.full_groups = {}
+
+    def artist(self, code: int) -> Artist:
+        return Artist(self.artist_ids[code], self.artist_names[code])
+
+    def _duration_bounds(self, min_ms: int, max_ms: int | None) -> tuple[int, int]:
+        start = np.searchsorted(self.sorted_durations, min_ms, side="left")
+        if max_ms is None:
+            return int(start), self.num_songs
+        end = np.searchsorted(self.sorted_durations, max_ms, side="right")
+        return int(start), int(max(start, end))
+
+    def estimate(self, condition: tuple) -> int:
+        """
+        Número de canciones que cumplen la condición, sin materializarlas.
+        """
+        kind = condition[0]
+        if kind == "artist":
+            code = self._artist_index.get(condition[1])
+            return 0 if code is None else int(np.diff(self._artist_offsets[code : code + 2])[0])
+        if kind == "album":
+            code = self._album_index.get(condition[1])
+            return 0 if code is None else int(np.diff(self._album_offsets[code : code + 2])[0])
+        if kind == "duration":
+            start, end = self._duration_bounds(condition[1], condition[2])
+            return end - start
+        return len(self._explicit_positions[condition[1]])
+
+    def lookup(self, condition: tuple) -> np.ndarray:
+        """
+        Posiciones (en orden creciente) de las canciones que cumplen la condición.
+        """
+        kind = condition[0]
+        if kind in ("artist", "album"):
+            index, positions, offsets = (
+                (self._artist_index, self._artist_positions, self._artist_offsets)
+                if kind == "artist"
+                else (self._album_index, self._album_positions, self._album_offsets)
+            )
+            code = index.get(condition[1])
+            if code is None:
+                return np.empty(0, dtype=np.int64)
+            return positions[offsets[code] : offsets[code + 1]]
+        if kind == "duration":
+            start, end = self._duration_bounds(condition[1], condition[2])
+            return np.sort(self.duration_order[start:end])
+        return self._explicit_positions[condition[1]]
+
+    def matches(self, condition: tuple, positions: np.ndarray) -> np.ndarray:
+        """
+        Máscara de las `positions` que cumplen la condición.
+        """
+        kind = condition[0]
+        if kind == "album":
+            code = self._album_index.get(condition[1], -1)
+            return self.album_codes[positions] == code
+        if kind == "duration":
+            durations = self.durations[positions]
+            mask = durations >= condition[1]
+            if condition[2] is not None:
+                mask &= durations <= condition[2]
+            return mask
+        if kind == "explicit":
+            return self.explicit[positions] == condition[1]
+        return np.isin(positions, self.lookup(condition), assume_unique=True)
+
+
+class SongQuery:
+    """
+    Consulta sobre las canciones de una playlist, apoyada en un PlaylistIndex.
+
+    Los filtros (`by_artist`, `by_album`, `duration_between`, `explicit`,
+    `where`) devuelven una consulta nueva y se combinan con AND. Al pedir el
+    resultado se parte del filtro indexado más selectivo y el resto se comprueba
+    de forma vectorizada solo sobre esas canciones; los predicados de `where` se
+    evalúan al final, canción a canción.
+
+    Ejemplo:
+        playlist.query().by_artist(artist_id).duration_between(180_000, 240_000).songs()
+    """
+
+    def __init__(
+        self, index: PlaylistIndex, songs: list[Song], conditions: tuple = ()
+    ):
+        self._index = index
+        self._songs = songs
+        self._conditions = conditions
+        self._positions = None
+
+    def _with(self, condition: tuple) -> "SongQuery":
+        return SongQuery(self._index, self._songs, self._conditions + (condition,))
+
+    def by_artist(self, artist_id: str) -> "SongQuery":
+        return self._with(("artist", artist_id))
+
+    def by_album(self, album: str) -> "SongQuery":
+        return self._with(("album", album))
+
+    def duration_between(self, min_ms: int = 0, max_ms: int | None = None) -> "SongQuery":
+        """
+        Canciones con `min_ms <= duration_ms <= max_ms` (sin límite superior si
+        `max_ms` es None).
+        """
+        return self._with(("duration", min_ms, max_ms))
+
+    def explicit(self, explicit: bool = True) -> "SongQuery":
+        return self._with(("explicit", bool(explicit)))
+
+    def where(self, predicate: Callable[[Song], bool]) -> "SongQuery":
+        return self._with(("predicate", predicate))
+
+    def positions(self) -> np.ndarray:
+        """
+        Posiciones en la playlist de las canciones que cumplen la consulta, en
+        orden creciente.
+        """
+        if self._positions is None:
+            index = self._index
+            indexed = [c for c in self._conditions if c[0] != "predicate"]
+            if indexed:
+                first = min(indexed, key=index.estimate)
+                positions = index.lookup(first)
+                for condition in indexed:
+                    if condition is not first and len(positions):
+                        positions = positions[index.matches(condition, positions)]
+            else:
+                positions = np.arange(index.num_songs)
+            for condition in self._conditions:
+                if condition[0] == "predicate":
+                    predicate = condition[1]
+                    positions = np.array(
+                        [p for p in positions.tolist() if predicate(self._songs[p])],
+                        dtype=np.int64,
+                    )
+            self._positions = positions
+        return self._positions
+
+    def count(self) -> int:
+        if not self._conditions:
+            return self._index.num_songs
+        if len(self._conditions) == 1 and self._conditions[0][0] != "predicate":
+            return self._index.estimate(self._conditions[0])
+        return len(self.positions())
+
+    def songs(self) -> list[Song]:
+        songs = self._songs
+        return [songs[position] for position in self.positions().tolist()]
+
+    def top_k(
+        self,
+        k: int,
+        by: str | Callable[[Song], object] = "duration_ms",
+        smallest: bool = False,
+    ) -> list[Song]:
+        """
+        Las `k` canciones con mayor (o menor) valor de `by`: "duration_ms" o una
+        función sobre Song. A igual valor, la que aparece antes en la playlist.
+
+        Con una función se usa selección con montículo (heapq) sobre las
+        canciones del resultado; con la duración, selección parcial vectorizada,
+        o directamente el índice ordenado si la consulta no tiene filtros.
+        """
+        if k <= 0:
+            return []
+        if callable(by):
+            select = heapq.nsmallest if smallest else heapq.nlargest
+            return select(k, self.songs(), key=by)
+        if by != "duration_ms":
+            raise ValueError(f"No se puede ordenar por {by!r}: usa 'duration_ms' o una función")
+
+        if not self._conditions:
+            positions = self._top_durations_from_index(k, smallest)
+        else:
+            positions = self.positions()
+            keys = self._index.durations[positions]
+            if not smallest:
+                keys = -keys
+            if k < len(positions):
+                kth = np.partition(keys, k - 1)[k - 1]
+                below = np.flatnonzero(keys < kth)
+                ties = np.flatnonzero(keys == kth)[: k - len(below)]
+                chosen = np.concatenate((below, ties))
+            else:
+                chosen = np.arange(len(positions))
+            positions = positions[chosen[np.lexsort((chosen, keys[chosen]))]]
+        songs = self._songs
+        return [songs[position] for position in positions.tolist()]
+
+    def _top_durations_from_index(self, k: int, smallest: bool) -> np.ndarray:
+        index = self._index
+        order = index.duration_order
+        if smallest:
+            return order[:k]
+        # Mayores duraciones: las estrictamente mayores que la k-ésima más los
+        # primeros empates con ella (el orden estable los deja por posición)
+        if k >= index.num_songs:
+            start = 0
+        else:
+            start = index.num_songs - k
+        kth = index.sorted_durations[start] if index.num_songs else 0
+        first_tie = np.searchsorted(index.sorted_durations, kth, side="left")
+        after_ties = np.searchsorted(index.sorted_durations, kth, side="right")
+        above = order[after_ties:]
+        ties = order[first_tie:after_ties][: k - len(above)]
+        chosen = np.concatenate((above, ties))
+        return chosen[np.lexsort((chosen, -index.durations[chosen]))]
+
+    def group_by(self, key: str) -> "SongGroups":
+        """
+        Agrupa el resultado por "album", "artist" (por id; una canción cuenta en
+        cada uno de sus artistas) o "explicit".
+        """
+        if key not in GROUP_KEYS:
+            raise ValueError(f"No se puede agrupar por {key!r}: usa uno de {GROUP_KEYS}")
+        if self._conditions:
+            return SongGroups(self._index, self._songs, self.positions(), key)
+        groups = self._index.full_groups.get(key)
+        if groups is None:
+            groups = self._index.full_groups[key] = SongGroups(
+                self._index, self._songs, self.positions(), key
+            )
+        return groups
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __repr__(self) -> str:
+        return f"SongQuery(conditions={list(self._conditions)})"
+
+
+class SongGroups:
+    """
+    Resultado de `SongQuery.group_by`: número de canciones y duración total por
+    grupo, calculados con np.bincount sobre los códigos de cada grupo. Los grupos
+    siguen el orden de primera aparición en la playlist.
+    """
+
+    def __init__(
+        self, index: PlaylistIndex, songs: list[Song], positions: np.ndarray, key: str
+    ):
+        self._index = index
+        self._songs = songs
+        self.key = key
+        if key == "album":
+            self._codes = index.album_codes[positions]
+            self._positions = positions
+            self._num_groups = len(index.album_names)
+        elif key == "artist" and len(positions) == index.num_songs:
+            self._codes = index.credit_codes
+            self._positions = index.credit_positions
+            self._num_groups = len(index.artist_ids)
+        elif key == "artist":
+            # Un crédito por (canción, artista) del resultado
+            offsets = index.credit_offsets
+            lengths = offsets[positions + 1] - offsets[positions]
+            starts = np.repeat(offsets[positions] - np.cumsum(lengths) + lengths, lengths)
+            self._codes = index.credit_codes[starts + np.arange(len(starts))]
+            self._positions = np.repeat(positions, lengths)
+            self._num_groups = len(index.artist_ids)
+        else:
+            self._codes = index.explicit[positions].astype(np.int64)
+            self._positions = positions
+            self._num_groups = 2
+        self._values_by = {}
+        self._present = None
+
+    def _label(self, code: int):
+        if self.key == "album":
+            return self._index.album_names[code]
+        if self.key == "artist":
+            return self._index.artist(code)
+        return bool(code)
+
+    def _values(self, by: str) -> np.ndarray:
+        values = self._values_by.get(by)
+        if values is not None:
+            return values
+        if by == "count":
+            values = np.bincount(self._codes, minlength=self._num_groups)
+        elif by == "total_duration_ms":
+            values = np.bincount(
+                self._codes,
+                weights=self._index.durations[self._positions],
+                minlength=self._num_groups,
+            ).astype(np.int64)
+        else:
+            raise ValueError(f"Valor de grupo desconocido: {by!r} (usa {GROUP_VALUES})")
+        self._values_by[by] = values
+        return values
+
+    def _present_codes(self) -> np.ndarray:
+        # Grupos con al menos una canción, en orden de código
+        if self._present is None:
+            self._present = np.flatnonzero(self._values("count"))
+        return self._present
+
+    def _counter(self, by: str) -> Counter:
+        values = self._values(by)
+        present = self._present_codes()
+        return Counter(
+            {self._label(code): value for code, value in zip(present.tolist(), values[present].tolist())}
+        )
+
+    def counts(self) -> Counter:
+        return self._counter("count")
+
+    def total_duration_ms(self) -> Counter:
+        return self._counter("total_duration_ms")
+
+    def songs(self) -> dict:
+        songs = self._songs
+        positions, offsets = _csr_groups(self._codes, self._positions, self._num_groups)
+        return {
+            self._label(code): [
+                songs[p] for p in positions[offsets[code] : offsets[code + 1]].tolist()
+            ]
+            for code in np.flatnonzero(np.diff(offsets)).tolist()
+        }
+
+    def top_k(self, k: int, by: str = "count") -> list[tuple[object, int]]:
+        """
+        Los `k` grupos con mayor `by` ("count" o "total_duration_ms"), como
+        (grupo, valor), seleccionados con un montículo. A igual valor, el grupo
+        que aparece antes.
+        """
+        if k <= 0:
+            return []
+        values = self._values(by)
+        candidates = self._present_codes()
+        if k < len(candidates):
+            # Preselección vectorizada: solo pueden entrar los grupos con valor de
+            # al menos el k-ésimo mayor (empates incluidos)
+            candidate_values = values[candidates]
+            kth = np.partition(candidate_values, len(candidates) - k)[len(candidates) - k]
+            candidates = candidates[candidate_values >= kth]
+        candidates = candidates.tolist()
+        candidate_values = values[candidates].tolist()
+        top = heapq.nlargest(k, range(len(candidates)), key=candidate_values.__getitem__)
+        return [(self._label(candidates[i]), candidate_values[i]) for i in top]
+
+    def __len__(self) -> int:
+        return len(self._present_codes())
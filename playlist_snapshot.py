@@ -0,0 +1,391 @@
+# playlist_snapshot.py
+
+import csv
+import json
+import os
+import struct
+from collections.abc import Iterable, Iterator
+
+import numpy as np
+
+from model_registry import ModelRegistry
+from playlist_analyzer import Playlist
+from playlist_columns import PlaylistColumns, _encode
+from song import Song
+from song_batch import SongBatch
+
+# Formato del fichero (little-endian):
+#   0   magic (8 bytes)
+#   8   versión (uint32)
+#   12  longitud L de los metadatos (uint32)
+#   16  metadatos JSON (L bytes): id, nombre, snapshot_id y, para cada sección,
+#       [desplazamiento, dtype, número de elementos]
+#   ... secciones, cada una alineada a SNAPSHOT_ALIGNMENT bytes
+# Columnas de ancho fijo: durations (int64), explicit (uint8), album_codes (int32),
+# artist_offsets (int64, n + 1) y artist_codes (int32, índices en la tabla de
+# artistas). Tablas de cadenas: `<tabla>.offsets` (int64) + `<tabla>.data` (UTF-8)
+# + `<tabla>.nulls` (un bit por cadena, 1 si es None, en orden little-endian), de
+# modo que None y "" se distinguen. `album_ids` tiene una entrada por canción.
+# Versión 2: tabla `album_ids`. Versión 3: máscaras de nulos. Un snapshot de una
+# versión anterior se rechaza con ValueError; hay que volver a guardarlo.
+SNAPSHOT_MAGIC = b"PLAYLAB\x00"
+SNAPSHOT_VERSION = 3
+SNAPSHOT_ALIGNMENT = 64
+_HEADER = struct.Struct("<8sII")
+_STRING_TABLES = (
+    "track_ids",
+    "titles",
+    "album_names",
+    "artist_ids",
+    "artist_names",
+    "album_ids",
+)
+
+# Columnas del CSV exportado y filas por bloque al exportar desde un snapshot
+CSV_COLUMNS = (
+    "position",
+    "track_id",
+    "title",
+    "artists",
+    "artist_ids",
+    "album",
+    "duration_ms",
+    "explicit",
+)
+CSV_ARTIST_SEPARATOR = "; "
+CSV_CHUNK_SIZE = 10_000
+
+
+class StringTable:
+    """
+    Tabla de cadenas UTF-8 concatenadas con sus desplazamientos: la cadena i son
+    los bytes data[offsets[i]:offsets[i + 1]]. Solo se decodifican las que se leen.
+
+    `nulls` marca con un bit las entradas que son None (p. ej. el id de un artista
+    de un archivo local); se guardan como cadena vacía, pero se leen como None.
+    """
+
+    def __init__(self, offsets: np.ndarray, data: np.ndarray, nulls: np.ndarray):
+        self._offsets = offsets
+        self._data = data
+        # Posiciones de los None, ordenadas; suelen ser pocas o ninguna
+        self._null_indices = np.flatnonzero(
+            np.unpackbits(nulls, count=len(offsets) - 1, bitorder="little")
+        )
+
+    @staticmethod
+    def encode(
+        values: list[str | None],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        encoded = [(value or "").encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype="<i8")
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        is_null = np.fromiter(
+            (value is None for value in values), dtype=bool, count=len(values)
+        )
+        return (
+            offsets,
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            np.packbits(is_null, bitorder="little"),
+        )
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: int) -> str | None:
+        position = np.searchsorted(self._null_indices, index)
+        if position < len(self._null_indices) and self._null_indices[position] == index:
+            return None
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def tolist(self, start: int = 0, end: int | None = None) -> list[str | None]:
+        """
+        Decodifica las cadenas [start, end) de una vez.
+        """
+        end = len(self) if end is None else end
+        bounds = self._offsets[start : end + 1].tolist()
+        if not bounds:
+            return []
+        raw = self._data[bounds[0] : bounds[-1]].tobytes()
+        base = bounds[0]
+        values = [
+            raw[a - base : b - base].decode("utf-8") for a, b in zip(bounds, bounds[1:])
+        ]
+        first, last = np.searchsorted(self._null_indices, [start, end])
+        for index in self._null_indices[first:last].tolist():
+            values[index - start] = None
+        return values
+
+    def __iter__(self) -> Iterator[str | None]:
+        return iter(self.tolist())
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
+
+
+def save_snapshot(playlist: Playlist, path: str) -> int:
+    """
+    Guarda la playlist en formato binario columnar y devuelve el tamaño del
+    fichero. Se escribe en un fichero temporal que sustituye al final a `path`,
+    así que un fallo a medias no deja un snapshot corrupto.
+    """
+    batch = SongBatch()
+    batch.add_songs(playlist.songs)
+
+    sections = {
+        "durations": np.array(batch.durations, dtype="<i8"),
+        "explicit": np.array(batch.explicit, dtype=np.uint8),
+        "album_codes": np.array(batch.album_codes, dtype="<i4"),
+        "artist_offsets": np.array(batch.artist_offsets, dtype="<i8"),
+        "artist_codes": np.array(batch.artist_codes, dtype="<i4"),
+    }
+    for table in _STRING_TABLES:
+        offsets, data, nulls = StringTable.encode(getattr(batch, table))
+        sections[f"{table}.offsets"] = offsets
+        sections[f"{table}.data"] = data
+        sections[f"{table}.nulls"] = nulls
+
+    # Los desplazamientos dependen de la longitud de los metadatos, que a su vez
+    # los contienen: se calculan con un margen fijo reservado para el JSON
+    layout = {}
+    metadata = {
+        "id": playlist.id,
+        "name": playlist.name,
+        "snapshot_id": playlist.snapshot_id,
+        "num_songs": len(batch),
+        "sections": layout,
+    }
+    names_size = len(json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+    reserved = _aligned(_HEADER.size + names_size + 64 * len(sections))
+    offset = reserved
+    for name, array in sections.items():
+        layout[name] = [offset, array.dtype.str, len(array)]
+        offset = _aligned(offset + array.nbytes)
+    metadata_bytes = json.dumps(metadata, ensure_ascii=False).encode("utf-8")
+    if _HEADER.size + len(metadata_bytes) > reserved:
+        raise ValueError("Los metadatos del snapshot no caben en la cabecera reservada")
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(metadata_bytes)))
+        f.write(metadata_bytes)
+        for name, array in sections.items():
+            f.write(b"\x00" * (layout[name][0] - f.tell()))
+            f.write(array.tobytes())
+        size = f.tell()
+    os.replace(tmp_path, path)
+    return size
+
+
+class PlaylistSnapshot:
+    """
+    Snapshot abierto con np.memmap: las columnas son vistas sobre el fichero, sin
+    copiarlo ni decodificarlo entero. Las estadísticas se calculan directamente
+    sobre ellas (`to_playlist`); los objetos Song solo se crean si se piden.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(buffer) < _HEADER.size:
+            raise ValueError(f"{path} no es un snapshot de PlayLab")
+        magic, version, metadata_size = _HEADER.unpack(buffer[: _HEADER.size].tobytes())
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} no es un snapshot de PlayLab")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Versión de snapshot no soportada: {version} (se esperaba {SNAPSHOT_VERSION})"
+            )
+        metadata = json.loads(
+            buffer[_HEADER.size : _HEADER.size + metadata_size].tobytes()
+        )
+        self.id = metadata["id"]
+        self.name = metadata["name"]
+        self.snapshot_id = metadata["snapshot_id"]
+
+        arrays = {}
+        for name, (offset, dtype, count) in metadata["sections"].items():
+            dtype = np.dtype(dtype)
+            arrays[name] = buffer[offset : offset + dtype.itemsize * count].view(dtype)
+        self.durations = arrays["durations"]
+        self.explicit = arrays["explicit"].view(bool)
+        self.album_codes = arrays["album_codes"]
+        self.artist_offsets = arrays["artist_offsets"]
+        self.artist_codes = arrays["artist_codes"]
+        for table in _STRING_TABLES:
+            setattr(
+                self,
+                table,
+                StringTable(
+                    arrays[f"{table}.offsets"],
+                    arrays[f"{table}.data"],
+                    arrays[f"{table}.nulls"],
+                ),
+            )
+
+    def __len__(self) -> int:
+        return len(self.durations)
+
+    def to_columns(self) -> PlaylistColumns:
+        """
+        Columnas para las estadísticas. Como en SongBatch, los artistas se
+        agrupan por nombre: solo se decodifican las tablas de artistas y álbumes.
+        """
+        name_codes, artist_names = _encode(self.artist_names.tolist())
+        return PlaylistColumns(
+            titles=self.titles,
+            durations=self.durations,
+            explicit=self.explicit,
+            album_codes=self.album_codes,
+            album_names=self.album_names.tolist(),
+            artist_codes=name_codes[self.artist_codes],
+            artist_offsets=self.artist_offsets,
+            artist_names=artist_names,
+        )
+
+    def to_songs(self, registry: ModelRegistry | None = None) -> list[Song]:
+        registry = registry or ModelRegistry()
+        artists = [
+            registry.artist(artist_id, name)
+            for artist_id, name in zip(self.artist_ids.tolist(), self.artist_names.tolist())
+        ]
+        albums = [registry.album(name) for name in self.album_names.tolist()]
+        codes = self.artist_codes.tolist()
+        offsets = self.artist_offsets.tolist()
+        return [
+            Song(
+                id=track_id,
+                title=title,
+                artists=[artists[code] for code in codes[offsets[i] : offsets[i + 1]]],
+                album=albums[album_code],
+                duration_ms=duration_ms,
+                explicit=explicit,
+                album_id=album_id,
+            )
+            for i, (
+                track_id,
+                title,
+                album_code,
+                duration_ms,
+                explicit,
+                album_id,
+            ) in enumerate(
+                zip(
+                    self.track_ids.tolist(),
+                    self.titles.tolist(),
+                    self.album_codes.tolist(),
+                    self.durations.tolist(),
+                    self.explicit.tolist(),
+                    self.album_ids.tolist(),
+                )
+            )
+        ]
+
+    def songs_at(
+        self, positions: Iterable[int], registry: ModelRegistry | None = None
+    ) -> list[Song]:
+        """
+        Canciones de las posiciones indicadas, decodificando solo sus filas (p. ej.
+        las añadidas o eliminadas de un diff).
+        """
+        registry = registry or ModelRegistry()
+        songs = []
+        for position in positions:
+            start, end = self.artist_offsets[position : position + 2].tolist()
+            artists = [
+                registry.artist(self.artist_ids[code], self.artist_names[code])
+                for code in self.artist_codes[start:end].tolist()
+            ]
+            songs.append(
+                Song(
+                    id=self.track_ids[position],
+                    title=self.titles[position],
+                    artists=artists,
+                    album=registry.album(self.album_names[int(self.album_codes[position])]),
+                    duration_ms=int(self.durations[position]),
+                    explicit=bool(self.explicit[position]),
+                    album_id=self.album_ids[position],
+                )
+            )
+        return songs
+
+    def to_playlist(self) -> Playlist:
+        return Playlist.from_columns(
+            self.id, self.name, self.to_columns(), self.to_songs, self.snapshot_id
+        )
+
+    def iter_rows(self, chunk_size: int = CSV_CHUNK_SIZE) -> Iterator[tuple]:
+        """
+        Filas con las columnas de CSV_COLUMNS, decodificando el fichero por bloques.
+        """
+        artist_ids = self.artist_ids.tolist()
+        artist_names = self.artist_names.tolist()
+        album_names = self.album_names.tolist()
+        for start in range(0, len(self), chunk_size):
+            end = min(start + chunk_size, len(self))
+            offsets = self.artist_offsets[start : end + 1].tolist()
+            codes = self.artist_codes[offsets[0] : offsets[-1]].tolist()
+            base = offsets[0]
+            for i, (track_id, title, album_code, duration_ms, explicit) in enumerate(
+                zip(
+                    self.track_ids.tolist(start, end),
+                    self.titles.tolist(start, end),
+                    self.album_codes[start:end].tolist(),
+                    self.durations[start:end].tolist(),
+                    self.explicit[start:end].tolist(),
+                )
+            ):
+                song_codes = codes[offsets[i] - base : offsets[i + 1] - base]
+                yield (
+                    start + i,
+                    track_id,
+                    title,
+                    CSV_ARTIST_SEPARATOR.join(artist_names[code] for code in song_codes),
+                    CSV_ARTIST_SEPARATOR.join(
+                        artist_ids[code] or "" for code in song_codes
+                    ),
+                    album_names[album_code],
+                    duration_ms,
+                    explicit,
+                )
+
+
+def load_snapshot(path: str) -> Playlist:
+    """
+    Abre un snapshot guardado con `save_snapshot` como Playlist, sin llamar a la
+    API ni crear objetos Song hasta que se accede a `songs`.
+    """
+    return PlaylistSnapshot(path).to_playlist()
+
+
+def _song_rows(songs: Iterable[Song]) -> Iterator[tuple]:
+    for position, song in enumerate(songs):
+        yield (
+            position,
+            song.id,
+            song.title,
+            CSV_ARTIST_SEPARATOR.join(artist.name for artist in song.artists),
+            CSV_ARTIST_SEPARATOR.join(artist.id or "" for artist in song.artists),
+            song.album,
+            song.duration_ms,
+            song.explicit,
+        )
+
+
+def export_csv(source: Playlist | PlaylistSnapshot, path: str) -> int:
+    """
+    Exporta las canciones a CSV fila a fila, sin construir la tabla entera en
+    memoria, y devuelve el número de filas. Con un PlaylistSnapshot no se crean
+    objetos Song: las filas salen directamente de las columnas del fichero.
+    """
+    rows = source.iter_rows() if isinstance(source, PlaylistSnapshot) else _song_rows(source.songs)
+    num_rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            num_rows += 1
+    return num_rows
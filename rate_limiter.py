@@ -0,0 +1,291 @@
+# rate_limiter.py
+
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+import spotipy
+
+import instrumentation
+
+# Presupuesto de peticiones por defecto. Spotify no publica su límite exacto (es
+# una ventana móvil de 30 s), así que se deja algo por debajo de lo observado.
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+DEFAULT_BURST = 10
+# Reintentos por petición ante 429 o errores 5xx antes de propagar el error
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE_S = 0.5
+DEFAULT_BACKOFF_MAX_S = 30.0
+# Pausa si una respuesta 429 llega sin cabecera Retry-After
+DEFAULT_RETRY_AFTER_S = 1.0
+
+
+class TokenBucket:
+    """
+    Cubo de tokens: se rellena a `rate` tokens por segundo hasta `capacity`, y
+    cada petición consume uno.
+
+    `reserve()` no espera: consume el token (aunque el saldo quede en negativo) y
+    devuelve cuántos segundos debe esperar el llamador antes de enviar. Así el
+    mismo cubo sirve a hilos (`time.sleep`) y a corrutinas (`asyncio.sleep`), y las
+    peticiones que esperan quedan espaciadas a `1 / rate` segundos.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate debe ser positivo y capacity al menos 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        # Instante al que corresponde `_tokens`; tras `pause()` queda en el futuro
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        if now > self._updated:
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            ready_at = self._updated + max(0.0, -self._tokens) / self.rate
+            return max(0.0, ready_at - now)
+
+    def pause(self, seconds: float):
+        """
+        Detiene el cubo durante `seconds` (p. ej. por un Retry-After). Al reanudar
+        no hay ráfaga acumulada: el cubo empieza vacío.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            until = now + seconds
+            if until > self._updated:
+                self._updated = until
+                self._tokens = min(self._tokens, 0.0)
+            self._paused_until = max(self._paused_until, until)
+
+    def pause_remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+
+class RequestScheduler:
+    """
+    Planificador por el que pasan todas las peticiones a la API de Spotify.
+
+    - Reparte un presupuesto de `requests_per_second` (con ráfagas de hasta
+      `burst`) entre todos los hilos y corrutinas que lo comparten.
+    - Ante un 429 pausa a todos los llamadores el tiempo que indique `Retry-After`
+      y reintenta.
+    - Ante un error 5xx reintenta con backoff exponencial con jitter.
+
+    `call` se usa desde código síncrono y `call_async` desde asyncio.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+        burst: int = DEFAULT_BURST,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base_s: float = DEFAULT_BACKOFF_BASE_S,
+        backoff_max_s: float = DEFAULT_BACKOFF_MAX_S,
+    ):
+        self.bucket = TokenBucket(requests_per_second, burst)
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._rate_limited = 0
+        self._server_errors = 0
+        self._queue_depth = 0
+        self._max_queue_depth = 0
+        self._throttled_s = 0.0
+
+    # --- Métricas ---
+    def _enter_queue(self):
+        with self._lock:
+            self._queue_depth += 1
+            self._max_queue_depth = max(self._max_queue_depth, self._queue_depth)
+
+    def _leave_queue(self, waited_s: float):
+        with self._lock:
+            self._queue_depth -= 1
+            self._requests += 1
+            self._throttled_s += waited_s
+        if waited_s:
+            instrumentation.increment("throttled_seconds", waited_s)
+
+    def get_metrics(self) -> dict:
+        """
+        - `requests`: peticiones enviadas (incluidos reintentos).
+        - `retries`, `rate_limited` (429) y `server_errors` (5xx).
+        - `queue_depth`: llamadores esperando turno ahora; `max_queue_depth`, el máximo.
+        - `throttled_seconds`: tiempo total que los llamadores han esperado turno.
+        """
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "rate_limited": self._rate_limited,
+                "server_errors": self._server_errors,
+                "queue_depth": self._queue_depth,
+                "max_queue_depth": self._max_queue_depth,
+                "throttled_seconds": round(self._throttled_s, 3),
+            }
+
+    # --- Planificación ---
+    def _retry_delay(self, error: spotipy.SpotifyException, attempt: int) -> float | None:
+        """
+        Segundos a esperar antes de reintentar tras `error`, o None si no se debe
+        reintentar. Un 429 pausa el cubo compartido, así que la espera la hace
+        cada llamador al pedir turno.
+        """
+        if attempt >= self.max_retries:
+            return None
+        if error.http_status == 429:
+            retry_after = _retry_after_seconds(error.headers)
+            self.bucket.pause(retry_after)
+            with self._lock:
+                self._retries += 1
+                self._rate_limited += 1
+            instrumentation.increment("retries")
+            logging.warning(
+                "Límite de peticiones de Spotify alcanzado; pausa de %.1f s.", retry_after
+            )
+            return 0.0
+        if error.http_status is not None and error.http_status >= 500:
+            delay = random.uniform(
+                0, min(self.backoff_max_s, self.backoff_base_s * 2**attempt)
+            )
+            with self._lock:
+                self._retries += 1
+                self._server_errors += 1
+            instrumentation.increment("retries")
+            logging.warning(
+                "Error %s de Spotify; reintento %d en %.2f s.",
+                error.http_status,
+                attempt + 1,
+                delay,
+            )
+            return delay
+        return None
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Ejecuta `func(*args, **kwargs)` cuando el presupuesto lo permite,
+        reintentando los 429 y 5xx.
+        """
+        attempt = 0
+        while True:
+            self._enter_queue()
+            waited = 0.0
+            try:
+                delay = self.bucket.reserve()
+                while delay > 0:
+                    time.sleep(delay)
+                    waited += delay
+                    # Un 429 recibido mientras se esperaba también aplica a esta petición
+                    delay = self.bucket.pause_remaining()
+            finally:
+                self._leave_queue(waited)
+            try:
+                return func(*args, **kwargs)
+            except spotipy.SpotifyException as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+
+    async def call_async(
+        self, func: Callable[..., Awaitable[Any]], *args, **kwargs
+    ) -> Any:
+        """
+        Equivalente a `call` para corrutinas: `func(*args, **kwargs)` debe
+        devolver un awaitable.
+        """
+        attempt = 0
+        while True:
+            self._enter_queue()
+            waited = 0.0
+            try:
+                delay = self.bucket.reserve()
+                while delay > 0:
+                    await asyncio.sleep(delay)
+                    waited += delay
+                    delay = self.bucket.pause_remaining()
+            finally:
+                self._leave_queue(waited)
+            try:
+                return await func(*args, **kwargs)
+            except spotipy.SpotifyException as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+
+
+def _retry_after_seconds(headers) -> float:
+    """
+    Lee `Retry-After` (en segundos o como fecha HTTP) de las cabeceras de la respuesta.
+    """
+    value = None
+    for name, header_value in (headers or {}).items():
+        if name.lower() == "retry-after":
+            value = header_value
+            break
+    if value is None:
+        return DEFAULT_RETRY_AFTER_S
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_S
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """
+    Devuelve el planificador compartido por los clientes síncrono y asyncio,
+    creándolo en el primer uso.
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
+
+
+def configure_scheduler(
+    requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+    burst: int = DEFAULT_BURST,
+    **kwargs,
+) -> RequestScheduler:
+    """
+    Sustituye el planificador compartido por uno con el presupuesto indicado.
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        _default_scheduler = RequestScheduler(requests_per_second, burst, **kwargs)
+        return _default_scheduler
@@ -0,0 +1,411 @@
+# similarity.py
+
+import heapq
+import sqlite3
+import threading
+from collections.abc import Iterable
+from functools import lru_cache
+from hashlib import blake2b
+
+import numpy as np
+
+from playlist_analyzer import Playlist
+
+SIMILARITY_INDEX_PATH = "playlab_similarity.sqlite"
+# Tamaño de las firmas MinHash: el error típico de la Jaccard estimada es
+# ~1/sqrt(NUM_PERMUTATIONS) (≈ 0.09 con 128)
+NUM_PERMUTATIONS = 128
+# LSH: la firma se parte en LSH_BANDS bandas de NUM_PERMUTATIONS / LSH_BANDS
+# valores. Dos playlists son candidatas si coinciden en alguna banda entera; con
+# 32 bandas de 4 valores, la probabilidad pasa del 50 % hacia una Jaccard de 0.4
+LSH_BANDS = 32
+# Conjuntos sobre los que se calcula una firma para cada playlist
+SKETCH_KINDS = ("tracks", "artists")
+
+# Cada permutación es un hash multiply-shift ((a·x + b) mod 2^64) >> 32 sobre el
+# hash de 32 bits de cada id, con a (impar) y b aleatorios de 64 bits: la
+# aritmética de uint64 de NumPy ya es módulo 2^64. La semilla es fija porque las
+# firmas se guardan en disco y deben ser comparables entre ejecuciones.
+_HASH_SHIFT = np.uint64(32)
+_EMPTY_VALUE = np.uint64(np.iinfo(np.uint64).max)
+_PERMUTATION_SEED = 1
+# Ids por bloque al calcular una firma, para acotar la matriz (ids × permutaciones)
+_HASH_CHUNK_SIZE = 4096
+# Máximo de parámetros por consulta SQL (límite de SQLite en versiones antiguas)
+_SQL_CHUNK_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sketches (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    snapshot_id TEXT,
+    num_tracks INTEGER NOT NULL,
+    num_artists INTEGER NOT NULL,
+    tracks BLOB NOT NULL,
+    artists BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    kind TEXT NOT NULL,
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    playlist_id TEXT NOT NULL,
+    PRIMARY KEY (kind, band, bucket, playlist_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS bands_by_playlist ON bands (playlist_id);
+"""
+
+
+@lru_cache(maxsize=None)
+def _permutations(num_perm: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(_PERMUTATION_SEED)
+    max_value = np.iinfo(np.uint64).max
+    a = rng.integers(0, max_value, size=num_perm, dtype=np.uint64, endpoint=True)
+    b = rng.integers(0, max_value, size=num_perm, dtype=np.uint64, endpoint=True)
+    return a | np.uint64(1), b
+
+
+def _hash_ids(ids: Iterable[str]) -> np.ndarray:
+    """
+    Hash estable de 32 bits de cada id distinto (el `hash()` de Python cambia
+    entre procesos, así que no sirve para firmas persistentes).
+    """
+    return np.fromiter(
+        (
+            int.from_bytes(blake2b(item.encode(), digest_size=4).digest(), "little")
+            for item in set(ids)
+        ),
+        dtype=np.uint64,
+    )
+
+
+def minhash_signature(ids: Iterable[str], num_perm: int = NUM_PERMUTATIONS) -> np.ndarray:
+    """
+    Firma MinHash de un conjunto de ids: para cada una de las `num_perm`
+    permutaciones, el mínimo hash del conjunto. La fracción de posiciones en las
+    que coinciden dos firmas estima la Jaccard de los conjuntos.
+    """
+    hashes = _hash_ids(ids)
+    signature = np.full(num_perm, _EMPTY_VALUE, dtype=np.uint64)
+    a, b = _permutations(num_perm)
+    for start in range(0, len(hashes), _HASH_CHUNK_SIZE):
+        chunk = hashes[start : start + _HASH_CHUNK_SIZE, None]
+        values = (chunk * a + b) >> _HASH_SHIFT
+        np.minimum(signature, values.min(axis=0), out=signature)
+    return signature
+
+
+def _playlist_ids(playlist: Playlist, kind: str) -> set[str]:
+    if kind == "tracks":
+        return {song.id for song in playlist.songs}
+    if kind == "artists":
+        return {artist.id for song in playlist.songs for artist in song.artists}
+    raise ValueError(f"Tipo de firma desconocido: {kind!r} (usa {SKETCH_KINDS})")
+
+
+def exact_jaccard(a: Playlist, b: Playlist, kind: str = "tracks") -> float:
+    """
+    Jaccard exacta entre las pistas (o los artistas) de dos playlists, para
+    verificar las estimaciones de MinHash.
+    """
+    ids_a = _playlist_ids(a, kind)
+    ids_b = _playlist_ids(b, kind)
+    union = len(ids_a | ids_b)
+    return len(ids_a & ids_b) / union if union else 0.0
+
+
+class PlaylistSketch:
+    """
+    Firmas MinHash de una playlist sobre los ids de sus pistas y de sus artistas,
+    junto con el tamaño de cada conjunto (una firma vacía no se parece a nada).
+    """
+
+    def __init__(
+        self,
+        playlist_id: str,
+        name: str,
+        snapshot_id: str | None,
+        num_tracks: int,
+        num_artists: int,
+        tracks: np.ndarray,
+        artists: np.ndarray,
+    ):
+        self.playlist_id = playlist_id
+        self.name = name
+        self.snapshot_id = snapshot_id
+        self.num_tracks = num_tracks
+        self.num_artists = num_artists
+        self.tracks = tracks
+        self.artists = artists
+
+    @classmethod
+    def from_playlist(
+        cls, playlist: Playlist, num_perm: int = NUM_PERMUTATIONS
+    ) -> "PlaylistSketch":
+        track_ids = _playlist_ids(playlist, "tracks")
+        artist_ids = _playlist_ids(playlist, "artists")
+        return cls(
+            playlist.id,
+            playlist.name,
+            playlist.snapshot_id,
+            len(track_ids),
+            len(artist_ids),
+            minhash_signature(track_ids, num_perm),
+            minhash_signature(artist_ids, num_perm),
+        )
+
+    def signature(self, kind: str) -> np.ndarray:
+        if kind not in SKETCH_KINDS:
+            raise ValueError(f"Tipo de firma desconocido: {kind!r} (usa {SKETCH_KINDS})")
+        return getattr(self, kind)
+
+    def size(self, kind: str) -> int:
+        return self.num_tracks if kind == "tracks" else self.num_artists
+
+    def __repr__(self) -> str:
+        return (
+            f"PlaylistSketch(playlist_id='{self.playlist_id}', name='{self.name}', "
+            f"num_tracks={self.num_tracks}, num_artists={self.num_artists})"
+        )
+
+
+def estimate_jaccard(a: PlaylistSketch, b: PlaylistSketch, kind: str = "tracks") -> float:
+    """
+    Jaccard aproximada a partir de las firmas MinHash, en O(NUM_PERMUTATIONS).
+    """
+    if not a.size(kind) or not b.size(kind):
+        return 0.0
+    return float(np.mean(a.signature(kind) == b.signature(kind)))
+
+
+def _band_buckets(signature: np.ndarray, bands: int) -> list[int]:
+    """
+    Clave de cubeta de cada banda de la firma (hash de 64 bits con signo, para
+    guardarlo como INTEGER en SQLite).
+    """
+    return [
+        int.from_bytes(blake2b(band.tobytes(), digest_size=8).digest(), "little", signed=True)
+        for band in np.split(signature, bands)
+    ]
+
+
+class SimilarityIndex:
+    """
+    Índice en disco (SQLite) de firmas MinHash de playlists con LSH por bandas,
+    para encontrar playlists parecidas sin comparar todos los pares.
+
+    Cada playlist se guarda con su `snapshot_id`: volver a añadirla sin cambios
+    no recalcula la firma. Las consultas solo comparan las firmas de las
+    playlists que comparten alguna cubeta con la consultada.
+    """
+
+    def __init__(
+        self,
+        path: str = SIMILARITY_INDEX_PATH,
+        num_perm: int = NUM_PERMUTATIONS,
+        bands: int = LSH_BANDS,
+    ):
+        if num_perm % bands:
+            raise ValueError(
+                f"El número de permutaciones ({num_perm}) debe ser múltiplo del de bandas ({bands})"
+            )
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        # La conexión se comparte entre hilos, protegida por un lock (como TrackCache)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._check_parameters()
+
+    def _check_parameters(self):
+        """
+        Las firmas guardadas solo son comparables con los mismos parámetros.
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO meta VALUES (?, ?)",
+                [("num_perm", self.num_perm), ("bands", self.bands)],
+            )
+            stored = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if stored["num_perm"] != self.num_perm or stored["bands"] != self.bands:
+            self._conn.close()
+            raise ValueError(
+                f"El índice {self.path} usa {stored['num_perm']} permutaciones y "
+                f"{stored['bands']} bandas; no es compatible con {self.num_perm} y {self.bands}"
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sketches").fetchone()
+        return count
+
+    def add(self, sketch: PlaylistSketch):
+        """
+        Guarda (o reemplaza) la firma de una playlist y sus cubetas LSH.
+        """
+        if len(sketch.tracks) != self.num_perm:
+            raise ValueError(
+                f"La firma tiene {len(sketch.tracks)} valores; el índice usa {self.num_perm}"
+            )
+        band_rows = [
+            (kind, band, bucket, sketch.playlist_id)
+            for kind in SKETCH_KINDS
+            if sketch.size(kind)
+            for band, bucket in enumerate(
+                _band_buckets(sketch.signature(kind), self.bands)
+            )
+        ]
+        with self._lock, self._conn:
+            self._delete(sketch.playlist_id)
+            self._conn.execute(
+                "INSERT INTO sketches VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    sketch.playlist_id,
+                    sketch.name,
+                    sketch.snapshot_id,
+                    sketch.num_tracks,
+                    sketch.num_artists,
+                    sketch.tracks.tobytes(),
+                    sketch.artists.tobytes(),
+                ),
+            )
+            self._conn.executemany("INSERT INTO bands VALUES (?, ?, ?, ?)", band_rows)
+
+    def add_playlist(self, playlist: Playlist) -> PlaylistSketch:
+        """
+        Calcula y guarda la firma de la playlist, salvo que ya esté en el índice
+        con el mismo `snapshot_id`.
+        """
+        if playlist.snapshot_id is not None:
+            sketch = self.get(playlist.id)
+            if sketch is not None and sketch.snapshot_id == playlist.snapshot_id:
+                return sketch
+        sketch = PlaylistSketch.from_playlist(playlist, self.num_perm)
+        self.add(sketch)
+        return sketch
+
+    def remove(self, playlist_id: str):
+        with self._lock, self._conn:
+            self._delete(playlist_id)
+
+    def _delete(self, playlist_id: str):
+        self._conn.execute("DELETE FROM sketches WHERE id = ?", (playlist_id,))
+        self._conn.execute("DELETE FROM bands WHERE playlist_id = ?", (playlist_id,))
+
+    def get(self, playlist_id: str) -> PlaylistSketch | None:
+        sketches = self._load([playlist_id])
+        return sketches.get(playlist_id)
+
+    def _load(self, playlist_ids: list[str]) -> dict[str, PlaylistSketch]:
+        sketches = {}
+        with self._lock:
+            for start in range(0, len(playlist_ids), _SQL_CHUNK_SIZE):
+                chunk = playlist_ids[start : start + _SQL_CHUNK_SIZE]
+                rows = self._conn.execute(
+                    "SELECT id, name, snapshot_id, num_tracks, num_artists, tracks, artists "
+                    f"FROM sketches WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+                for playlist_id, name, snapshot_id, num_tracks, num_artists, tracks, artists in rows:
+                    sketches[playlist_id] = PlaylistSketch(
+                        playlist_id,
+                        name,
+                        snapshot_id,
+                        num_tracks,
+                        num_artists,
+                        np.frombuffer(tracks, dtype=np.uint64),
+                        np.frombuffer(artists, dtype=np.uint64),
+                    )
+        return sketches
+
+    def query(
+        self,
+        playlist: Playlist | PlaylistSketch | str,
+        kind: str = "tracks",
+        threshold: float = 0.0,
+        top_k: int = 10,
+    ) -> list[tuple[str, str, float]]:
+        """
+        Playlists del índice parecidas a `playlist` (una Playlist, su firma o el id
+        de una playlist ya indexada), como tuplas (id, nombre, Jaccard estimada)
+        de mayor a menor parecido. No incluye a la propia playlist.
+
+        Solo se comparan las candidatas que comparten alguna cubeta LSH, así que
+        las playlists muy poco parecidas pueden no aparecer aunque superen
+        `threshold`.
+        """
+        if isinstance(playlist, str):
+            sketch = self.get(playlist)
+            if sketch is None:
+                raise KeyError(f"La playlist {playlist} no está en el índice")
+        elif isinstance(playlist, Playlist):
+            sketch = PlaylistSketch.from_playlist(playlist, self.num_perm)
+        else:
+            sketch = playlist
+        signature = sketch.signature(kind)
+        if not sketch.size(kind):
+            return []
+
+        candidates = set()
+        with self._lock:
+            for band, bucket in enumerate(_band_buckets(signature, self.bands)):
+                candidates.update(
+                    playlist_id
+                    for (playlist_id,) in self._conn.execute(
+                        "SELECT playlist_id FROM bands WHERE kind = ? AND band = ? AND bucket = ?",
+                        (kind, band, bucket),
+                    )
+                )
+        candidates.discard(sketch.playlist_id)
+        if not candidates:
+            return []
+
+        loaded = list(self._load(sorted(candidates)).values())
+        signatures = np.stack([candidate.signature(kind) for candidate in loaded])
+        similarities = (signatures == signature).mean(axis=1)
+        results = (
+            (candidate.playlist_id, candidate.name, float(similarity))
+            for candidate, similarity in zip(loaded, similarities)
+            if similarity >= threshold
+        )
+        return heapq.nlargest(top_k, results, key=lambda result: result[2])
+
+    def similar_pairs(
+        self, kind: str = "tracks", threshold: float = 0.5
+    ) -> list[tuple[str, str, float]]:
+        """
+        Todos los pares de playlists del índice con Jaccard estimada de al menos
+        `threshold`, como tuplas (id_a, id_b, Jaccard estimada) de mayor a menor.
+        Los candidatos salen de las cubetas LSH compartidas, no de todos los pares.
+        """
+        if kind not in SKETCH_KINDS:
+            raise ValueError(f"Tipo de firma desconocido: {kind!r} (usa {SKETCH_KINDS})")
+        with self._lock:
+            pairs = self._conn.execute(
+                "SELECT DISTINCT a.playlist_id, b.playlist_id FROM bands a "
+                "JOIN bands b ON a.kind = b.kind AND a.band = b.band "
+                "AND a.bucket = b.bucket AND a.playlist_id < b.playlist_id "
+                "WHERE a.kind = ?",
+                (kind,),
+            ).fetchall()
+        if not pairs:
+            return []
+
+        sketches = self._load(sorted({playlist_id for pair in pairs for playlist_id in pair}))
+        results = []
+        for id_a, id_b in pairs:
+            similarity = estimate_jaccard(sketches[id_a], sketches[id_b], kind)
+            if similarity >= threshold:
+                results.append((id_a, id_b, similarity))
+        results.sort(key=lambda result: result[2], reverse=True)
+        return results
@@ -1,6 +1,8 @@
 from artist import Artist
 
 class Song:
+    __slots__ = ("id", "album", "artists", "duration_ms", "explicit", "title", "album_id")
+
     def __init__(
         self,
         id: str,
@@ -9,13 +11,37 @@ class Song:
         duration_ms: int,
         explicit: bool,
         title: str,
+        album_id: str | None = None,
     ):
-        self.id = id
-        self.album = album
-        self.artists = artists
-        self.duration_ms = duration_ms
-        self.explicit = explicit
-        self.title = title
+        # Inmutable: los atributos solo se asignan aquí (los artistas, como tupla)
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "album", album)
+        object.__setattr__(self, "artists", tuple(artists))
+        object.__setattr__(self, "duration_ms", duration_ms)
+        object.__setattr__(self, "explicit", explicit)
+        object.__setattr__(self, "title", title)
+        # Id del álbum en Spotify, si se conoce (para el enriquecimiento)
+        object.__setattr__(self, "album_id", album_id)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Song es inmutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Song es inmutable")
+
+    def __reduce__(self):
+        return (
+            Song,
+            (
+                self.id,
+                self.album,
+                self.artists,
+                self.duration_ms,
+                self.explicit,
+                self.title,
+                self.album_id,
+            ),
+        )
 
     @property
     def duration_seconds(self) -> int:
@@ -27,5 +53,5 @@ class Song:
         return f"'{self.title}' {explicit_tag} by {', '.join(artist_names)} from '{self.album}' ({self.duration_seconds:.2f}s)"
 
     def __repr__(self) -> str:
-        return (f"Song(id='{self.id}', title='{self.title}', artists={self.artists}, "
+        return (f"Song(id='{self.id}', title='{self.title}', artists={list(self.artists)}, "
                 f"album='{self.album}', duration_ms={self.duration_ms}, explicit={self.explicit})")
\ No newline at end of file
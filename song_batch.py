@@ -0,0 +1,68 @@
+# song_batch.py
+
+from collections.abc import Iterable
+
+from song import Song
+
+
+class SongBatch:
+    """
+    Canciones guardadas como registros compactos en columnas, para escribir un
+    snapshot (ver playlist_snapshot.py).
+
+    Los artistas se internan por (id, nombre) y los álbumes por nombre, con
+    códigos asignados por orden de primera aparición.
+    """
+
+    def __init__(self):
+        self.track_ids: list[str] = []
+        self.titles: list[str] = []
+        self.durations: list[int] = []
+        self.explicit: list[bool] = []
+        self.album_codes: list[int] = []
+        self.album_names: list[str] = []
+        # Id de álbum por canción (None si la API no lo da): los álbumes se
+        # agrupan por nombre, pero el enriquecimiento necesita el id
+        self.album_ids: list[str | None] = []
+        # Créditos en formato CSR: artistas de la canción i en
+        # artist_codes[artist_offsets[i]:artist_offsets[i + 1]]
+        self.artist_codes: list[int] = []
+        self.artist_offsets: list[int] = [0]
+        self.artist_ids: list[str] = []  # por código de artista
+        self.artist_names: list[str] = []  # por código de artista
+        self._album_index: dict[str, int] = {}
+        self._artist_index: dict[tuple[str, str], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def add_songs(self, songs: Iterable[Song]):
+        """
+        Añade objetos Song ya creados (p. ej. los de una Playlist).
+        """
+        album_index = self._album_index
+        artist_codes = self.artist_codes
+        artist_offsets = self.artist_offsets
+        artist_index = self._artist_index
+        for song in songs:
+            self.track_ids.append(song.id)
+            self.titles.append(song.title)
+            self.durations.append(song.duration_ms)
+            self.explicit.append(song.explicit)
+
+            code = album_index.get(song.album)
+            if code is None:
+                code = album_index[song.album] = len(album_index)
+                self.album_names.append(song.album)
+            self.album_codes.append(code)
+            self.album_ids.append(song.album_id)
+
+            for artist in song.artists:
+                key = (artist.id, artist.name)
+                code = artist_index.get(key)
+                if code is None:
+                    code = artist_index[key] = len(artist_index)
+                    self.artist_ids.append(artist.id)
+                    self.artist_names.append(artist.name)
+                artist_codes.append(code)
+            artist_offsets.append(len(artist_codes))
@@ -1,17 +1,18 @@
+import requests
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import logging
+import os
+import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from song import Song
-from artist import Artist
-from playlist_analyzer import Playlist
-
-# Configuración de logging
-logging.basicConfig(
-    filename="playlab.log",
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-)
+from model_registry import ModelRegistry
+from playlist_analyzer import Playlist, PlaylistStatsAccumulator
+from track_cache import get_track_cache
+from rate_limiter import get_scheduler
+import instrumentation
 
 # Autenticación del usuario (credenciales, scope y redirección)
 CLIENT_ID = "83e88610af8d4c299b486ea277cc6f6f"
@@ -21,70 +22,359 @@ CLIENT_SECRET = (
 REDIRECT_URI = "http://127.0.0.1:8888/callback"
 SCOPE = "playlist-read-private playlist-read-collaborative"
 
-sp_user = None
-try:
-    sp_user = spotipy.Spotify(
-        auth_manager=SpotifyOAuth(
-            client_id=CLIENT_ID,
-            client_secret=CLIENT_SECRET,
-            redirect_uri=REDIRECT_URI,
-            scope=SCOPE,
-            open_browser=True,
-            cache_path=".cache-playlab",
+TOKEN_CACHE_PATH = ".cache-playlab"
+
+SPOTIFY_API_BASE_URL = "https://api.spotify.com/v1"
+# Permite apuntar PlayLab a otro servidor con la misma API, como el servidor
+# local de pruebas (`python -m benchmarks.fake_server`)
+API_BASE_URL_ENV = "PLAYLAB_API_BASE_URL"
+# Token fijo que se envía a un servidor local en lugar del flujo OAuth
+API_TOKEN_ENV = "PLAYLAB_API_TOKEN"
+LOCAL_API_TOKEN = "playlab-local"
+
+
+def get_api_base_url() -> str:
+    """
+    URL base de la API: la de Spotify, salvo que se indique otra en `PLAYLAB_API_BASE_URL`.
+    """
+    return os.environ.get(API_BASE_URL_ENV, SPOTIFY_API_BASE_URL).rstrip("/")
+
+
+def get_local_api_token(base_url: str | None = None) -> str | None:
+    """
+    Token fijo para un servidor distinto del de Spotify, o None si `base_url`
+    (por defecto `get_api_base_url()`) es Spotify y por tanto se usa OAuth.
+    """
+    if (base_url or get_api_base_url()).rstrip("/") == SPOTIFY_API_BASE_URL:
+        return None
+    return os.environ.get(API_TOKEN_ENV, LOCAL_API_TOKEN)
+
+
+def create_auth_manager() -> SpotifyOAuth:
+    """
+    Crea el gestor OAuth de PlayLab, que comparte la caché de tokens `.cache-playlab`.
+    """
+    return SpotifyOAuth(
+        client_id=CLIENT_ID,
+        client_secret=CLIENT_SECRET,
+        redirect_uri=REDIRECT_URI,
+        scope=SCOPE,
+        open_browser=True,
+        cache_path=TOKEN_CACHE_PATH,
+    )
+
+
+class FetchCancelled(Exception):
+    """
+    Se lanza desde un `progress_callback` para abortar una descarga en curso.
+    """
+
+
+# Recibe las canciones de la página recién cargada, las cargadas hasta ahora y el total
+ProgressCallback = Callable[[list[Song], int, int], None]
+
+
+# Conexiones keep-alive que se conservan por host; con menos que hilos de descarga
+# las conexiones sobrantes se cierran y se reabren en cada página
+HTTP_POOL_SIZE = 32
+
+
+def _create_session() -> requests.Session:
+    """
+    Sesión HTTP sin reintentos propios: los 429 y 5xx llegan como SpotifyException
+    (con sus cabeceras) al planificador de rate_limiter.
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(
+        pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks["response"].append(instrumentation.record_response_bytes)
+    return session
+
+
+def create_spotify_client() -> spotipy.Spotify:
+    """
+    Crea un cliente de spotipy contra `get_api_base_url()`: con OAuth para
+    Spotify, o con un token fijo para un servidor local.
+    """
+    local_token = get_local_api_token()
+    if local_token is None:
+        return spotipy.Spotify(
+            auth_manager=create_auth_manager(), requests_session=_create_session()
         )
+    client = spotipy.Spotify(auth=local_token, requests_session=_create_session())
+    client.prefix = get_api_base_url() + "/"
+    return client
+
+
+_client = None
+_client_lock = threading.Lock()
+# None mientras no se ha validado el token; True/False según el resultado
+_token_valid = None
+
+
+def _validate_token(client: spotipy.Spotify):
+    global _token_valid
+    try:
+        get_scheduler().call(client.me)
+        _token_valid = True
+        logging.info("Autenticación con Spotify exitosa.")
+    except Exception as e:
+        _token_valid = False
+        logging.error(f"Error durante la autenticación de Spotify: {e}")
+
+
+def get_spotify_client() -> spotipy.Spotify | None:
+    """
+    Devuelve el cliente de Spotify compartido, creándolo en la primera llamada.
+
+    Crear el cliente no toca la red: el token se valida en un hilo en segundo plano
+    y cualquier problema de autenticación aparece como error en la primera petición.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            try:
+                _client = create_spotify_client()
+            except Exception as e:
+                logging.error(f"Error al crear el cliente de Spotify: {e}")
+                return None
+            threading.Thread(
+                target=_validate_token, args=(_client,), daemon=True
+            ).start()
+        return _client
+
+
+def is_token_valid() -> bool | None:
+    """
+    Resultado de la validación en segundo plano (None si aún no ha terminado).
+    """
+    return _token_valid
+
+
+def __getattr__(name: str):
+    # Compatibilidad: `sp_user` era un cliente creado (y validado) al importar
+    if name == "sp_user":
+        return get_spotify_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Tamaño de página para playlist_items (máximo permitido por la API)
+PAGE_SIZE = 100
+# Número de páginas que se piden en paralelo por defecto
+DEFAULT_MAX_WORKERS = 8
+
+PLAYLIST_ITEMS_FIELDS = (
+    "items.track(id,name,artists(id,name),album(id,name),duration_ms,explicit),total"
+)
+
+
+def _fetch_playlist_page(
+    sp_client: spotipy.Spotify, playlist_id: str, offset: int
+) -> dict:
+    """
+    Pide una página de pistas de la playlist a partir de `offset`, respetando el
+    límite de peticiones compartido.
+    """
+    with instrumentation.span("fetch.page"):
+        page = get_scheduler().call(
+            sp_client.playlist_items,
+            playlist_id,
+            offset=offset,
+            limit=PAGE_SIZE,
+            fields=PLAYLIST_ITEMS_FIELDS,
+            additional_types=["track"],
+        )
+    instrumentation.increment("pages")
+    logging.debug(
+        "Página de la playlist %s en el offset %d: %d pistas.",
+        playlist_id,
+        offset,
+        len(page["items"]),
     )
-    sp_user.me()
-    logging.info("Autenticación con Spotify exitosa.")
-except Exception as e:
-    logging.error(f"Error durante la autenticación de Spotify: {e}")
-    sp_user = None
+    return page
 
 
-def get_playlist_tracks(sp_client: spotipy.Spotify, playlist_id: str) -> list[Song]:
+def _songs_from_items(items: list[dict], registry: ModelRegistry) -> list[Song]:
+    """
+    Convierte los items de una página de la API en objetos Song,
+    descartando pistas locales o nulas (sin id). Artistas y álbumes se comparten
+    a través del registro.
+    """
+    with instrumentation.span("parse.page"):
+        songs = []
+        for item in items:
+            track_data = item.get("track")
+            if track_data and track_data.get("id"):
+
+                artists_data_raw = track_data.get("artists", [])
+                artists = [
+                    registry.artist(
+                        artist_info.get("id", "unknown"),
+                        artist_info.get("name", "Unknown Artist"),
+                    )
+                    for artist_info in artists_data_raw
+                ]
+
+                album_data = track_data.get("album") or {}
+                song = Song(
+                    id=track_data["id"],
+                    title=track_data["name"],
+                    artists=artists,  # Ahora pasamos una lista de objetos Artist
+                    album=registry.album(album_data.get("name", "Álbum Desconocido")),
+                    duration_ms=track_data.get("duration_ms", 0),
+                    explicit=track_data.get("explicit", False),
+                    album_id=album_data.get("id"),
+                )
+                songs.append(song)
+    instrumentation.increment("tracks", len(songs))
+    return songs
+
+
+def _iter_raw_pages(sp_client: spotipy.Spotify, playlist_id: str) -> Iterator[dict]:
+    """
+    Pide las páginas de la playlist de una en una hasta la primera vacía.
+    """
+    offset = 0
+    while True:
+        page = _fetch_playlist_page(sp_client, playlist_id, offset)
+        if not page["items"]:
+            break
+        yield page
+        offset += len(page["items"])
+
+
+def iter_playlist_pages(
+    sp_client: spotipy.Spotify,
+    playlist_id: str,
+    registry: ModelRegistry | None = None,
+) -> Iterator[tuple[list[Song], int]]:
+    """
+    Generador que pide las páginas de la playlist de una en una y, por cada una,
+    produce sus canciones y el `total` de pistas que indica la API. Solo hay una
+    página en memoria a la vez.
+    """
+    registry = registry or ModelRegistry()
+    for page in _iter_raw_pages(sp_client, playlist_id):
+        yield _songs_from_items(page["items"], registry), page.get("total") or 0
+
+
+def iter_playlist_tracks(
+    sp_client: spotipy.Spotify, playlist_id: str
+) -> Iterator[Song]:
+    """
+    Generador de las canciones de la playlist, página a página.
+    """
+    for page_songs, _ in iter_playlist_pages(sp_client, playlist_id):
+        yield from page_songs
+
+
+def stream_playlist_summary(sp_client: spotipy.Spotify, playlist_id: str) -> dict:
+    """
+    Calcula el mismo resumen que `Playlist.get_summary()` en una sola pasada sobre
+    las páginas, sin guardar las canciones: la memoria no crece con la playlist.
+    """
+    if not sp_client:
+        raise Exception(
+            "El cliente de Spotify no se pudo inicializar. Verifica tus credenciales o conexión."
+        )
+
+    try:
+        playlist_info = get_scheduler().call(
+            sp_client.playlist, playlist_id, fields="name"
+        )
+        accumulator = PlaylistStatsAccumulator(
+            playlist_info.get("name", "Nombre desconocido")
+        )
+        for song in iter_playlist_tracks(sp_client, playlist_id):
+            accumulator.add(song)
+    except spotipy.SpotifyException as e:
+        logging.error(
+            f"Error de Spotify al resumir la playlist {playlist_id}: {e}"
+        )
+        raise
+    except Exception as e:
+        logging.error(
+            f"Error inesperado al resumir la playlist {playlist_id}: {e}"
+        )
+        raise
+
+    return accumulator.get_summary()
+
+
+def get_playlist_tracks(
+    sp_client: spotipy.Spotify,
+    playlist_id: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    registry: ModelRegistry | None = None,
+    progress_callback: ProgressCallback | None = None,
+) -> list[Song]:
+    """
+    Obtiene todas las pistas de la playlist.
+
+    La primera página indica el `total` de pistas; el resto de offsets se reparten
+    entre un pool de como máximo `max_workers` hilos y las páginas se vuelven a
+    unir en el orden de la playlist. Con `max_workers <= 1` las páginas se piden
+    de una en una.
+
+    Se puede pasar un `registry` para compartir artistas y álbumes entre playlists.
+    `progress_callback` se llama tras cada página, en orden; si lanza
+    FetchCancelled, la descarga se interrumpe sin esperar a las páginas pendientes.
+    """
     if not sp_client:
         logging.error(
             "Cliente de Spotify no inicializado. No se pueden obtener pistas."
         )
         return []
 
+    registry = registry or ModelRegistry()
     songs = []
-    offset = 0
+    loaded_items = 0  # Incluye las pistas locales o nulas que se descartan
+
+    def add_page(page_songs: list[Song], num_items: int, total: int):
+        nonlocal loaded_items
+        songs.extend(page_songs)
+        loaded_items += num_items
+        if progress_callback:
+            progress_callback(page_songs, loaded_items, total)
+
     try:
-        while True:
-            response = sp_client.playlist_items(
-                playlist_id,
-                offset=offset,
-                fields="items.track(id,name,artists(id,name),album(name),duration_ms,explicit),total",
-                additional_types=["track"],
-            )
-            items = response["items"]
-            if not items:
-                break
-            for item in items:
-                track_data = item.get("track")
-                if track_data and track_data.get("id"):
-
-                    artists_data_raw = track_data.get("artists", [])
-                    artists = [
-                        Artist(
-                            id=artist_info.get("id", "unknown"),
-                            name=artist_info.get("name", "Unknown Artist"),
-                        )
-                        for artist_info in artists_data_raw
-                    ]
-
-                    song = Song(
-                        id=track_data["id"],
-                        title=track_data["name"],
-                        artists=artists,  # Ahora pasamos una lista de objetos Artist
-                        album=track_data.get("album", {}).get(
-                            "name", "Álbum Desconocido"
-                        ),
-                        duration_ms=track_data.get("duration_ms", 0),
-                        explicit=track_data.get("explicit", False),
+        if max_workers > 1:
+            first_page = _fetch_playlist_page(sp_client, playlist_id, 0)
+            items = first_page["items"]
+            total = first_page.get("total") or 0
+            add_page(_songs_from_items(items, registry), len(items), total)
+
+            # Todas las páginas restantes se conocen de antemano gracias a `total`
+            offsets = range(len(items), total, PAGE_SIZE) if items else []
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                # map conserva el orden de los offsets, y por tanto el de la playlist
+                pages = executor.map(
+                    lambda offset: _fetch_playlist_page(sp_client, playlist_id, offset),
+                    offsets,
+                )
+                for page in pages:
+                    add_page(
+                        _songs_from_items(page["items"], registry),
+                        len(page["items"]),
+                        total,
                     )
-                    songs.append(song)
-            offset += len(items)
+            finally:
+                # Si se cancela o falla una página, no se espera a las pendientes
+                executor.shutdown(wait=False, cancel_futures=True)
+        else:
+            for page in _iter_raw_pages(sp_client, playlist_id):
+                add_page(
+                    _songs_from_items(page["items"], registry),
+                    len(page["items"]),
+                    page.get("total") or 0,
+                )
+    except FetchCancelled:
+        logging.info("Descarga de la playlist %s cancelada.", playlist_id)
+        raise
     except spotipy.SpotifyException as e:
         logging.error(
             f"Error de Spotify al obtener pistas de la playlist {playlist_id}: {e}"
@@ -96,13 +386,32 @@ def get_playlist_tracks(sp_client: spotipy.Spotify, playlist_id: str) -> list[So
         )
         raise
 
-    logging.info(f"Se obtuvieron {len(songs)} pistas de la playlist.")
+    logging.info("Se obtuvieron %d pistas de la playlist.", len(songs))
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Planificador de peticiones: %s", get_scheduler().get_metrics())
     return songs
 
 
-def get_playlist_data(sp_client: spotipy.Spotify, playlist_id: str) -> Playlist:
+def get_playlist_data(
+    sp_client: spotipy.Spotify,
+    playlist_id: str,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    use_cache: bool = True,
+    progress_callback: ProgressCallback | None = None,
+    playlist_info: dict | None = None,
+) -> Playlist:
     """
     Obtiene los datos de la playlist y sus canciones, y devuelve un objeto Playlist.
+
+    Si el llamador ya tiene la cabecera de la playlist (`name` y `snapshot_id`),
+    puede pasarla en `playlist_info` para no volver a pedirla.
+
+    Con `use_cache`, solo se pide la cabecera de la playlist: si su `snapshot_id`
+    coincide con el guardado en la caché local, las canciones se leen de disco;
+    si no, se descargan de nuevo y se reescribe la caché.
+
+    `progress_callback` se pasa a `get_playlist_tracks`; con la caché se llama una
+    sola vez con todas las canciones.
     """
     if not sp_client:
         raise Exception(
@@ -110,8 +419,12 @@ def get_playlist_data(sp_client: spotipy.Spotify, playlist_id: str) -> Playlist:
         )
 
     try:
-        playlist_info = sp_client.playlist(playlist_id, fields="name")
+        if playlist_info is None:
+            playlist_info = get_scheduler().call(
+                sp_client.playlist, playlist_id, fields="name,snapshot_id"
+            )
         playlist_name = playlist_info.get("name", "Nombre desconocido")
+        snapshot_id = playlist_info.get("snapshot_id")
     except spotipy.SpotifyException as e:
         logging.error(
             f"Error de Spotify al obtener información de la playlist {playlist_id}: {e}"
@@ -123,8 +436,28 @@ def get_playlist_data(sp_client: spotipy.Spotify, playlist_id: str) -> Playlist:
         )
         raise
 
-    songs = get_playlist_tracks(sp_client, playlist_id)
+    cache = get_track_cache() if use_cache and snapshot_id else None
+    with instrumentation.span("cache.read"):
+        songs = cache.get(playlist_id, snapshot_id) if cache else None
+    if songs is not None:
+        logging.info(
+            "Playlist %s leída de la caché local (snapshot %s).", playlist_id, snapshot_id
+        )
+        if progress_callback:
+            progress_callback(songs, len(songs), len(songs))
+    else:
+        songs = get_playlist_tracks(
+            sp_client,
+            playlist_id,
+            max_workers=max_workers,
+            progress_callback=progress_callback,
+        )
+        if cache:
+            with instrumentation.span("cache.write"):
+                cache.put(playlist_id, playlist_name, snapshot_id, songs)
 
-    playlist_object = Playlist(id=playlist_id, name=playlist_name, songs=songs)
+    playlist_object = Playlist(
+        id=playlist_id, name=playlist_name, songs=songs, snapshot_id=snapshot_id
+    )
 
-    return playlist_object
\ No newline at end of file
+    return playlist_object
@@ -1,11 +1,22 @@
+import argparse
 import re
-from spotify_api import sp_user, get_playlist_data
+from collections import Counter
+import instrumentation
+from enrichment import enrich_playlist
+from library import analyze_library
+from logging_config import configure_logging
+from spotify_api import get_playlist_data, get_spotify_client
 from playlist_analyzer import Playlist
+from playlist_diff import diff_playlists, format_diff
+from playlist_snapshot import PlaylistSnapshot, export_csv, load_snapshot, save_snapshot
 from song import Song
 from artist import Artist
 from utils import format_duration_ms
 import sys
 
+# Jaccard estimada mínima para listar dos playlists como parecidas
+SIMILAR_PLAYLISTS_THRESHOLD = 0.5
+
 
 def extract_playlist_id(url: str) -> str:
     """
@@ -20,32 +31,257 @@ def extract_playlist_id(url: str) -> str:
         )
 
 
-def main():
-    print("Bienvenido a PlayLab (Modo Terminal)")
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="PlayLab en modo terminal")
+    parser.add_argument(
+        "--library",
+        action="store_true",
+        help="Analiza todas las playlists del usuario en lugar de una sola",
+    )
+    parser.add_argument(
+        "--snapshot",
+        metavar="FICHERO",
+        help="Analiza una playlist guardada con --save-snapshot, sin llamar a la API",
+    )
+    parser.add_argument(
+        "--save-snapshot",
+        metavar="FICHERO",
+        help="Guarda la playlist analizada en formato binario para reabrirla con --snapshot",
+    )
+    parser.add_argument(
+        "--diff",
+        metavar="FICHERO",
+        help="Muestra los cambios respecto a una versión guardada con --save-snapshot",
+    )
+    parser.add_argument(
+        "--export-csv",
+        metavar="FICHERO",
+        help="Exporta las canciones de la playlist analizada a CSV",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="text",
+        choices=("text", "json", "prometheus"),
+        help="Muestra al final el tiempo de cada fase y los contadores del análisis",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FICHERO",
+        help="Guarda el perfil en un fichero en lugar de mostrarlo",
+    )
+    return parser.parse_args(argv)
+
+
+def report_profile(profile_format: str, output_path: str | None):
+    if profile_format == "json":
+        report = instrumentation.to_json()
+    elif profile_format == "prometheus":
+        report = instrumentation.to_prometheus()
+    else:
+        report = instrumentation.format_report()
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(report)
+        print(f"\nPerfil guardado en {output_path}")
+    else:
+        print("\n" + report)
+
 
-    if not sp_user:
+def main(argv: list[str] | None = None):
+    args = parse_args(argv)
+    if args.library:
+        target = run_library
+    else:
+        target = lambda: run(
+            args.snapshot, args.save_snapshot, args.export_csv, args.diff
+        )
+    if args.profile or args.profile_output:
+        instrumentation.enable()
+        try:
+            target()
+        finally:
+            report_profile(args.profile or "text", args.profile_output)
+    else:
+        target()
+
+
+def print_collaboration_pairs(graph, n: int = 5):
+    top_pairs = graph.top_pairs(n)
+    if not top_pairs:
+        return
+    print(f"\n--- Top {n} Parejas de Artistas que más Colaboran ---")
+    for i, (artist_a, artist_b, count) in enumerate(top_pairs):
+        print(f"{i+1}. {artist_a.name} y {artist_b.name}: {count} canciones juntos")
+    components = graph.connected_components()
+    print(
+        f"Grupos de artistas conectados por colaboraciones: {len(components)} "
+        f"(el mayor con {len(components[0])} artistas)"
+    )
+
+
+def print_enrichment_stats(playlist: Playlist, n: int = 5):
+    if playlist.genre_counts:
+        print(f"\n--- Top {n} Géneros ---")
+        for i, (genre, count) in enumerate(playlist.genre_counts.most_common(n)):
+            print(f"{i+1}. {genre}: {count} canciones")
+    if playlist.release_year_counts:
+        decades = Counter()
+        for year, count in playlist.release_year_counts.items():
+            decades[year // 10 * 10] += count
+        largest = max(decades.values())
+        print("\n--- Canciones por Década de Publicación ---")
+        for decade, count in sorted(decades.items()):
+            bar = "█" * max(1, round(30 * count / largest))
+            print(f"{decade}s {bar} {count}")
+    if playlist.average_artist_popularity is not None:
+        print(
+            f"\nPopularidad media de los artistas: "
+            f"{playlist.average_artist_popularity}/100"
+        )
+        most_popular = ", ".join(
+            f"{artist} ({popularity})"
+            for artist, popularity in playlist.artist_popularity.most_common(3)
+        )
+        print(f"Artistas más populares: {most_popular}")
+
+
+def run_library():
+    configure_logging()
+    print("Bienvenido a PlayLab (Modo Terminal, biblioteca completa)")
+
+    sp_client = get_spotify_client()
+    if not sp_client:
         print(
             "Error: No se pudo conectar con Spotify. Por favor, revisa tu conexión a internet o las credenciales de la API."
         )
         return
 
+    print("Extrayendo las playlists de tu biblioteca...")
+    try:
+        library = analyze_library(
+            sp_client,
+            progress_callback=lambda done, total: print(
+                f"\rPlaylists cargadas: {done} de {total}", end="", flush=True
+            ),
+        )
+    except Exception as e:
+        print(f"\nHa ocurrido un error mientras analizábamos tu biblioteca: {e}")
+        return
+
+    summary = library.get_summary()
+    print("\n\n--- Análisis de la biblioteca completado ---\n")
+    print(f"Playlists: {summary['num_playlists']}")
+    print(
+        f"Pistas únicas: {summary['num_unique_tracks']} "
+        f"({summary['num_playlist_tracks']} contando repeticiones entre playlists)"
+    )
+    print(f"Artistas únicos: {summary['num_artists']}")
+    print(f"Álbumes únicos: {summary['num_unique_albums']}")
+    print(f"Duración total: {format_duration_ms(summary['total_duration_ms'])}")
+    print(f"Canciones explícitas: {summary['explicit_share']:.1%}")
+
+    if summary["artist_frequencies"]:
+        print("\n--- Artistas con más canciones en la biblioteca ---")
+        for i, (artist, count) in enumerate(
+            summary["artist_frequencies"].most_common(5)
+        ):
+            print(f"{i+1}. {artist}: {count} canciones")
+
+    print("\n--- Playlists ---")
+    for playlist_summary in library.get_playlist_summaries():
+        print(
+            f"'{playlist_summary['name']}': {playlist_summary['num_songs']} pistas, "
+            f"{playlist_summary['num_artists']} artistas, "
+            f"{format_duration_ms(playlist_summary['total_duration_ms'])}"
+        )
+
+    print_collaboration_pairs(library.tracks.collaboration_graph)
+
+    index = library.build_similarity_index()
+    names = {playlist.id: playlist.name for playlist in library.playlists}
+    pairs = [
+        (id_a, id_b, similarity)
+        for id_a, id_b, similarity in index.similar_pairs(
+            threshold=SIMILAR_PLAYLISTS_THRESHOLD
+        )
+        if id_a in names and id_b in names
+    ]
+    index.close()
+    if pairs:
+        print("\n--- Playlists parecidas (pistas en común, estimado) ---")
+        for id_a, id_b, similarity in pairs[:10]:
+            print(f"'{names[id_a]}' y '{names[id_b]}': {similarity:.0%}")
+
+
+def load_playlist(snapshot_path: str | None = None) -> Playlist | None:
+    """
+    Abre el snapshot indicado o, si no hay, pide la URL y descarga la playlist.
+    """
+    if snapshot_path:
+        print(f"Abriendo la playlist guardada en {snapshot_path}...")
+        return load_snapshot(snapshot_path)
+
     playlist_url = input("Pega la URL de tu playlist: ").strip()
 
     try:
         playlist_id = extract_playlist_id(playlist_url)
     except ValueError as e:
         print("Error: ", e)
-        return
+        return None
+
+    # El cliente se crea al empezar el primer análisis, no al arrancar
+    sp_client = get_spotify_client()
+    if not sp_client:
+        print(
+            "Error: No se pudo conectar con Spotify. Por favor, revisa tu conexión a internet o las credenciales de la API."
+        )
+        return None
 
     print("Extrayendo datos de la playlist...")
+    playlist = get_playlist_data(sp_client, playlist_id)
+    if playlist.num_songs:
+        # Sin géneros ni popularidad el resto del análisis sigue siendo válido
+        try:
+            enrich_playlist(sp_client, playlist)
+        except Exception as e:
+            print(f"Aviso: no se pudieron obtener géneros y popularidad: {e}")
+    return playlist
+
+
+def run(
+    snapshot_path: str | None = None,
+    save_snapshot_path: str | None = None,
+    export_csv_path: str | None = None,
+    diff_path: str | None = None,
+):
+    configure_logging()
+    print("Bienvenido a PlayLab (Modo Terminal)")
 
     try:
-        playlist: Playlist = get_playlist_data(sp_user, playlist_id)
+        playlist = load_playlist(snapshot_path)
+        if playlist is None:
+            return
 
-        if not playlist.songs:
+        if not playlist.num_songs:
             print("No se encontraron pistas en la playlist o la playlist está vacía.")
             return
 
+        # El diff se calcula antes de guardar: --diff y --save-snapshot pueden
+        # apuntar al mismo fichero para seguir la playlist entre análisis
+        if diff_path:
+            diff = diff_playlists(PlaylistSnapshot(diff_path), playlist)
+            print(f"\n--- Cambios desde la versión guardada en {diff_path} ---")
+            for line in format_diff(diff):
+                print(line)
+
+        if save_snapshot_path:
+            size = save_snapshot(playlist, save_snapshot_path)
+            print(f"Playlist guardada en {save_snapshot_path} ({size / 1024:.0f} KB)")
+        if export_csv_path:
+            num_rows = export_csv(playlist, export_csv_path)
+            print(f"{num_rows} canciones exportadas a {export_csv_path}")
+
         print(f"\n--- Análisis de la playlist '{playlist.name}' completado ---\n")
         print(f"Número de pistas: {playlist.num_songs}")
         print(f"Número de artistas únicos: {playlist.num_artists}")
@@ -91,6 +327,9 @@ def main():
                 "\nNo se encontraron colaboraciones por artistas individuales en la playlist."
             )
 
+        print_collaboration_pairs(playlist.collaboration_graph)
+        print_enrichment_stats(playlist)
+
         option: str = input("\n¿Quieres una lista de todos los artistas de tu playlist, ordenados por número de apariciones? (Y/n): ").strip().lower()
         if option.lower() == "n":
             print(
@@ -0,0 +1,21 @@
+import logging
+
+import logging_config
+
+
+def test_batched_records_reach_the_file_in_order(tmp_path):
+    path = tmp_path / "playlab.log"
+    logging_config.configure_logging(level="DEBUG", path=str(path))
+    try:
+        for i in range(logging_config.LOG_BATCH_SIZE + 10):
+            logging.debug("depuración %d", i)
+        logging.info("fin")
+        logging.debug("pendiente")
+    finally:
+        logging_config.shutdown_logging()
+        logging.getLogger().setLevel(logging.WARNING)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    messages = [line.rsplit(" - ", 1)[1] for line in lines]
+    expected = [f"depuración {i}" for i in range(logging_config.LOG_BATCH_SIZE + 10)]
+    assert messages == expected + ["fin", "pendiente"]
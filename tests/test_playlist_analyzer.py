@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from artist import Artist
+from playlist_analyzer import Playlist
+from song import Song
+
+_COUNTERS = ("artist_frequencies", "artist_collaboration_counts", "album_counts")
+
+
+def _random_song(rng: random.Random, artists: list[Artist], i: int) -> Song:
+    num_artists = rng.choice([0, 1, 1, 2, 3])
+    return Song(
+        f"t{i}",
+        rng.choice(["A", "B", "C", None]),
+        [rng.choice(artists) for _ in range(num_artists)],
+        # Pocas duraciones distintas para forzar empates
+        rng.choice([0, 1000, 2000, 3000]),
+        rng.random() < 0.5,
+        f"Canción {i}",
+    )
+
+
+def _assert_matches_full_recompute(playlist: Playlist):
+    expected = Playlist(playlist.id, playlist.name, list(playlist.songs))
+    summary = playlist.get_summary()
+    expected_summary = expected.get_summary()
+    for key, value in expected_summary.items():
+        if key in _COUNTERS:
+            # Mismos valores; el orden de las claves puede diferir (ver add_songs)
+            assert dict(summary[key]) == dict(value), key
+        else:
+            assert summary[key] == value, key
+
+
+def test_incremental_edits_match_full_recompute():
+    rng = random.Random(0)
+    artists = [Artist(f"a{i}", f"Artista {i % 5}") for i in range(8)]
+    next_id = iter(range(10**6))
+    for _ in range(100):
+        songs = [_random_song(rng, artists, next(next_id)) for _ in range(rng.randrange(8))]
+        playlist = Playlist("pid", "Prueba", songs)
+        for _ in range(40):
+            num_songs = len(playlist.songs)
+            new_songs = [
+                _random_song(rng, artists, next(next_id)) for _ in range(rng.randrange(4))
+            ]
+            operation = rng.randrange(3)
+            if operation == 0:
+                position = rng.randrange(-num_songs - 1, num_songs + 2)
+                playlist.add_songs(new_songs, position)
+            elif operation == 1 and num_songs:
+                count = rng.randrange(1, min(num_songs, 3) + 1)
+                playlist.remove_songs(rng.sample(range(num_songs), count))
+            else:
+                start = rng.randrange(num_songs + 1)
+                end = rng.randrange(start, num_songs + 1)
+                if rng.random() < 0.5:
+                    # Reordenar un tramo
+                    new_songs = playlist.songs[start:end]
+                    rng.shuffle(new_songs)
+                playlist.replace_songs(start, new_songs, end)
+            _assert_matches_full_recompute(playlist)
+
+
+def test_repeated_inserts_at_same_position_renumber_order_keys():
+    artists = [Artist("a1", "Uno")]
+    songs = [Song(f"t{i}", "A", artists, 1000, False, f"Canción {i}") for i in range(2)]
+    playlist = Playlist("pid", "Prueba", songs)
+    # Cada inserción parte el hueco entre las dos primeras canciones por la mitad
+    for i in range(100):
+        playlist.add_songs([Song(f"n{i}", "B", artists, 1000, False, f"Nueva {i}")], 1)
+        _assert_matches_full_recompute(playlist)
+
+
+def test_replace_songs_rejects_range_outside_playlist():
+    playlist = Playlist("pid", "Prueba", [Song("t1", "A", [], 1000, False, "Uno")])
+    with pytest.raises(IndexError):
+        playlist.replace_songs(1, [], 0)
+    with pytest.raises(IndexError):
+        playlist.replace_songs(0, [], 2)
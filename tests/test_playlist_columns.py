@@ -0,0 +1,25 @@
+from artist import Artist
+from collaboration_graph import CollaborationGraph
+from playlist_columns import PlaylistColumns, _artist_credits
+from playlist_query import PlaylistIndex
+from song import Song
+
+
+def test_artist_credits_dedupe_within_song_by_id():
+    a1, a2 = Artist("a1", "Uno"), Artist("a2", "Uno")
+    songs = [
+        Song("t1", "A", [a1, a2, a1], 1000, False, "Uno"),
+        Song("t2", "A", [a2], 1000, False, "Dos"),
+        Song("t3", "A", [], 1000, False, "Tres"),
+    ]
+    artist_ids, artist_names, codes, offsets = _artist_credits(songs)
+
+    assert artist_ids == ["a1", "a2"]
+    assert artist_names == ["Uno", "Uno"]
+    assert codes.tolist() == [0, 1, 1]
+    assert offsets.tolist() == [0, 2, 3, 3]
+
+    index = PlaylistIndex(songs, PlaylistColumns.from_songs(songs))
+    graph = CollaborationGraph.from_songs(songs)
+    assert index.credit_codes.tolist() == codes.tolist()
+    assert index.artist_ids == graph.artist_ids == artist_ids
@@ -0,0 +1,46 @@
+from artist import Artist
+from playlist_analyzer import Playlist
+from playlist_diff import diff_playlists
+from playlist_snapshot import PlaylistSnapshot, save_snapshot
+from song import Song
+
+
+def _songs_by_position(entries: list[tuple]) -> list[tuple]:
+    return [(*entry[:-1], entry[-1].id, entry[-1].title) for entry in entries]
+
+
+def test_diff_against_snapshot_matches_diff_against_playlist(tmp_path, monkeypatch):
+    # Dos artistas con el mismo nombre: num_artists cuenta nombres, como el resumen
+    a1, a2, a3 = Artist("a1", "Uno"), Artist("a2", "Uno"), Artist("a3", "Tres")
+    old_songs = [
+        Song("t1", "A", [a1], 1000, False, "Uno", "al1"),
+        Song("t2", "A", [a2, a3], 2000, True, "Dos", "al1"),
+        Song("t3", None, [Artist(None, "Local")], 3000, False, "Tres", None),
+        Song("t4", "B", [a3], 4000, False, "Cuatro", "al2"),
+    ]
+    old = Playlist("pid", "Prueba", old_songs, snapshot_id="s1")
+    new = Playlist(
+        "pid",
+        "Prueba",
+        [old_songs[3], old_songs[0], Song("t5", "C", [a3], 5000, True, "Cinco", "al3")],
+        snapshot_id="s2",
+    )
+    path = tmp_path / "old.plsnap"
+    save_snapshot(old, str(path))
+
+    expected = diff_playlists(old, new)
+    snapshot = PlaylistSnapshot(str(path))
+    # El diff no debe decodificar el snapshot entero
+    monkeypatch.setattr(PlaylistSnapshot, "to_songs", None)
+    diff = diff_playlists(snapshot, new)
+
+    assert diff.stats == expected.stats
+    assert diff.stats["num_artists"] == (old.num_artists, new.num_artists) == (3, 2)
+    for field in ("added", "removed", "moved"):
+        assert _songs_by_position(getattr(diff, field)) == _songs_by_position(
+            getattr(expected, field)
+        )
+    assert [(a.id, a.name) for a in diff.removed_artists] == [
+        (a.id, a.name) for a in expected.removed_artists
+    ]
+    assert [a.id for a in diff.new_artists] == [a.id for a in expected.new_artists]
@@ -0,0 +1,55 @@
+from artist import Artist
+from playlist_analyzer import Playlist
+from playlist_snapshot import PlaylistSnapshot, export_csv, load_snapshot, save_snapshot
+from song import Song
+
+
+def _song_fields(song: Song) -> tuple:
+    return (
+        song.id,
+        song.title,
+        song.album,
+        song.album_id,
+        song.duration_ms,
+        song.explicit,
+        [(artist.id, artist.name) for artist in song.artists],
+    )
+
+
+def test_round_trip_keeps_none_and_empty_strings(tmp_path):
+    songs = [
+        # Archivo local: sin ids de artista ni de álbum
+        Song("t1", None, [Artist(None, "Local")], 1000, False, "Uno", None),
+        Song("t2", "", [Artist("a2", "")], 2000, True, "", ""),
+        Song("t3", "B", [Artist("a3", "C"), Artist(None, "D")], 3000, False, "Tres", "b"),
+    ]
+    playlist = Playlist("pid", "Prueba", songs, snapshot_id="s1")
+    path = tmp_path / "playlist.plab"
+    save_snapshot(playlist, str(path))
+
+    snapshot = PlaylistSnapshot(str(path))
+    assert [_song_fields(song) for song in snapshot.to_songs()] == [
+        _song_fields(song) for song in songs
+    ]
+    assert snapshot.album_names.tolist() == [None, "", "B"]
+    assert [snapshot.album_ids[i] for i in range(3)] == [None, "", "b"]
+    assert snapshot.album_ids.tolist(1, 3) == ["", "b"]
+
+    reloaded = load_snapshot(str(path))
+    assert reloaded.get_summary() == playlist.get_summary()
+
+
+def test_csv_export_from_snapshot_matches_playlist(tmp_path):
+    songs = [
+        Song("t1", None, [Artist(None, "Local")], 1000, False, "Uno", None),
+        Song("t2", "A", [Artist("a2", "X"), Artist("a3", "Y")], 2000, True, "Dos"),
+    ]
+    playlist = Playlist("pid", "Prueba", songs)
+    snapshot_path = tmp_path / "playlist.plab"
+    save_snapshot(playlist, str(snapshot_path))
+
+    export_csv(playlist, str(tmp_path / "from_playlist.csv"))
+    export_csv(PlaylistSnapshot(str(snapshot_path)), str(tmp_path / "from_snapshot.csv"))
+    assert (tmp_path / "from_playlist.csv").read_text(encoding="utf-8") == (
+        tmp_path / "from_snapshot.csv"
+    ).read_text(encoding="utf-8")
@@ -0,0 +1,243 @@
+# track_cache.py
+
+import logging
+import sqlite3
+import threading
+import time
+
+from model_registry import ModelRegistry
+from song import Song
+
+CACHE_PATH = "playlab_cache.sqlite"
+# Límite de canciones guardadas entre todas las playlists antes de expulsar las
+# menos usadas recientemente
+DEFAULT_MAX_SONGS = 200_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    snapshot_id TEXT NOT NULL,
+    num_songs INTEGER NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS songs (
+    playlist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT,
+    album TEXT,
+    duration_ms INTEGER NOT NULL,
+    explicit INTEGER NOT NULL,
+    album_id TEXT,
+    PRIMARY KEY (playlist_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS song_artists (
+    playlist_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    artist_position INTEGER NOT NULL,
+    artist_id TEXT,
+    artist_name TEXT,
+    PRIMARY KEY (playlist_id, position, artist_position)
+) WITHOUT ROWID;
+"""
+
+
+class TrackCache:
+    """
+    Caché en disco (SQLite) de las canciones de cada playlist, asociada al
+    `snapshot_id` con el que Spotify identifica cada versión de la playlist.
+
+    Cuando el total de canciones guardadas supera `max_songs`, se expulsan las
+    playlists a las que hace más tiempo que no se accede (LRU).
+
+    Es solo una caché: si SQLite falla al leer o escribir, se registra el error y
+    la playlist se trata como no guardada, sin que falle la descarga.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, max_songs: int = DEFAULT_MAX_SONGS):
+        self.path = path
+        self.max_songs = max_songs
+        # La conexión se comparte entre hilos (GUI, pool de descargas), protegida por un lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """
+        Rehace las tablas de canciones de cachés creadas por versiones anteriores:
+        - sin la columna `album_id`: un NULL no distinguiría "sin álbum" (archivos
+          locales) de "no se guardó", y el enriquecimiento se saltaría sus álbumes;
+        - con NOT NULL en título, álbum o artista, que la API puede dar como null.
+
+        El contenido se descarta: esas playlists se vuelven a descargar la próxima
+        vez que se pidan.
+        """
+        not_null = {}
+        for table in ("songs", "song_artists"):
+            # PRAGMA table_info: (cid, name, type, notnull, default, pk)
+            for row in self._conn.execute(f"PRAGMA table_info({table})"):
+                not_null[row[1]] = row[3]
+        nullable = ("title", "album", "artist_id", "artist_name")
+        if "album_id" in not_null and not any(not_null[name] for name in nullable):
+            return
+        with self._conn:
+            self._conn.execute("DROP TABLE songs")
+            self._conn.execute("DROP TABLE song_artists")
+            self._conn.execute("DELETE FROM playlists")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(
+        self, playlist_id: str, snapshot_id: str, registry: ModelRegistry | None = None
+    ) -> list[Song] | None:
+        """
+        Devuelve las canciones guardadas si la playlist está en caché con el mismo
+        `snapshot_id`; si no, devuelve None.
+        """
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT snapshot_id FROM playlists WHERE id = ?", (playlist_id,)
+                ).fetchone()
+                if row is None or row[0] != snapshot_id:
+                    return None
+
+                song_rows = self._conn.execute(
+                    "SELECT id, title, album, duration_ms, explicit, album_id "
+                    "FROM songs WHERE playlist_id = ? ORDER BY position",
+                    (playlist_id,),
+                ).fetchall()
+                artist_rows = self._conn.execute(
+                    "SELECT position, artist_id, artist_name FROM song_artists "
+                    "WHERE playlist_id = ? ORDER BY position, artist_position",
+                    (playlist_id,),
+                ).fetchall()
+                self._conn.execute(
+                    "UPDATE playlists SET last_access = ? WHERE id = ?",
+                    (time.time(), playlist_id),
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logging.warning(
+                    "No se pudo leer la playlist %s de la caché: %s", playlist_id, e
+                )
+                return None
+
+        registry = registry or ModelRegistry()
+        artists_by_position = [[] for _ in song_rows]
+        for position, artist_id, artist_name in artist_rows:
+            artists_by_position[position].append(registry.artist(artist_id, artist_name))
+
+        return [
+            Song(
+                id=song_id,
+                title=title,
+                artists=artists,
+                album=registry.album(album),
+                duration_ms=duration_ms,
+                explicit=bool(explicit),
+                album_id=album_id,
+            )
+            for (song_id, title, album, duration_ms, explicit, album_id), artists in zip(
+                song_rows, artists_by_position
+            )
+        ]
+
+    def put(self, playlist_id: str, name: str, snapshot_id: str, songs: list[Song]):
+        """
+        Guarda (o reemplaza) las canciones de la playlist para este `snapshot_id`.
+        Los valores nulos (título, álbum, artista) se guardan como NULL.
+        """
+        song_rows = [
+            (
+                playlist_id,
+                position,
+                song.id,
+                song.title,
+                song.album,
+                song.duration_ms,
+                int(song.explicit),
+                song.album_id,
+            )
+            for position, song in enumerate(songs)
+        ]
+        artist_rows = [
+            (playlist_id, position, artist_position, artist.id, artist.name)
+            for position, song in enumerate(songs)
+            for artist_position, artist in enumerate(song.artists)
+        ]
+        with self._lock:
+            try:
+                with self._conn:
+                    self._delete(playlist_id)
+                    self._conn.execute(
+                        "INSERT INTO playlists "
+                        "(id, name, snapshot_id, num_songs, last_access) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (playlist_id, name or "", snapshot_id, len(songs), time.time()),
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO songs VALUES (?, ?, ?, ?, ?, ?, ?, ?)", song_rows
+                    )
+                    self._conn.executemany(
+                        "INSERT INTO song_artists VALUES (?, ?, ?, ?, ?)", artist_rows
+                    )
+                    self._evict(keep=playlist_id)
+            except sqlite3.Error as e:
+                logging.warning(
+                    "No se pudo guardar la playlist %s en la caché: %s", playlist_id, e
+                )
+
+    def invalidate(self, playlist_id: str):
+        with self._lock, self._conn:
+            self._delete(playlist_id)
+
+    def _delete(self, playlist_id: str):
+        self._conn.execute("DELETE FROM playlists WHERE id = ?", (playlist_id,))
+        self._conn.execute("DELETE FROM songs WHERE playlist_id = ?", (playlist_id,))
+        self._conn.execute(
+            "DELETE FROM song_artists WHERE playlist_id = ?", (playlist_id,)
+        )
+
+    def _evict(self, keep: str):
+        """
+        Expulsa playlists, de la menos a la más recientemente usada, hasta quedar
+        por debajo de `max_songs`. La playlist recién guardada nunca se expulsa.
+        """
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(num_songs), 0) FROM playlists"
+        ).fetchone()
+        if total <= self.max_songs:
+            return
+        candidates = self._conn.execute(
+            "SELECT id, num_songs FROM playlists WHERE id != ? ORDER BY last_access",
+            (keep,),
+        ).fetchall()
+        for playlist_id, num_songs in candidates:
+            if total <= self.max_songs:
+                break
+            self._delete(playlist_id)
+            total -= num_songs
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_track_cache() -> TrackCache:
+    """
+    Devuelve la caché compartida por defecto, abriéndola en el primer uso.
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TrackCache()
+        return _default_cache